@@ -0,0 +1,243 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+from collections import OrderedDict
+from time import time
+
+from mo_dots import Data, from_data, is_data, is_many
+from mo_future import allocate_lock, is_text
+from mo_json import value2json
+from mo_math import is_number
+
+MAX_PLANS = 1000  # NUMBER OF PLANS TO REMEMBER
+
+# OPERATORS OF THE FORM {op: {variable: literal}}, WHERE A STRING literal
+# ONLY SHOWS UP AS ITSELF IN THE TRANSLATION. RANGE OPERATORS ARE NOT
+# INCLUDED: A STRING COMPARED TO A TIME COLUMN MAY BE PARSED AS A DATE
+PARAMETER_OPS = {"eq", "ne", "neq", "term", "terms", "in", "prefix"}
+NESTED_OPS = {"and", "or", "not"}
+
+# TWO FAMILIES OF PLACEHOLDERS, OF DIFFERENT LENGTH, TO CONFIRM A PLAN
+# DOES NOT DEPEND ON ITS LITERALS; NO PLACEHOLDER IS PART OF ANOTHER
+PLACEHOLDERS = ("jx{{num}}param", "jxparameter{{num}}value")
+
+_NOT_BINDABLE = "not bindable"  # MARKS A SHAPE THAT MUST BE PLANNED WITH ITS LITERALS
+
+
+class PlanCache(object):
+    """
+    REMEMBER TRANSLATED QUERY PLANS, KEYED BY QUERY SHAPE AND SCHEMA VERSION
+
+    STRING LITERALS IN THE where CLAUSE ARE REPLACED WITH PARAMETERS, SO
+    QUERIES THAT DIFFER ONLY BY THOSE LITERALS SHARE ONE PLAN. A PLAN IS ANY
+    OBJECT WITH
+        bind(literals) - RETURN A COPY OF THE PLAN USING THE GIVEN LITERALS IN
+                         PLACE OF THE PARAMETERS, OR None IF IT CAN NOT
+        signature() - RETURN TEXT THAT IS EQUAL FOR EQUAL PLANS (ONLY NEEDED
+                      IF bind() ACCEPTS LITERALS)
+    """
+
+    def __init__(self, name, max_size=MAX_PLANS):
+        self.name = name
+        self.max_size = max_size
+        self.plans = OrderedDict()  # MAP FROM (shape, version) TO (plan, seconds TO MAKE IT)
+        self.locker = allocate_lock()
+        self.hits = 0
+        self.misses = 0
+        self.planning = 0  # SECONDS SPENT MAKING PLANS
+        self.saved = 0  # SECONDS OF PLANNING AVOIDED BY CACHE HITS
+
+    def get(self, query, version, make_plan):
+        """
+        :param query: JSON QUERY
+        :param version: VERSION OF THE SCHEMA; None IF THE PLAN MUST NOT BE CACHED
+        :param make_plan: FUNCTION THAT TURNS JSON QUERY INTO A PLAN
+        :return: PLAN FOR query
+        """
+        if version is None:
+            return self._make(make_plan, query)[0]
+
+        shape, literals = parameterize(query, PLACEHOLDERS[0])
+        shape_key = (value2json(shape), version)
+        found = self._lookup(shape_key)
+        if found is None:
+            if not literals:
+                plan, duration = self._make(make_plan, query)
+                self._store(shape_key, plan, duration)
+                return plan.bind(literals)
+            try:
+                plan, duration = self._make(make_plan, shape, lambda p: _is_bindable(p, make_plan, query, literals))
+            except Exception:
+                plan, duration = None, 0
+            if plan is None:
+                found = self._store(shape_key, _NOT_BINDABLE, duration)
+            else:
+                self._store(shape_key, plan, duration)
+                return plan.bind(literals)
+        if found is not _NOT_BINDABLE:
+            return found.bind(literals)
+
+        # THIS SHAPE IS PLANNED WITH ITS LITERALS
+        literal_key = (value2json(query), version)
+        found = self._lookup(literal_key)
+        if found is None:
+            plan, duration = self._make(make_plan, query)
+            self._store(literal_key, plan, duration)
+            return plan.bind([])
+        return found.bind([])
+
+    def _make(self, make_plan, query, accept=None):
+        """
+        :param accept: OPTIONAL FUNCTION TO CHECK THE PLAN
+        :return: (plan, seconds) - plan IS None IF NOT accepted
+        """
+        start = time()
+        plan = make_plan(query)
+        if accept and not accept(plan):
+            plan = None
+        duration = time() - start
+        with self.locker:
+            self.misses += 1
+            self.planning += duration
+        return plan, duration
+
+    def _lookup(self, key):
+        with self.locker:
+            found = self.plans.get(key)
+            if found is None:
+                return None
+            plan, duration = found
+            self.plans.move_to_end(key)
+            self.hits += 1
+            self.saved += duration
+            return plan
+
+    def _store(self, key, plan, duration):
+        with self.locker:
+            self.plans[key] = (plan, duration)
+            while len(self.plans) > self.max_size:
+                self.plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        with self.locker:
+            self.plans.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+    def __data__(self):
+        with self.locker:
+            return Data(
+                name=self.name,
+                size=len(self.plans),
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hit_rate,
+                planning=self.planning,
+                saved=self.saved,
+            )
+
+
+def _is_bindable(plan, make_plan, query, literals):
+    """
+    :return: True IF plan, BOUND TO THE OTHER FAMILY OF PLACEHOLDERS, IS THE
+             SAME AS THE PLAN MADE FROM THOSE PLACEHOLDERS
+    """
+    other, _ = parameterize(query, PLACEHOLDERS[1])
+    expected = plan.bind([PLACEHOLDERS[1].replace("{{num}}", str(i)) for i in range(len(literals))])
+    if expected is None:
+        return False
+    return expected.signature() == make_plan(other).bind([]).signature()
+
+
+def parameterize(query, placeholder):
+    """
+    :param query: JSON QUERY
+    :param placeholder: TEMPLATE FOR THE PARAMETER NAMES
+    :return: (shape, literals) WHERE shape IS A COPY OF query WITH THE where
+             CLAUSE STRING LITERALS REPLACED BY PARAMETERS, IN ORDER OF literals
+    """
+    literals = []
+
+    def param(value):
+        if is_text(value) and value and not is_number(value):
+            literals.append(value)
+            return placeholder.replace("{{num}}", str(len(literals) - 1))
+        return value
+
+    def expression(expr):
+        if is_many(expr):
+            return [expression(e) for e in expr]
+        if not is_data(expr) or len(expr) != 1:
+            return expr
+        (op, term), = expr.items()
+        if op in NESTED_OPS:
+            return {op: expression(term)}
+        if op in PARAMETER_OPS and is_data(term) and len(term) == 1:
+            (variable, value), = term.items()
+            if is_many(value):
+                return {op: {variable: [param(v) for v in value]}}
+            return {op: {variable: param(value)}}
+        if op == "literal":
+            return {op: param(term)}
+        return expr
+
+    shape = dict(from_data(query))
+    if "where" in shape:
+        shape["where"] = expression(from_data(shape["where"]))
+    return shape, literals
+
+
+def bind_literals(value, placeholders):
+    """
+    :param value: JSON-LIKE STRUCTURE
+    :param placeholders: MAP FROM PLACEHOLDER TO LITERAL
+    :return: COPY OF value WITH THE PLACEHOLDERS REPLACED, OR None IF SOME
+             PLACEHOLDER IS MISSING, OR IS PART OF A LARGER STRING
+    """
+    seen = set()
+
+    def bind(v):
+        if is_text(v):
+            literal = placeholders.get(v)
+            if literal is not None:
+                seen.add(v)
+                return literal
+            if any(p in v for p in placeholders):
+                raise _NotBindable()
+            return v
+        if is_data(v):
+            return {k: bind(vv) for k, vv in from_data(v).items()}
+        if is_many(v):
+            return [bind(vv) for vv in v]
+        return v
+
+    try:
+        output = bind(value)
+    except _NotBindable:
+        return None
+    if len(seen) != len(placeholders):
+        return None
+    return output
+
+
+def placeholders_for(literals):
+    """
+    :return: MAP FROM PLACEHOLDER (OF THE FIRST FAMILY) TO LITERAL
+    """
+    return {PLACEHOLDERS[0].replace("{{num}}", str(i)): v for i, v in enumerate(literals)}
+
+
+class _NotBindable(Exception):
+    pass
@@ -21,6 +21,7 @@ from mo_dots import (
     join_field,
     Null,
     is_data,
+    is_many,
     Data,
     set_default,
     dict_to_data,
@@ -415,55 +416,105 @@ class Table(BaseFacts):
         if len(rows) == 0:
             return
 
-        try:
-            update = {}
-            with Timer("encoding", verbose=DEBUG):
-                while True:
-                    typed_rows = []
-                    for rownum, row in enumerate(rows):
-                        typed_row, more, add_nested = typed_encode(row, self.flake)
-                        set_default(update, more)
-                        if add_nested:
-                            # row HAS NEW NESTED COLUMN!
-                            # GO OVER THE rows AGAIN SO "RECORD" GET MAPPED TO "REPEATED"
-                            DEBUG and Log.note("New nested documnet found, retrying")
-                            break
-                        typed_rows.append(typed_row)
-                    else:
-                        break
+        with Timer("encoding", verbose=DEBUG):
+            typed_rows, update = self._encode(rows)
 
-            if update or not self.shard:
-                # BATCH HAS ADDITIONAL COLUMNS!!
-                # WE CAN NOT USE THE EXISTING SHARD, MAKE A NEW ONE:
-                self._create_new_shard()
+        if update or not self.shard:
+            # BATCH HAS ADDITIONAL COLUMNS!!
+            # WE CAN NOT USE THE EXISTING SHARD, MAKE A NEW ONE:
+            self._create_new_shard()
+            DEBUG and Log.note(
+                "added new shard with name: {{shard}}", shard=self.shard.table_id
+            )
+        rejected = self._insert(rows, typed_rows)
+        if rejected:
+            Log.error(
+                "{{num}} rows rejected (first few shown):\n{{rejected|json}}",
+                num=len(rejected),
+                rejected=rejected[:5],
+                rows=rejected,
+            )
+
+    def _encode(self, rows):
+        """
+        ENCODE EACH ROW ONCE, AGAINST THE EVOLVING SCHEMA
+        WHEN A ROW TURNS A COLUMN INTO A NESTED COLUMN ("RECORD" BECOMES "REPEATED")
+        ONLY THE ROWS ALREADY ENCODED THAT HAVE THAT COLUMN ARE ENCODED AGAIN
+        :return: (typed_rows, schema_update) PAIR
+        """
+        update = {}
+        typed_rows = []
+        nested_paths = _nested_paths(self.flake.schema)
+        for row in rows:
+            typed_row, more, add_nested = typed_encode(row, self.flake)
+            set_default(update, more)
+            typed_rows.append(typed_row)
+            while add_nested:
+                add_nested = False
+                new_paths = _nested_paths(self.flake.schema) - nested_paths
+                nested_paths |= new_paths
                 DEBUG and Log.note(
-                    "added new shard with name: {{shard}}", shard=self.shard.table_id
+                    "New nested columns {{paths}} found, patching earlier rows",
+                    paths=new_paths,
                 )
+                for rownum, done in enumerate(rows[: len(typed_rows)]):
+                    if any(_has_path(done, path) for path in new_paths):
+                        typed_rows[rownum], more, nested = typed_encode(done, self.flake)
+                        set_default(update, more)
+                        add_nested |= nested
+        return typed_rows, update
+
+    def _insert(self, rows, typed_rows):
+        """
+        INSERT THE ENCODED ROWS
+        :param rows: ORIGINAL ROWS, FOR ERROR REPORTING
+        :param typed_rows: THE SAME ROWS, ENCODED
+        :return: LIST OF {"row", "errors"} FOR THE ROWS BIGQUERY REJECTED; THE OTHERS ARE INSERTED
+        """
+        rejected = []
+        try:
             with Timer(
                 "insert {{num}} rows to bq", param={"num": len(rows)}, verbose=DEBUG
             ):
-                failures = self.container.client.insert_rows_json(
-                    self.shard,
-                    json_rows=typed_rows,
-                    row_ids=[None] * len(typed_rows),
-                    skip_invalid_rows=False,
-                    ignore_unknown_values=False,
-                )
+                failures = self._insert_rows(typed_rows)
             if failures:
-                if all(r == "stopped" for r in wrap(failures).errors.reason):
+                failures = wrap(failures)
+                if all(r == "stopped" for r in failures.errors.reason):
                     self._create_new_shard()
                     DEBUG and Log.note(
                         "STOPPED encountered: Added new shard with name: {{shard}}",
                         shard=self.shard.table_id,
                     )
-                Log.error(
-                    "Got {{num}} failures:\n{{failures|json}}",
-                    num=len(failures),
-                    failures=failures[:5],
+                    Log.error(
+                        "Got {{num}} failures:\n{{failures|json}}",
+                        num=len(failures),
+                        failures=failures[:5],
+                    )
+
+                # ROWS WITH ONLY "stopped" ERRORS WERE VALID, BUT NOT INSERTED BECAUSE
+                # OF THE OTHERS. SEND THE VALID ROWS AGAIN, AND REPORT THE INVALID ONES
+                bad = set(
+                    f.index
+                    for f in failures
+                    if any(r != "stopped" for r in f.errors.reason)
                 )
-            else:
-                self.last_extend = Date.now()
-                DEBUG and Log.note("{{num}} rows added", num=len(typed_rows))
+                good = [i for i in range(len(typed_rows)) if i not in bad]
+                if good:
+                    more_failures = self._insert_rows([typed_rows[i] for i in good])
+                    if more_failures:
+                        Log.error(
+                            "Got {{num}} failures on retry of valid rows:\n{{failures|json}}",
+                            num=len(more_failures),
+                            failures=more_failures[:5],
+                        )
+                rejected = [
+                    {"row": rows[f.index], "errors": f.errors}
+                    for f in failures
+                    if f.index in bad
+                ]
+            DEBUG and Log.note("{{num}} rows added", num=len(typed_rows) - len(rejected))
+            self.last_extend = Date.now()
+            return rejected
         except Exception as cause:
             cause = Except.wrap(cause)
             if (
@@ -492,9 +543,11 @@ class Table(BaseFacts):
                         "attempt smaller batches of size {{batch_size}}",
                         batch_size=batch_size,
                     )
-                    for _, chunk in jx.chunk(rows, batch_size):
-                        self._extend(chunk)
-                    return
+                    # THE ROWS ARE ALREADY ENCODED, ONLY SPLIT THEM
+                    for start in range(0, len(rows), batch_size):
+                        end = start + batch_size
+                        rejected.extend(self._insert(rows[start:end], typed_rows[start:end]))
+                    return rejected
                 except Exception as cause2:
                     Log.error(
                         "smaller batches of size {{batch_size}} did not work",
@@ -510,6 +563,15 @@ class Table(BaseFacts):
             else:
                 Log.error("Do not know how to handle", cause=cause)
 
+    def _insert_rows(self, typed_rows):
+        return self.container.client.insert_rows_json(
+            self.shard,
+            json_rows=typed_rows,
+            row_ids=[None] * len(typed_rows),
+            skip_invalid_rows=False,
+            ignore_unknown_values=False,
+        )
+
     def add(self, row):
         self.extend([row])
 
@@ -899,3 +961,33 @@ def gen_select(total_flake, flake):
 
 DEFAULT_SCHEMA = {"_id": INTEGER}
 DEFAULT_TYPED_SCHEMA = {"_id": {INTEGER_TYPE: INTEGER}}
+
+
+def _nested_paths(schema, path=()):
+    """
+    :return: SET OF PATHS (TUPLES OF PROPERTY NAMES) TO THE NESTED COLUMNS OF schema
+    """
+    if not is_data(schema):
+        return set()
+    output = set()
+    if NESTED_TYPE in schema:
+        output.add(path)
+    for k, v in schema.items():
+        output |= _nested_paths(v, path + (k,))
+    return output
+
+
+def _has_path(value, path):
+    """
+    :return: True IF value HAS A PROPERTY (EVEN IF null) AT path
+    """
+    if not path:
+        return True
+    if is_many(value):
+        return any(_has_path(v, path) for v in value)
+    step, rest = path[0], path[1:]
+    if step == NESTED_TYPE:
+        return _has_path(value, rest)
+    if not is_data(value) or step not in value:
+        return False
+    return _has_path(value[step], rest)
@@ -1142,6 +1142,35 @@ class Cluster(object):
             else:
                 Log.error("Problem with call to {{url}}" + suggestion, url=url, cause=e)
 
+    def multisearch(self, queries, timeout=None, retry=None):
+        """
+        SEND MANY QUERIES, OVER MANY INDEXES, IN ONE _msearch REQUEST
+        :param queries: LIST OF (index, query) PAIRS
+        :return: LIST OF RESPONSES, IN SAME ORDER; EACH MAY HAVE ITS OWN error
+        """
+        url = self.url / "_msearch"
+        content = "".join(
+            value2json({"index": index}) + "\n" + value2json(query) + "\n"
+            for index, query in queries
+        ).encode("utf8")
+        try:
+            self.debug and Log.note("POST {{url}}\n{{data|indent}}", url=url, data=content[:300])
+            response = http.post(
+                url,
+                headers={"Content-Type": "application/x-ndjson", "Accept-Encoding": "gzip,deflate"},
+                data=content,
+                timeout=timeout,
+                retry=retry
+            )
+            if response.status_code not in [200, 201]:
+                Log.error(text(response.reason) + ": " + strings.limit(response.content.decode("latin1"), 10000))
+            details = json2value(response.content.decode('utf8'))
+            if details.error:
+                Log.error(quote2string(details.error))
+            return details.responses
+        except Exception as e:
+            Log.error("Problem with call to {{url}}", url=url, cause=e)
+
     def delete(self, path, **kwargs):
         url = self.settings.host + ":" + text(self.settings.port) + path
         try:
@@ -13,14 +13,15 @@ from jx_base import Column, container
 from jx_base.container import Container
 from jx_base.expressions import jx_expression
 from jx_base.language import is_op
+from jx_base.plan_cache import PlanCache
 from jx_base.expressions import QueryOp
 from jx_elasticsearch import elasticsearch
 from jx_elasticsearch.es52.agg_bulk import is_bulk_agg, es_bulkaggsop
-from jx_elasticsearch.es52.agg_op import es_aggsop, is_aggsop
+from jx_elasticsearch.es52.agg_op import AggPlan, es_aggsop, is_aggsop
 from jx_elasticsearch.es52.expressions import ES52 as ES52Lang
 from jx_elasticsearch.es52.painless import Painless
 from jx_elasticsearch.es52.set_bulk import is_bulk_set, es_bulksetop
-from jx_elasticsearch.es52.set_op import es_setop, is_setop
+from jx_elasticsearch.es52.set_op import SetPlan, es_setop, is_setop
 from jx_elasticsearch.es52.stats import QueryStats
 from jx_elasticsearch.es52.util import aggregates, temper_limit
 from jx_elasticsearch.meta import ElasticsearchMetadata, Table
@@ -28,13 +29,14 @@ from jx_python import jx
 from mo_dots import (
     Data,
     coalesce,
+    is_data,
     listwrap,
     split_field,
     startswith_field,
     unwrap,
     to_data,
 )
-from mo_future import sort_using_key
+from mo_future import is_text, sort_using_key
 from mo_http import http
 from mo_json import OBJECT, value2json, NESTED
 from mo_json.typed_encoder import EXISTS_TYPE
@@ -98,6 +100,7 @@ class ES52(Container):
         self._ensure_max_result_window_set(name)
         self.settings.type = self.es.settings.type
         self.stats = QueryStats(self.es.cluster)
+        self.plans = PlanCache(name)
 
         columns = self.snowflake.columns  # ABSOLUTE COLUMNS
         is_typed = any(c.es_column == EXISTS_TYPE for c in columns)
@@ -199,6 +202,11 @@ class ES52(Container):
 
     def query(self, _query):
         try:
+            if _is_plannable(_query):
+                plan = self.plans.get(_query, self._plan_version(), self._plan)
+                self.stats.record(plan.query)
+                return plan.run(self.es)
+
             query = QueryOp.wrap(_query, container=self, namespace=self.namespace)
 
             self.stats.record(query)
@@ -238,6 +246,38 @@ class ES52(Container):
                 Log.error("Problem (Tried to clear Elasticsearch cache)", cause)
             Log.error("problem", cause=cause)
 
+    def _plan(self, _query):
+        """
+        :param _query: JSON QUERY FROM A TABLE
+        :return: PLAN, WITH run(es)
+        """
+        query = QueryOp.wrap(_query, container=self, namespace=self.namespace)
+        for s in listwrap(query.select):
+            if s.aggregate != None and not aggregates.get(s.aggregate):
+                Log.error(
+                    "ES can not aggregate {{name}} because {{aggregate|quote}} is"
+                    " not a recognized aggregate",
+                    name=s.name,
+                    aggregate=s.aggregate,
+                )
+        query.limit = temper_limit(query.limit, query)
+
+        if is_aggsop(self.es, query):
+            return AggPlan(query)
+        if is_setop(self.es, query):
+            return SetPlan(query)
+        Log.error("Can not handle")
+
+    def _plan_version(self):
+        """
+        :return: VERSION OF THE COLUMNS; None IF THE COLUMNS ARE DUE FOR A RELOAD
+        """
+        table = self._namespace.get_table(self.name)
+        if table == None or table.last_updated < self._namespace.es_cluster.metatdata_last_updated:
+            # LET QueryOp.wrap() RELOAD THE COLUMNS
+            return None
+        return self._namespace.meta.columns.version(self.name)
+
     def update(self, command):
         """
         EXPECTING command == {"set":term, "where":where}
@@ -300,3 +340,10 @@ class ES52(Container):
             return
 
         es_index.refresh()
+
+
+def _is_plannable(query):
+    """
+    :return: True IF query IS FROM A TABLE, WITH A RESULT SENT BACK TO THE CALLER
+    """
+    return is_data(query) and is_text(query.get("from")) and not query.get("destination")
@@ -9,6 +9,7 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
+from collections import deque
 from copy import deepcopy
 
 import mo_math
@@ -18,19 +19,20 @@ from jx_base.expressions.query_op import _normalize_group
 from jx_elasticsearch.es52.agg_format import format_list_from_groupby, format_table_from_groupby
 from jx_elasticsearch.es52.agg_op import aggop_to_es_queries
 from mo_dots import listwrap, unwrap, Null, to_data, coalesce
-from mo_files import TempFile, URL, mimetype
-from mo_future import first
+from mo_files import URL, mimetype
+from mo_future import first, text
 from mo_json import value2json
 from mo_logs import Log, Except
 from mo_math import randoms
 from mo_testing.fuzzytestcase import assertAlmostEqual
 from mo_threads import Thread
 from mo_times import Timer, Date
-from pyLibrary.aws.s3 import Connection
+from pyLibrary.aws.s3 import Connection, MultipartUpload
 
 DEBUG = False
 MAX_CHUNK_SIZE = 5000
 MAX_PARTITIONS = 200
+MAX_CONCURRENT_PARTITIONS = 4  # SEARCHES IN FLIGHT, OVERRIDE WITH S3_CONFIG.max_concurrent_partitions
 URL_PREFIX = URL("https://active-data-query-results.s3-us-west-2.amazonaws.com")
 S3_CONFIG = Null
 
@@ -171,48 +173,64 @@ def extractor(
             },
         )
 
-        with TempFile() as temp_file:
-            with open(temp_file.abspath, "wb") as output:
-                for i in range(0, num_partitions):
-                    if please_stop:
-                        Log.error("request to shutdown!")
-                    is_last = i == num_partitions - 1
-                    first(query.groupby).allowNulls = is_last
-                    acc, decoders, es_query = aggop_to_es_queries(
-                        selects, query_path, schema, query
-                    )
-                    # REACH INTO THE QUERY TO SET THE partitions
-                    terms = es_query.aggs._filter.aggs._match.terms
-                    terms.include.partition = i
-                    terms.include.num_partitions = num_partitions
-
-                    result = esq.es.search(deepcopy(es_query), query.limit)
-                    aggs = unwrap(result.aggregations)
-
-                    formatter.add(aggs, acc, query, decoders, selects)
-                    for b in formatter.bytes():
-                        if b is DONE:
-                            break
+        # BUILD ALL PARTITION QUERIES UP FRONT, SO THEY CAN BE RUN CONCURRENTLY
+        partitions = []
+        for i in range(0, num_partitions):
+            first(query.groupby).allowNulls = i == num_partitions - 1
+            acc, decoders, es_query = aggop_to_es_queries(
+                selects, query_path, schema, query
+            )
+            # REACH INTO THE QUERY TO SET THE partitions
+            terms = es_query.aggs._filter.aggs._match.terms
+            terms.include.partition = i
+            terms.include.num_partitions = num_partitions
+            partitions.append((acc, decoders, deepcopy(es_query)))
+
+        max_concurrent = coalesce(
+            S3_CONFIG.max_concurrent_partitions, MAX_CONCURRENT_PARTITIONS
+        )
+        results = search_partitions(
+            esq, [es_query for _, _, es_query in partitions], query.limit, max_concurrent
+        )
+
+        try:
+            with Timer("upload file to S3 {{file}}", param={"file": guid + ".json"}):
+                with MultipartUpload(
+                    _bucket(),
+                    guid + ".json",
+                    headers={"Content-Type": mimetype.JSON},
+                    policy="public-read" if S3_CONFIG.public else None,
+                ) as output:
+                    for i, ((acc, decoders, _), aggs) in enumerate(zip(partitions, results)):
+                        if please_stop:
+                            Log.error("request to shutdown!")
+                        # DECODERS MAY LOOK AT THE SHARED EDGE
+                        first(query.groupby).allowNulls = i == num_partitions - 1
+                        formatter.add(unwrap(aggs), acc, query, decoders, selects)
+                        for b in formatter.bytes():
+                            if b is DONE:
+                                break
+                            output.write(b)
+                        else:
+                            write_status(
+                                guid,
+                                {
+                                    "status": "working",
+                                    "chunk": i,
+                                    "chunks": num_partitions,
+                                    "row": total,
+                                    "rows": min(abs_limit, cardinality),
+                                    "start_time": start_time,
+                                    "timestamp": Date.now(),
+                                },
+                            )
+                            continue
+                        break
+                    for b in formatter.footer():
                         output.write(b)
-                    else:
-                        write_status(
-                            guid,
-                            {
-                                "status": "working",
-                                "chunk": i,
-                                "chunks": num_partitions,
-                                "row": total,
-                                "rows": min(abs_limit, cardinality),
-                                "start_time": start_time,
-                                "timestamp": Date.now(),
-                            },
-                        )
-                        continue
-                    break
-                for b in formatter.footer():
-                    output.write(b)
-
-            upload(guid + ".json", temp_file)
+        finally:
+            results.close()
+
         write_status(
             guid,
             {
@@ -259,6 +277,54 @@ def upload(filename, temp_file):
             )
 
 
+def search_partitions(esq, es_queries, limit, max_concurrent):
+    """
+    RUN THE PARTITION QUERIES, WITH AT MOST max_concurrent IN FLIGHT
+    :return: GENERATOR OF aggregations, IN THE SAME ORDER AS es_queries
+    """
+    todo = iter(enumerate(es_queries))
+    pending = deque()
+
+    def more():
+        for i, es_query in todo:
+            pending.append(Thread.run(
+                "search partition " + text(i), _search, esq, es_query, limit
+            ))
+            return
+
+    try:
+        for _ in range(max(1, max_concurrent)):
+            more()
+        while pending:
+            aggs = pending.popleft().join()
+            more()
+            yield aggs
+    finally:
+        # EARLY EXIT: DO NOT LEAVE SEARCHES RUNNING
+        for thread in pending:
+            thread.stop()
+        for thread in pending:
+            try:
+                thread.join()
+            except Exception:
+                pass
+
+
+def _search(esq, es_query, limit, please_stop):
+    result = esq.es.search(es_query, limit)
+    return unwrap(result.aggregations)
+
+
+def _bucket():
+    try:
+        connection = Connection(S3_CONFIG).connection
+        return connection.get_bucket(S3_CONFIG.bucket, validate=False)
+    except Exception as e:
+        Log.error(
+            "Problem connecting to {{bucket}}", bucket=S3_CONFIG.bucket, cause=e
+        )
+
+
 def write_status(guid, status):
     try:
         filename = guid + ".status.json"
@@ -13,7 +13,7 @@ from jx_base.expressions import TupleOp
 from jx_base.language import is_op
 from jx_base.expressions.query_op import canonical_aggregates
 from jx_python.containers.cube import Cube
-from mo_collections.matrix import Matrix
+from mo_collections.matrix import Matrix, dense_matrix
 from mo_dots import Data, coalesce, is_list, split_field, to_data
 from mo_files import mimetype
 from mo_future import sort_using_key, next
@@ -38,31 +38,39 @@ def format_cube(aggs, es_query, query, decoders, all_selects):
         dims.append(len(e.domain.partitions) + extra)
 
     dims = tuple(dims)
+    # ACCUMULATE IN dicts, THEN FILL EACH MATRIX IN BULK
     if any(s.default != canonical_aggregates[s.aggregate].default for s in all_selects):
         # UNUSUAL DEFAULT VALUES MESS THE union() FUNCTION
-        is_default = Matrix(dims=dims, zeros=True)
-        matricies = {s.name: Matrix(dims=dims) for s in all_selects}
+        not_default = set()
+        cells = {s.name: _Cells(None) for s in all_selects}
         for row, coord, agg, selects in aggs_iterator(aggs, es_query, decoders):
             for select in selects:
-                m = matricies[select.name]
                 v = select.pull(agg)
                 if v == None:
                     continue
-                is_default[coord] = False
-                union(m, coord, v, select.aggregate)
+                not_default.add(coord)
+                union(cells[select.name], coord, v, select.aggregate)
 
-        # FILL THE DEFAULT VALUES
-        for c, v in is_default:
-            if v:
-                for s in all_selects:
-                    matricies[s.name][c] = s.default
+        matricies = {}
+        for s in all_selects:
+            # CELLS WITH NO VALUE FOR ANY SELECT GET THE DEFAULT
+            m = matricies[s.name] = dense_matrix(dims, zeros=s.default)
+            c = cells[s.name]
+            missing = [coord for coord in not_default if coord not in c]
+            m.set_many(missing, [None] * len(missing))
+            m.set_many(c.keys(), c.values())
     else:
-        matricies = {s.name: Matrix(dims=dims, zeros=s.default) for s in all_selects}
+        cells = {s.name: _Cells(s.default) for s in all_selects}
         for row, coord, agg, selects in aggs_iterator(aggs, es_query, decoders):
             for select in selects:
-                m = matricies[select.name]
                 v = select.pull(agg)
-                union(m, coord, v, select.aggregate)
+                union(cells[select.name], coord, v, select.aggregate)
+
+        matricies = {}
+        for s in all_selects:
+            m = matricies[s.name] = dense_matrix(dims, zeros=s.default)
+            c = cells[s.name]
+            m.set_many(c.keys(), c.values())
 
     cube = Cube(
         query.select,
@@ -330,6 +338,19 @@ def _get(v, k, d):
     return v
 
 
+class _Cells(dict):
+    """
+    SPARSE CELLS OF A CUBE, BY coord; MISSING CELLS HAVE THE default VALUE
+    """
+
+    def __init__(self, default):
+        dict.__init__(self)
+        self.default = default
+
+    def __missing__(self, coord):
+        return self.default
+
+
 def union(matrix, coord, value, agg):
     # matrix[coord] = existing + value  WITH ADDITIONAL CHECKS
     existing = matrix[coord]
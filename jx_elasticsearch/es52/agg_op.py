@@ -10,6 +10,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 from collections import deque
+from copy import copy, deepcopy
 
 from jx_base.expressions.false_op import FALSE
 
@@ -28,7 +29,7 @@ from jx_elasticsearch.es52.expressions import ES52, split_expression_by_path
 from jx_elasticsearch.es52.expressions.utils import setop_to_inner_joins, pre_process, query_to_outer_joins
 from jx_elasticsearch.es52.painless import Painless
 from jx_python import jx
-from mo_dots import Data, Null, coalesce, listwrap, literal_field, unwrap, unwraplist, to_data
+from mo_dots import Data, Null, coalesce, listwrap, literal_field, unwrap, unwraplist, to_data, list_to_data
 from mo_future import first, next, text
 from mo_imports import export
 from mo_logs import Log
@@ -185,6 +186,43 @@ def aggop_to_es_queries(select, query_path, schema, query):
     return output, decoders, es_query
 
 
+class AggPlan(object):
+    """
+    THE NORMALIZED QUERY FOR AN AGGREGATION
+    THE es_query IS MADE ON EVERY run(), BECAUSE THE DECODERS COLLECT THE
+    PARTITIONS OF THE RESPONSE INTO THE EDGE DOMAINS
+    """
+
+    __slots__ = ["query"]
+
+    def __init__(self, query):
+        self.query = query
+
+    def bind(self, literals):
+        # THE where CLAUSE IS ALREADY AN EXPRESSION; THERE IS NO PLACE FOR literals
+        return None if literals else self
+
+    def run(self, es):
+        query = self.query.copy()
+        query.edges = _fresh_edges(query.edges)
+        query.groupby = _fresh_edges(query.groupby)
+        return es_aggsop(es, query.frum, query)
+
+
+def _fresh_edges(edges):
+    """
+    :return: COPY OF edges, SO THE DECODERS DO NOT CHANGE THE PLAN'S DOMAINS
+    """
+    if not edges:
+        return edges
+    output = []
+    for e in edges:
+        e = copy(e)
+        e.domain = deepcopy(e.domain)
+        output.append(e)
+    return list_to_data(output)
+
+
 def es_aggsop(es, frum, query):
     query = query.copy()  # WE WILL MARK UP THIS QUERY
     schema = frum.schema
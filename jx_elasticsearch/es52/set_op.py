@@ -16,6 +16,7 @@ from jx_base.domains import ALGEBRAIC
 from jx_base.expressions import LeavesOp, Variable, TRUE, NULL
 from jx_base.expressions.query_op import DEFAULT_LIMIT
 from jx_base.language import is_op
+from jx_base.plan_cache import bind_literals, placeholders_for
 from jx_elasticsearch.es52.expressions import (
     split_expression_by_path,
     NestedOp,
@@ -41,7 +42,7 @@ from mo_dots import (
     list_to_data,
     unwraplist)
 from mo_future import text
-from mo_json import NESTED, INTERNAL, OBJECT, EXISTS
+from mo_json import NESTED, INTERNAL, OBJECT, EXISTS, value2json
 from mo_json.typed_encoder import decode_property, untype_path, untyped
 from mo_logs import Log
 from mo_math import AND
@@ -362,41 +363,81 @@ def get_selects(query):
 
 
 def es_setop(es, query):
-    schema = query.frum.schema
-    all_paths, split_decoders, var_to_columns = pre_process(query)
-    new_select, split_select, flatten = get_selects(query)
-    # THE SELECTS MAY BE REACHING DEEPER INTO THE NESTED RECORDS
-    all_paths = list(reversed(sorted(set(split_select.keys()) | set(all_paths))))
-    es_query = setop_to_es_queries(query, all_paths, split_select, var_to_columns)
-    if not es_query:
-        # NO QUERY TO SEND
-        formatter, _, mime_type = set_formatters[query.format]
-        output = formatter([], new_select, query)
-        output.meta.content_type = mime_type
-        output.meta.es_query = es_query
-        return output
+    return SetPlan(query).run(es)
 
-    size = coalesce(query.limit, DEFAULT_LIMIT)
-    sort = jx_sort_to_es_sort(query.sort, schema)
-    for q in es_query:
-        q["size"] = size
-        q["sort"] = sort
 
-    with Timer("call to ES", verbose=DEBUG) as call_timer:
-        results = es.multisearch(es_query)
-
-    T = [copy(row) for row in flatten(results)]
-    try:
-        formatter, _, mime_type = set_formatters[query.format]
+class SetPlan(object):
+    """
+    THE es_query FOR A SET OPERATION, AND WHAT IS NEEDED TO FORMAT THE RESPONSE
+    """
 
-        with Timer("formatter", silent=True):
-            output = formatter(T, new_select, query)
-        output.meta.timing.es = call_timer.duration
-        output.meta.content_type = mime_type
-        output.meta.es_query = es_query
+    __slots__ = ["query", "es_query", "new_select", "flatten"]
+
+    def __init__(self, query=None):
+        if query is None:
+            return
+        schema = query.frum.schema
+        all_paths, split_decoders, var_to_columns = pre_process(query)
+        new_select, split_select, flatten = get_selects(query)
+        # THE SELECTS MAY BE REACHING DEEPER INTO THE NESTED RECORDS
+        all_paths = list(reversed(sorted(set(split_select.keys()) | set(all_paths))))
+        es_query = setop_to_es_queries(query, all_paths, split_select, var_to_columns)
+
+        if es_query:
+            size = coalesce(query.limit, DEFAULT_LIMIT)
+            sort = jx_sort_to_es_sort(query.sort, schema)
+            for q in es_query:
+                q["size"] = size
+                q["sort"] = sort
+
+        self.query = query
+        self.es_query = es_query
+        self.new_select = new_select
+        self.flatten = flatten
+
+    def bind(self, literals):
+        """
+        :return: COPY OF THIS PLAN, WITH literals IN THE es_query
+        """
+        es_query = bind_literals(self.es_query, placeholders_for(literals))
+        if es_query is None:
+            return None
+        output = object.__new__(SetPlan)
+        output.query = self.query
+        output.es_query = es_query
+        output.new_select = self.new_select
+        output.flatten = self.flatten
         return output
-    except Exception as e:
-        Log.error("problem formatting", e)
+
+    def signature(self):
+        return value2json(self.es_query)
+
+    def run(self, es):
+        query = self.query
+        es_query = self.es_query
+        if not es_query:
+            # NO QUERY TO SEND
+            formatter, _, mime_type = set_formatters[query.format]
+            output = formatter([], self.new_select, query)
+            output.meta.content_type = mime_type
+            output.meta.es_query = es_query
+            return output
+
+        with Timer("call to ES", verbose=DEBUG) as call_timer:
+            results = es.multisearch(es_query)
+
+        T = [copy(row) for row in self.flatten(results)]
+        try:
+            formatter, _, mime_type = set_formatters[query.format]
+
+            with Timer("formatter", silent=True):
+                output = formatter(T, self.new_select, query)
+            output.meta.timing.es = call_timer.duration
+            output.meta.content_type = mime_type
+            output.meta.es_query = es_query
+            return output
+        except Exception as e:
+            Log.error("problem formatting", e)
 
 
 def pull_id(row):
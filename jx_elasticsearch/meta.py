@@ -78,6 +78,9 @@ TABLE_DOES_NOT_EXIST = "{{table|quote}} does not exist"
 known_clusters = {}  # MAP FROM id(Cluster) TO ElasticsearchMetadata INSTANCE
 
 KNOWN_MULTITYPES = ["build.type", "run.type", "build.platform", "file.path"]
+PROBE_BATCH_SIZE = 100  # MOST COLUMNS TO PROBE IN ONE AGGREGATION REQUEST
+MSEARCH_SIZE = 10  # MOST AGGREGATION REQUESTS IN ONE _msearch
+MAX_CONCURRENT_PROBES = 4  # MOST _msearch REQUESTS IN FLIGHT AT ONCE
 
 
 class ElasticsearchMetadata(Namespace):
@@ -105,6 +108,8 @@ class ElasticsearchMetadata(Namespace):
         self.index_does_not_exist = set()
         self.todo_priority = False
         self.todo = Queue("refresh metadata", max=100000, unique=True)
+        self.probes = Queue("metadata probes", max=MAX_CONCURRENT_PROBES)
+        self.recently_queried = {}  # MAP FROM alias TO unix TIME OF LAST get_columns()
 
         self.meta = Data()
         self.meta.columns = ColumnList(self.es_cluster)
@@ -140,6 +145,12 @@ class ElasticsearchMetadata(Namespace):
             self.worker = Thread.run(
                 "refresh metadata", self.monitor, parent_thread=MAIN_THREAD
             )
+            self.probe_workers = [
+                Thread.run(
+                    "metadata probe " + text(i), self.probe_worker, parent_thread=MAIN_THREAD
+                )
+                for i in range(MAX_CONCURRENT_PROBES)
+            ]
         else:
             self.worker = Thread.run(
                 "not refresh metadata for " + host,
@@ -357,7 +368,12 @@ class ElasticsearchMetadata(Namespace):
         )
         if table_name == META_TABLES_NAME:
             return self.meta.tables.schema.columns
-        elif table_name == META_COLUMNS_NAME:
+        alias = self._get_alias(table_name, after)
+        self.recently_queried[alias] = Date.now().unix
+        return self._get_columns(alias, table_name, column_name, after, timeout)
+
+    def _get_alias(self, table_name, after):
+        if table_name == META_COLUMNS_NAME:
             root_table_name = table_name
         else:
             root_table_name, _ = tail_field(table_name)
@@ -368,7 +384,9 @@ class ElasticsearchMetadata(Namespace):
             alias = self._find_alias(root_table_name)
             if not alias:
                 Log.error(TABLE_DOES_NOT_EXIST, table=table_name)
+        return alias
 
+    def _get_columns(self, alias, table_name, column_name=None, after=None, timeout=None):
         try:
             table = self.get_table(alias)
             # LAST TIME WE GOT INFO FOR THIS TABLE
@@ -548,44 +566,14 @@ class ElasticsearchMetadata(Namespace):
                 })
                 return
             else:
-                es_query = {
-                    "aggs": {
-                        "count": _counting_query(column),
-                        "_filter": {
-                            "aggs": {"multi": {"max": {
-                                "script": "doc["
-                                + quote(column.es_column)
-                                + "].values.size()"
-                            }}},
-                            "filter": {"bool": {"should": [
-                                {"range": {"etl.timestamp.~n~": {"gte": (
-                                    Date.today() - WEEK
-                                )}}},
-                                {"bool": {"must_not": {"exists": {
-                                    "field": "etl.timestamp.~n~"
-                                }}}},
-                            ]}},
-                        },
-                    },
-                    "size": 0,
-                }
-
                 result = self.es_cluster.post(
-                    "/" + es_index + "/_search", data=es_query
+                    "/" + es_index + "/_search", data=_cardinality_query([column])
                 )
-                agg_results = result.aggregations
                 count = result.hits.total
-                cardinality = coalesce(
-                    agg_results.count.value,
-                    agg_results.count._nested.value,
-                    agg_results.count.doc_count,
-                )
-                multi = int(coalesce(agg_results._filter.multi.value, 1))
+                cardinality, multi = _cardinality_result(result.aggregations, 0)
                 if cardinality == None:
                     Log.error("logic error")
 
-            query = Data(size=0)
-
             if column.es_column == "_id":
                 self.meta.columns.update({
                     "set": {
@@ -601,134 +589,235 @@ class ElasticsearchMetadata(Namespace):
                     }},
                 })
                 return
-            elif (
-                cardinality > 1000
-                or (count >= 30 and cardinality == count)
-                or (count >= 1000 and cardinality / count > 0.99)
-            ):
-                DEBUG and Log.note(
-                    "{{table}}.{{field}} has {{num}} parts",
-                    table=column.es_index,
-                    field=column.es_column,
-                    num=cardinality,
-                )
-                self.meta.columns.update({
-                    "set": {
-                        "count": count,
-                        "cardinality": cardinality,
-                        "multi": multi,
-                        "last_updated": now,
-                    },
-                    "clear": ["partitions"],
-                    "where": {"eq": {
-                        "es_index": column.es_index,
-                        "es_column": column.es_column,
-                    }},
-                })
-                return
-            elif column.es_type in elasticsearch.ES_NUMERIC_TYPES and cardinality > 30:
-                DEBUG and Log.note(
-                    "{{table}}.{{field}} has {{num}} parts",
-                    table=column.es_index,
-                    field=column.es_column,
-                    num=cardinality,
-                )
-                self.meta.columns.update({
-                    "set": {
-                        "count": count,
-                        "cardinality": cardinality,
-                        "multi": multi,
-                        "last_updated": now,
-                    },
-                    "clear": ["partitions"],
-                    "where": {"eq": {
-                        "es_index": column.es_index,
-                        "es_column": column.es_column,
-                    }},
-                })
+
+            terms = self._set_cardinality(column, count, cardinality, multi, now)
+            if not terms:
                 return
-            elif len(column.nested_path) != 1:
-                query.aggs["_"] = {
-                    "nested": {"path": column.nested_path[0]},
-                    "aggs": {"_nested": {"terms": {"field": column.es_column}}},
-                }
-            elif cardinality == 0:  # WHEN DOES THIS HAPPEN?
-                query.aggs["_"] = {"terms": {"field": column.es_column}}
-            else:
-                query.aggs["_"] = {"terms": {
-                    "field": column.es_column,
-                    "size": cardinality,
-                }}
+            result = self.es_cluster.post(
+                "/" + es_index + "/_search", data={"size": 0, "aggs": {"_": terms}}
+            )
+            self._set_partitions(
+                column, count, cardinality, multi, result.aggregations._, now
+            )
+        except Exception as e:
+            self._probe_failed(column, e, now)
 
-            result = self.es_cluster.post("/" + es_index + "/_search", data=query)
+    def _is_simple_probe(self, column):
+        """
+        :return: True IF column CAN BE PROBED ALONG WITH OTHER COLUMNS OF THE SAME INDEX
+        """
+        if (
+            column.es_index in self.index_does_not_exist
+            or column.jx_type in STRUCT
+            or column.es_index in (META_TABLES_NAME, META_COLUMNS_NAME)
+            or column.es_column == "_id"
+            or column.es_type in (EXISTS, BOOLEAN)
+            or "_covered." in column.es_column
+            or "_uncovered." in column.es_column
+        ):
+            return False
+        return not any(
+            cc.es_type == "text"
+            for cc in self.meta.columns.find(column.es_index, column.es_column)
+        )
 
-            aggs = result.aggregations._
-            if aggs._nested:
-                parts = jx.sort(aggs._nested.buckets.key)
+    def _update_cardinality_batch(self, columns):
+        """
+        QUERY ES TO FIND CARDINALITY AND PARTITIONS FOR MANY SIMPLE COLUMNS
+        COLUMNS OF THE SAME INDEX ARE PROBED TOGETHER WITH A FEW
+        MULTI-AGGREGATION REQUESTS, SENT THROUGH _msearch
+        """
+        now = Date.now()
+        simple = []
+        for column in columns:
+            if self._is_simple_probe(column):
+                simple.append(column)
             else:
-                parts = jx.sort(aggs.buckets.key)
+                self._update_cardinality(column)
+
+        # FIRST PASS: COUNT, CARDINALITY AND MULTI
+        batches = _batches(simple, lambda c: c)
+        responses = self._multisearch([
+            (es_index, _cardinality_query(batch)) for es_index, batch in batches
+        ])
+        todo = []  # (column, count, cardinality, multi, terms) NEEDING PARTITIONS
+        for (es_index, batch), response in zip(batches, responses):
+            if isinstance(response, Except):
+                for column in batch:
+                    self._probe_failed(column, response, now)
+                continue
+            elif response.error:
+                # PROBE ONE-BY-ONE TO ISOLATE THE PROBLEM COLUMN
+                for column in batch:
+                    self._update_cardinality(column)
+                continue
+
+            count = response.hits.total
+            for i, column in enumerate(batch):
+                cardinality, multi = _cardinality_result(response.aggregations, i)
+                if cardinality == None:
+                    self._update_cardinality(column)
+                    continue
+                terms = self._set_cardinality(column, count, cardinality, multi, now)
+                if terms:
+                    todo.append((column, count, cardinality, multi, terms))
+
+        # SECOND PASS: PARTITIONS
+        batches = _batches(todo, lambda t: t[0])
+        responses = self._multisearch([
+            (
+                es_index,
+                {
+                    "size": 0,
+                    "aggs": {"_" + text(i): t[4] for i, t in enumerate(batch)},
+                },
+            )
+            for es_index, batch in batches
+        ])
+        for (es_index, batch), response in zip(batches, responses):
+            for i, (column, count, cardinality, multi, terms) in enumerate(batch):
+                if isinstance(response, Except):
+                    self._probe_failed(column, response, now)
+                elif response.error:
+                    self._update_cardinality(column)
+                else:
+                    self._set_partitions(
+                        column,
+                        count,
+                        cardinality,
+                        multi,
+                        response.aggregations["_" + text(i)],
+                        now,
+                    )
 
+    def _multisearch(self, requests):
+        """
+        :param requests: LIST OF (es_index, query) PAIRS
+        :return: LIST OF RESPONSES; AN Except FOR REQUESTS THAT COULD NOT BE SENT
+        """
+        output = []
+        if not requests:
+            return output
+        for _, group in jx.chunk(requests, size=MSEARCH_SIZE):
+            try:
+                output.extend(self.es_cluster.multisearch(group))
+            except Exception as cause:
+                cause = Except.wrap(cause)
+                output.extend(cause for _ in group)
+        return output
+
+    def _set_cardinality(self, column, count, cardinality, multi, now):
+        """
+        RECORD THE CARDINALITY OF column
+        :return: THE AGGREGATION TO FIND THE PARTITIONS, OR None IF NOT NEEDED
+        """
+        if (
+            cardinality > 1000
+            or (count >= 30 and cardinality == count)
+            or (count >= 1000 and cardinality / count > 0.99)
+            or (column.es_type in elasticsearch.ES_NUMERIC_TYPES and cardinality > 30)
+        ):
             DEBUG and Log.note(
-                "update metadata for {{column.es_index}}.{{column.es_column}}"
-                " (id={{id}}) card={{card}} at {{time}}",
-                id=id(column),
-                column=column,
-                card=cardinality,
-                time=now,
+                "{{table}}.{{field}} has {{num}} parts",
+                table=column.es_index,
+                field=column.es_column,
+                num=cardinality,
             )
             self.meta.columns.update({
                 "set": {
                     "count": count,
                     "cardinality": cardinality,
                     "multi": multi,
-                    "partitions": parts,
                     "last_updated": now,
                 },
+                "clear": ["partitions"],
                 "where": {"eq": {
                     "es_index": column.es_index,
                     "es_column": column.es_column,
                 }},
             })
-            META_COLUMNS_DESC.last_updated = now
-        except Exception as e:
-            # CAN NOT IMPORT: THE TEST MODULES SETS UP LOGGING
-            # from tests.test_jx import TEST_TABLE
-            e = Except.wrap(e)
-            TEST_TABLE = "testdata"
-            is_missing_index = any(
-                w in e for w in ["IndexMissingException", "index_not_found_exception"]
+            return None
+        elif len(column.nested_path) != 1:
+            return {
+                "nested": {"path": column.nested_path[0]},
+                "aggs": {"_nested": {"terms": {"field": column.es_column}}},
+            }
+        elif cardinality == 0:  # WHEN DOES THIS HAPPEN?
+            return {"terms": {"field": column.es_column}}
+        else:
+            return {"terms": {"field": column.es_column, "size": cardinality}}
+
+    def _set_partitions(self, column, count, cardinality, multi, aggs, now):
+        """
+        RECORD THE PARTITIONS OF column, FROM THE RESULT OF THE AGGREGATION
+        GIVEN BY _set_cardinality()
+        """
+        if aggs._nested:
+            parts = jx.sort(aggs._nested.buckets.key)
+        else:
+            parts = jx.sort(aggs.buckets.key)
+
+        DEBUG and Log.note(
+            "update metadata for {{column.es_index}}.{{column.es_column}}"
+            " (id={{id}}) card={{card}} at {{time}}",
+            id=id(column),
+            column=column,
+            card=cardinality,
+            time=now,
+        )
+        self.meta.columns.update({
+            "set": {
+                "count": count,
+                "cardinality": cardinality,
+                "multi": multi,
+                "partitions": parts,
+                "last_updated": now,
+            },
+            "where": {"eq": {
+                "es_index": column.es_index,
+                "es_column": column.es_column,
+            }},
+        })
+        META_COLUMNS_DESC.last_updated = now
+
+    def _probe_failed(self, column, cause, now):
+        # CAN NOT IMPORT: THE TEST MODULES SETS UP LOGGING
+        # from tests.test_jx import TEST_TABLE
+        e = Except.wrap(cause)
+        TEST_TABLE = "testdata"
+        is_missing_index = any(
+            w in e for w in ["IndexMissingException", "index_not_found_exception"]
+        )
+        is_test_table = column.es_index.startswith((TEST_TABLE_PREFIX, TEST_TABLE))
+
+        if is_missing_index:
+            # WE EXPECT TEST TABLES TO DISAPPEAR
+            if not is_test_table:
+                Log.warning("Missing index {{col.es_index}}", col=column)
+            self.meta.columns.clear(column.es_index, after=now)
+            self.index_does_not_exist.add(column.es_index)
+            self.meta.columns.delete_from_es(column.es_index, after=now)
+        elif "No field found for" in e:
+            self.meta.columns.clear(column.es_index, column.es_column, after=now)
+            Log.warning(
+                "Could not get column {{col.es_index}}.{{col.es_column}} info",
+                col=column,
+                cause=e,
+            )
+        else:
+            self.meta.columns.update({
+                "set": {"last_updated": now},
+                "clear": ["count", "cardinality", "multi", "partitions"],
+                "where": {"eq": {
+                    "es_index": column.es_index,
+                    "es_column": column.es_column,
+                }},
+            })
+            Log.warning(
+                "Could not get {{col.es_index}}.{{col.es_column}} info",
+                col=column,
+                cause=e,
             )
-            is_test_table = column.es_index.startswith((TEST_TABLE_PREFIX, TEST_TABLE))
-
-            meta_columns = self.meta.columns
-            if is_missing_index:
-                # WE EXPECT TEST TABLES TO DISAPPEAR
-                if not is_test_table:
-                    Log.warning("Missing index {{col.es_index}}", col=column)
-                self.meta.columns.clear(column.es_index, after=now)
-                self.index_does_not_exist.add(column.es_index)
-                self.meta.columns.delete_from_es(column.es_index, after=now)
-            elif "No field found for" in e:
-                self.meta.columns.clear(column.es_index, column.es_column, after=now)
-                Log.warning(
-                    "Could not get column {{col.es_index}}.{{col.es_column}} info",
-                    col=column,
-                    cause=e,
-                )
-            else:
-                self.meta.columns.update({
-                    "set": {"last_updated": now},
-                    "clear": ["count", "cardinality", "multi", "partitions"],
-                    "where": {"eq": {
-                        "es_index": column.es_index,
-                        "es_column": column.es_column,
-                    }},
-                })
-                Log.warning(
-                    "Could not get {{col.es_index}}.{{col.es_column}} info",
-                    col=column,
-                    cause=e,
-                )
 
     def monitor(self, please_stop):
         please_stop.then(lambda: self.todo.add(THREAD_STOP))
@@ -777,7 +866,10 @@ class ElasticsearchMetadata(Namespace):
                                 pass
                             try:
                                 # TRIGGER COLUMN UNIFICATION BEFORE WE DO ANALYSIS
-                                self.get_columns(g.es_index)
+                                # (NOT get_columns(), THIS IS NOT A QUERY)
+                                self._get_columns(
+                                    self._get_alias(g.es_index, None), g.es_index
+                                )
                             except Exception as cause:
                                 if TABLE_DOES_NOT_EXIST in cause:
                                     DEBUG and Log.note(
@@ -806,76 +898,107 @@ class ElasticsearchMetadata(Namespace):
                 if work_item:
                     if work_item is THREAD_STOP:
                         continue
-                    column, after = work_item
+                    work = [work_item] + [
+                        w for w in self.todo.pop_all() if w is not THREAD_STOP
+                    ]
 
                     now = Date.now()
+                    latest = max(a for _, a in work if a) if any(a for _, a in work) else None
+                    all_tables = set(
+                        n
+                        for p in self.es_cluster.get_aliases(after=latest)
+                        for n in (p.index, p.alias)
+                    )
+                    probes = [
+                        column
+                        for column, after in work
+                        if self._needs_probe(column, after, all_tables, now)
+                    ]
+                    probes.sort(key=self._probe_priority)
+
                     with Timer(
-                        "review {{table}}.{{column}}",
-                        param={"table": column.es_index, "column": column.es_column},
+                        "queue {{num}} columns for review",
+                        param={"num": len(probes)},
                         verbose=DEBUG,
                     ):
-                        all_tables = [
-                            n
-                            for p in self.es_cluster.get_aliases(after=after)
-                            for n in (p.index, p.alias)
-                        ]
-                        if column.es_index not in all_tables:
-                            DEBUG and Log.note(
-                                "{{column.es_column}} of {{column.es_index}} does not"
-                                " exist",
-                                column=column,
-                            )
-                            self.meta.columns.clear(column.es_index, after=now)
-                            continue
-                        if column.jx_type == EXISTS:
-                            pass  # WE MUST PROBE ES TO SEE IF STILL EXISTS
-                        elif column.jx_type in STRUCT:
-                            if (
-                                column.es_type == "nested"
-                                or last(split_field(column.es_column)) == NESTED_TYPE
-                            ) and (column.multi == None or column.multi < 2):
-                                column.multi = 1001
-                                Log.warning("fixing multi on nested problem")
-
-                            column.last_updated = now
-                            continue
-                        elif column.cardinality is None:
-                            pass  # NO CARDINALITY MEANS WE MUST GET UPDATE IT
-                        elif after and column.last_updated < after:
-                            pass  # COLUMN IS TOO OLD
-                        elif column.last_updated < now - TOO_OLD:
-                            pass  # COLUMN IS WAY TOO OLD
-                        else:
-                            # DO NOT UPDATE FRESH COLUMN METADATA
-                            DEBUG and Log.note(
-                                "{{column.es_column}} is still fresh ({{ago}} ago)",
-                                column=column,
-                                ago=(now - Date(column.last_updated)),
-                            )
-                            continue
-
-                        try:
-                            self._update_cardinality(column)
-                            (
-                                DEBUG
-                                and not column.es_index.startswith(TEST_TABLE_PREFIX)
-                                and Log.note("updated {{column.name}}", column=column)
-                            )
-                        except Exception as cause:
-                            if '"status":404' in cause:
-                                self.meta.columns.clear(
-                                    column.es_index, column.es_column, after=now
-                                )
-                            else:
-                                Log.warning(
-                                    "problem getting cardinality for {{column.name}}",
-                                    column=column,
-                                    cause=cause,
-                                )
+                        for _, columns in jx.chunk(
+                            probes, size=PROBE_BATCH_SIZE * MSEARCH_SIZE
+                        ):
+                            # BLOCKS WHEN ALL PROBE WORKERS ARE BUSY
+                            self.probes.add(columns)
                     META_COLUMNS_DESC.last_updated = now
             except Exception as cause:
                 Log.warning("problem in cardinality monitor", cause=cause)
 
+    def _needs_probe(self, column, after, all_tables, now):
+        """
+        :return: True IF column METADATA MUST BE UPDATED FROM ES
+        """
+        if column.es_index not in all_tables:
+            DEBUG and Log.note(
+                "{{column.es_column}} of {{column.es_index}} does not exist",
+                column=column,
+            )
+            self.meta.columns.clear(column.es_index, after=now)
+            return False
+        if column.jx_type == EXISTS:
+            return True  # WE MUST PROBE ES TO SEE IF STILL EXISTS
+        elif column.jx_type in STRUCT:
+            if (
+                column.es_type == "nested"
+                or last(split_field(column.es_column)) == NESTED_TYPE
+            ) and (column.multi == None or column.multi < 2):
+                column.multi = 1001
+                Log.warning("fixing multi on nested problem")
+
+            column.last_updated = now
+            return False
+        elif column.cardinality is None:
+            return True  # NO CARDINALITY MEANS WE MUST GET UPDATE IT
+        elif after and column.last_updated < after:
+            return True  # COLUMN IS TOO OLD
+        elif column.last_updated < now - TOO_OLD:
+            return True  # COLUMN IS WAY TOO OLD
+        else:
+            # DO NOT UPDATE FRESH COLUMN METADATA
+            DEBUG and Log.note(
+                "{{column.es_column}} is still fresh ({{ago}} ago)",
+                column=column,
+                ago=(now - Date(column.last_updated)),
+            )
+            return False
+
+    def _probe_priority(self, column):
+        """
+        SORT KEY: NEVER-PROBED COLUMNS FIRST, THEN COLUMNS OF RECENTLY QUERIED
+        TABLES, THEN THE STALEST COLUMNS
+        """
+        return (
+            column.cardinality != None,
+            -self.recently_queried.get(column.es_index, 0),
+            coalesce(column.last_updated, 0),
+        )
+
+    def probe_worker(self, please_stop):
+        please_stop.then(lambda: self.probes.add(THREAD_STOP))
+        while not please_stop:
+            columns = self.probes.pop(till=please_stop)
+            if columns is THREAD_STOP or not columns:
+                continue
+            try:
+                with Timer(
+                    "review {{num}} columns", param={"num": len(columns)}, verbose=DEBUG
+                ):
+                    self._update_cardinality_batch(columns)
+            except Exception as cause:
+                if '"status":404' in cause:
+                    for column in columns:
+                        self.meta.columns.clear(
+                            column.es_index, column.es_column, after=Date.now()
+                        )
+                else:
+                    Log.warning("problem getting cardinality", cause=cause)
+
     def not_monitor(self, please_stop):
         Log.alert("metadata scan has been disabled")
         please_stop.then(lambda: self.todo.add(THREAD_STOP))
@@ -1198,6 +1321,52 @@ class Table(BaseTable):
         return FALSE
 
 
+def _batches(items, get_column):
+    """
+    GROUP items BY INDEX, IN BATCHES OF AT MOST PROBE_BATCH_SIZE
+    :return: LIST OF (es_index, batch) PAIRS
+    """
+    by_index = {}
+    for item in items:
+        by_index.setdefault(get_column(item).es_index, []).append(item)
+    return [
+        (es_index.split(".")[0], batch)
+        for es_index, index_items in by_index.items()
+        for _, batch in jx.chunk(index_items, size=PROBE_BATCH_SIZE)
+    ]
+
+
+def _cardinality_query(columns):
+    """
+    ONE QUERY FOR THE COUNT, CARDINALITY AND MULTI OF MANY COLUMNS OF ONE INDEX
+    """
+    aggs = {"_" + text(i): _counting_query(c) for i, c in enumerate(columns)}
+    aggs["_filter"] = {
+        "aggs": {
+            "_" + text(i): {"max": {
+                "script": "doc[" + quote(c.es_column) + "].values.size()"
+            }}
+            for i, c in enumerate(columns)
+        },
+        "filter": {"bool": {"should": [
+            {"range": {"etl.timestamp.~n~": {"gte": (Date.today() - WEEK)}}},
+            {"bool": {"must_not": {"exists": {"field": "etl.timestamp.~n~"}}}},
+        ]}},
+    }
+    return {"aggs": aggs, "size": 0}
+
+
+def _cardinality_result(aggs, i):
+    """
+    :return: (cardinality, multi) OF THE i-th COLUMN GIVEN TO _cardinality_query()
+    """
+    name = "_" + text(i)
+    count = aggs[name]
+    cardinality = coalesce(count.value, count._nested.value, count.doc_count)
+    multi = int(coalesce(aggs._filter[name].value, 1))
+    return cardinality, multi
+
+
 def _counting_query(c):
     if c.es_column == "_id":
         return {"filter": {"match_all": {}}}
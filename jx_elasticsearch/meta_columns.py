@@ -39,22 +39,35 @@ class ColumnList(Table, Container):
     CENTRAL CONTAINER FOR ALL COLUMNS
     SYNCHRONIZED WITH ELASTICSEARCH
     OPTIMIZED FOR THE PARTICULAR ACCESS PATTERNS USED
+
+    THE INDEXES ARE COPY-ON-WRITE: WRITERS HOLD self.locker, COPY THE
+    TABLES THEY CHANGE, AND REPLACE THE WHOLE MAP. READERS DO NOT LOCK.
     """
 
-    def __init__(self, es_cluster):
+    def __init__(self, es_cluster=None):
+        """
+        :param es_cluster: CLUSTER TO SYNCHRONIZE WITH; None FOR A LIST THAT
+                           IS ONLY IN MEMORY
+        """
         Table.__init__(self, META_COLUMNS_NAME)
-        self.data = {}  # MAP FROM ES_INDEX TO (abs_column_name to COLUMNS)
-        self.locker = Lock()
+        self.data = {}  # MAP FROM ES_INDEX TO (abs_column_name to TUPLE OF COLUMNS)
+        self.es_columns = {}  # MAP FROM ES_INDEX TO (es_column to TUPLE OF COLUMNS)
+        self.versions = {}  # MAP FROM ES_INDEX TO NUMBER OF CHANGES TO ITS COLUMNS
+        self.locker = Lock()  # ONLY FOR WRITERS
         self._schema = None
         self.dirty = False
         self.es_cluster = es_cluster
         self.es_index = None
         self.last_load = Null
         self.for_es_update = Queue(
-            "update columns to es"
+            "update columns to es",
+            max=None if es_cluster else 2 ** 30,  # NOTHING CONSUMES THE UPDATES WHEN IN MEMORY
         )  # HOLD (action, column) PAIR, WHERE action in ['insert', 'update']
-        self._db_load()
         self.delete_queue = Queue("delete columns from es")  # CONTAINS (es_index, after) PAIRS
+        if es_cluster is None:
+            return
+
+        self._db_load()
         Thread.run(
             "update " + META_COLUMNS_NAME, self._update_from_es, parent_thread=MAIN_THREAD
         ).release()
@@ -81,8 +94,9 @@ class ColumnList(Table, Container):
         )
         self.es_index.add_alias(META_COLUMNS_NAME)
 
+        with self.locker:
+            self._add_all(META_COLUMNS_DESC.columns)
         for c in META_COLUMNS_DESC.columns:
-            self._add(c)
             self.es_index.add({"value": c.__dict__()})
 
     def _db_load(self):
@@ -117,10 +131,9 @@ class ColumnList(Table, Container):
             )
 
             with Timer("adding columns to structure"):
-                for r in result.hits.hits._source:
-                    col = doc_to_column(r)
-                    if col:
-                        self._add(col)
+                columns = [doc_to_column(r) for r in result.hits.hits._source]
+                with self.locker:
+                    self._add_all(c for c in columns if c)
 
             Log.note("{{num}} columns loaded", num=result.hits.total)
             if not self.data.get(META_COLUMNS_NAME):
@@ -196,12 +209,11 @@ class ColumnList(Table, Container):
                         )
                         last_extract = now
 
+                        columns = [doc_to_column(r) for r in result.hits.hits._source]
+                        columns = [c for c in columns if c]
                         with self.locker:
-                            for r in result.hits.hits._source:
-                                c = doc_to_column(r)
-                                if c:
-                                    self._add(c)
-                                    self.last_load = MAX((self.last_load, c.last_updated))
+                            self._add_all(columns)
+                        self.last_load = MAX([self.last_load] + [c.last_updated for c in columns])
 
                     while not please_stop:
                         updates = self.for_es_update.pop_all()
@@ -222,24 +234,26 @@ class ColumnList(Table, Container):
             Log.note("done")
 
     def find(self, es_index, abs_column_name=None):
-        with self.locker:
-            if es_index.startswith("meta."):
+        if es_index.startswith("meta."):
+            with self.locker:
                 self._update_meta()
 
-            if not abs_column_name:
-                return [
-                    c
-                    for cs in self.data.get(es_index, {}).values()
-                    for c in cs
-                ]
-            else:
-                return self.data.get(es_index, {}).get(abs_column_name, [])
+        table = self.data.get(es_index, {})
+        if not abs_column_name:
+            return [c for cs in table.values() for c in cs]
+        else:
+            return list(table.get(abs_column_name, ()))
+
+    def find_es_column(self, es_index, es_column):
+        """
+        :return: COLUMNS OF es_index STORED IN es_column
+        """
+        return list(self.es_columns.get(es_index, {}).get(es_column, ()))
 
     def extend(self, columns):
         self.dirty = True
         with self.locker:
-            for column in columns:
-                self._add(column)
+            self._add_all(columns)
 
     def add(self, column):
         self.dirty = True
@@ -262,34 +276,131 @@ class ColumnList(Table, Container):
         self.for_es_update.add(column)
 
     def remove_table(self, table_name):
-        del self.data[table_name]
+        with self.locker:
+            self._remove_table(table_name)
+
+    def version(self, es_index):
+        """
+        :return: NUMBER THAT CHANGES WHEN THE COLUMNS OF es_index CHANGE
+        """
+        return self.versions.get(es_index, 0)
+
+    def _changed(self, es_index):
+        """
+        EXPECTS self.locker TO BE HELD
+        """
+        self.versions[es_index] = self.versions.get(es_index, 0) + 1
 
     def _add(self, column):
         """
         :param column: ANY COLUMN OBJECT
         :return:  None IF column IS canonical ALREADY (NET-ZERO EFFECT)
         """
-        if not isinstance(column, Column):
-            Log.warning("expecting a column not {{column|json}}", column=column)
-            return
-        columns_for_table = self.data.setdefault(column.es_index, {})
-        existing_columns = columns_for_table.setdefault(column.name, [])
-
-        for canonical in existing_columns:
-            if canonical is column:
-                return None
-            if canonical.es_type == column.es_type:
-                if column.last_updated > canonical.last_updated:
-                    for key in Column.__slots__:
-                        old_value = canonical[key]
-                        new_value = column[key]
-                        if new_value == old_value:
-                            pass  # NO NEED TO UPDATE WHEN NO CHANGE MADE (COMMON CASE)
-                        else:
-                            canonical[key] = new_value
-                return canonical
-        existing_columns.append(column)
-        return column
+        return self._add_all([column])[0]
+
+    def _add_all(self, columns):
+        """
+        EXPECTS self.locker TO BE HELD
+        EACH TABLE IS COPIED AT MOST ONCE, AND ONLY IF A COLUMN IS NEW
+        :param columns: ANY COLUMN OBJECTS
+        :return: LIST OF _add() RESULTS, ONE PER COLUMN
+        """
+        data = self.data
+        es_columns = self.es_columns
+        copied = set()  # TABLES WE MAY CHANGE IN PLACE
+        output = []
+        for column in columns:
+            if not isinstance(column, Column):
+                Log.warning("expecting a column not {{column|json}}", column=column)
+                output.append(None)
+                continue
+            es_index = column.es_index
+            existing_columns = data.get(es_index, {}).get(column.name, ())
+
+            for canonical in existing_columns:
+                if canonical is column:
+                    output.append(None)
+                    break
+                if canonical.es_type == column.es_type:
+                    if column.last_updated > canonical.last_updated:
+                        old_es_column = canonical.es_column
+                        for key in Column.__slots__:
+                            old_value = canonical[key]
+                            new_value = column[key]
+                            if new_value == old_value:
+                                pass  # NO NEED TO UPDATE WHEN NO CHANGE MADE (COMMON CASE)
+                            else:
+                                if key != "last_updated":
+                                    self._changed(es_index)
+                                canonical[key] = new_value
+                        if canonical.es_column != old_es_column:
+                            if not copied:
+                                data, es_columns = dict(data), dict(es_columns)
+                            if es_index not in copied:
+                                copied.add(es_index)
+                                data[es_index] = dict(data[es_index])
+                                es_columns[es_index] = dict(es_columns[es_index])
+                            _index_remove(es_columns[es_index], old_es_column, canonical)
+                            _index_add(es_columns[es_index], canonical.es_column, canonical)
+                    output.append(canonical)
+                    break
+            else:
+                if not copied:
+                    data, es_columns = dict(data), dict(es_columns)
+                if es_index not in copied:
+                    copied.add(es_index)
+                    data[es_index] = dict(data.get(es_index, {}))
+                    es_columns[es_index] = dict(es_columns.get(es_index, {}))
+                _index_add(data[es_index], column.name, column)
+                _index_add(es_columns[es_index], column.es_column, column)
+                self._changed(es_index)
+                output.append(column)
+
+        # PUBLISH
+        self.data = data
+        self.es_columns = es_columns
+        return output
+
+    def _remove_all(self, columns):
+        """
+        EXPECTS self.locker TO BE HELD
+        """
+        data = dict(self.data)
+        es_columns = dict(self.es_columns)
+        copied = set()
+        for column in columns:
+            es_index = column.es_index
+            if es_index not in data:
+                continue
+            if es_index not in copied:
+                copied.add(es_index)
+                data[es_index] = dict(data[es_index])
+                es_columns[es_index] = dict(es_columns[es_index])
+            _index_remove(data[es_index], column.name, column)
+            _index_remove(es_columns[es_index], column.es_column, column)
+            self._changed(es_index)
+            if not data[es_index]:
+                del data[es_index]
+                del es_columns[es_index]
+        self.data = data
+        self.es_columns = es_columns
+
+    def _remove_table(self, es_index):
+        """
+        EXPECTS self.locker TO BE HELD
+        :return: THE COLUMNS REMOVED
+        """
+        table = self.data.get(es_index)
+        if not table:
+            return []
+        data = dict(self.data)
+        es_columns = dict(self.es_columns)
+        del data[es_index]
+        es_columns.pop(es_index, None)
+        self._changed(es_index)
+        self.data = data
+        self.es_columns = es_columns
+        return [c for cs in table.values() for c in cs]
 
     def _update_meta(self):
         if not self.dirty:
@@ -344,20 +455,15 @@ class ColumnList(Table, Container):
 
     def clear(self, es_index, es_column=None, after=None):
         if es_column:
-            for c in self.data.get(es_index, {}).get(es_column, []):
+            for c in self.find_es_column(es_index, es_column):
                 self.remove(c, after=after)
             return
 
-        data = self.data
         with self.locker:
-            cols = data.get(es_index)
-            if not cols:
-                return
-            del data[es_index]
+            cols = self._remove_table(es_index)
 
-        for c in cols.values():
-            for cc in c:
-                mark_as_deleted(cc, after=after)
+        for c in cols:
+            mark_as_deleted(c, after=after)
 
     def update(self, command):
         self.dirty = True
@@ -372,48 +478,36 @@ class ColumnList(Table, Container):
             if eq.es_index:
                 if len(eq) == 1:
                     if unwraplist(command.clear) == ".":
-                        d = self.data
-                        i = eq.es_index
+                        now = Date.now()
                         with self.locker:
-                            cols = d[i]
-                            del d[i]
+                            cols = self._remove_table(eq.es_index)
 
                         for c in cols:
-                            self.remove(c)
+                            mark_as_deleted(c, now)
+                            self.for_es_update.add(c)
                         return
 
                     # FASTEST
-                    all_columns = self.data.get(eq.es_index, {}).values()
-                    with self.locker:
-                        columns = [c for cs in all_columns for c in cs]
-                elif eq.es_column and len(eq) == 2:
-                    # FASTER
-                    all_columns = self.data.get(eq.es_index, {}).values()
-                    with self.locker:
-                        columns = [
-                            c
-                            for cs in all_columns
-                            for c in cs
-                            if c.es_column == eq.es_column
-                        ]
-
+                    columns = self.find(eq.es_index)
                 else:
-                    # SLOWER
-                    all_columns = self.data.get(eq.es_index, {}).values()
-                    with self.locker:
-                        columns = [
-                            c
-                            for cs in all_columns
-                            for c in cs
-                            if all(
-                                c[k] == v for k, v in eq.items()
-                            )  # THIS LINE IS VERY SLOW
-                        ]
+                    # USE AN INDEX TO FIND THE CANDIDATES, THEN CHECK THE REST
+                    if eq.es_column:
+                        candidates = self.es_columns.get(eq.es_index, {}).get(eq.es_column, ())
+                    elif eq.name:
+                        candidates = self.data.get(eq.es_index, {}).get(eq.name, ())
+                    else:
+                        candidates = self.find(eq.es_index)
+                    columns = [
+                        c
+                        for c in candidates
+                        if all(c[k] == v for k, v in eq.items())
+                    ]
             else:
                 columns = list(self)
                 columns = jx.filter(columns, command.where)
 
             with self.locker:
+                removed = []
                 for col in columns:
                     DEBUG and Log.note(
                         "update column {{table}}.{{column}}",
@@ -424,21 +518,22 @@ class ColumnList(Table, Container):
                         if k == ".":
                             mark_as_deleted(col, Date.now())
                             self.for_es_update.add(col)
-                            lst = self.data[col.es_index]
-                            cols = lst[col.name]
-                            cols.remove(col)
-                            if len(cols) == 0:
-                                del lst[col.name]
-                                if len(lst) == 0:
-                                    del self.data[col.es_index]
+                            removed.append(col)
                             break
                         else:
+                            if col[k] != None:
+                                self._changed(col.es_index)
                             col[k] = None
                     else:
                         # DID NOT DELETE COLUMNM ("."), CONTINUE TO SET PROPERTIES
                         for k, v in command.set.items():
+                            if k != "last_updated" and col[k] != v:
+                                # A NEW last_updated ALONE DOES NOT CHANGE ANY PLAN
+                                self._changed(col.es_index)
                             col[k] = v
                         self.for_es_update.add(col)
+                if removed:
+                    self._remove_all(removed)
 
         except Exception as e:
             Log.error("should not happen", cause=e)
@@ -612,6 +707,18 @@ def doc_to_column(doc):
         return None
 
 
+def _index_add(index, key, column):
+    index[key] = index.get(key, ()) + (column,)
+
+
+def _index_remove(index, key, column):
+    remaining = tuple(c for c in index.get(key, ()) if c is not column)
+    if remaining:
+        index[key] = remaining
+    else:
+        index.pop(key, None)
+
+
 def mark_as_deleted(col, after):
     if col.last_updated > after:
         return
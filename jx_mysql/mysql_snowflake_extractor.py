@@ -12,9 +12,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy, copy
 
-from jx_mysql.mysql import MySQL, quote_column, sql_alias
+from jx_mysql.mysql import MySQL, quote_column, quote_list, sql_alias
 from jx_python import jx
 from mo_collections import UniqueIndex
 from mo_dots import (
@@ -32,12 +35,13 @@ from mo_dots import (
     set_default,
     startswith_field,
     listwrap,
+    from_data,
 )
 from mo_future import text, sort_using_key, first
 from mo_kwargs import override
 from mo_logs import Log, strings
 from mo_logs.exceptions import Explanation
-from mo_math.randoms import Random
+from mo_math import randoms
 from mo_sql import (
     SQL_SELECT,
     sql_list,
@@ -57,10 +61,15 @@ from mo_sql import (
     ConcatSQL,
     SQL_LIMIT,
     SQL_ONE,
+    SQL_IN,
+    SQL_WHERE,
 )
+from mo_threads import Future, Queue, Thread, THREAD_STOP
 from mo_times import Timer
 
 DEBUG = False
+SHARD_SIZE = 1000  # NUMBER OF FACT IDS EXTRACTED BY ONE QUERY
+NUM_CONNECTIONS = 4  # NUMBER OF SHARDS EXTRACTED AT ONCE, EACH ON ITS OWN CONNECTION
 
 
 class MySqlSnowflakeExtractor(object):
@@ -83,6 +92,7 @@ class MySqlSnowflakeExtractor(object):
         self.all_nested_paths = None
         self.nested_path_to_join = None
         self.columns = None
+        self.id_columns = None  # NAMES OF THE FACT TABLE id COLUMNS
 
         with Explanation("scan database", debug=DEBUG):
             self.db = MySQL(**kwargs.database)
@@ -182,7 +192,7 @@ class MySqlSnowflakeExtractor(object):
                     Log.note("Relation {{relation}} already exists", relation=r)
                     continue
 
-                to_add.constraint_name = Random.hex(20)
+                to_add.constraint_name = randoms.hex(20)
                 raw_relations.append(to_add)
             except Exception as e:
                 Log.error("Could not parse {{line|quote}}", line=r, cause=e)
@@ -774,6 +784,7 @@ class MySqlSnowflakeExtractor(object):
         self.all_nested_paths = all_nested_paths
         self.nested_path_to_join = nested_path_to_join
         self.columns = output_columns
+        self.id_columns = list(fact_table.id)
 
     def _compose_sql(self, get_ids):
         """
@@ -892,73 +903,254 @@ class MySqlSnowflakeExtractor(object):
         null_values = set(self.settings.null_values) | {None}
 
         doc_count = 0
+        row_count = [0]
+
+        def count(rows):
+            for row in rows:
+                row_count[0] += 1
+                yield row
 
-        columns = tuple(wrap(c) for c in self.columns)
         with Timer("Downloading from MySQL", verbose=DEBUG):
-            curr_doc = Null
-            row_count = 0
             if DEBUG:
                 cursor = list(cursor)
                 Log.note("{{data|json|limit(1000)}}", data=cursor)
-            for row in cursor:
-                row_count += 1
-                if please_stop:
-                    Log.error("Got `please_stop` signal")
+            for doc in _build_docs(self._layout(), null_values, count(cursor), please_stop):
+                append(doc["id"])
+                doc_count += 1
 
-                nested_path = []
-                next_object = Data()
+        Log.note(
+            "{{doc_count}} documents ({{row_count}} db records)",
+            doc_count=doc_count,
+            row_count=row_count[0],
+        )
 
-                for c, value in zip(columns, row):
-                    # columns ARE IN ORDER, FROM FACT ['.'] TO EVER-DEEPER-NESTED
-                    if value in null_values:
-                        # EVERY COLUMN THAT'S NOT NEEDED IS None
-                        continue
-                    if len(nested_path) < len(c.nested_path):
-                        # EACH COLUMN IS DEEPER THAN THE NEXT
-                        # THESE WILL BE THE id COLUMNS, WHICH ARE ALWAYS INCLUDED AND BEFORE ALL OTHER VALUES
-                        nested_path = unwrap(c.nested_path)
-                        next_object = Data()
-                    next_object[c.put] = value
-
-                if len(nested_path) == 1:
-                    # TOP LEVEL DOCUMENT, EMIT THE curr_doc AND ADVANCE
-                    if curr_doc:
-                        append(curr_doc["id"])
-                        doc_count += 1
-                    curr_doc = next_object
-                    continue
+    def extract(self, get_ids, please_stop=None):
+        """
+        GENERATOR OF DOCUMENTS FOR THE ids RETURNED BY get_ids
+
+        THE ids ARE SPLIT INTO SHARDS OF shard_size. EACH SHARD IS EXTRACTED
+        ON ONE OF num_connections CONNECTIONS, AND ITS DOCUMENTS ARE BUILT BY
+        ONE OF num_workers PROCESSES (num_workers=0 BUILDS THEM IN THIS
+        PROCESS). DOCUMENTS ARE EMITTED IN THE ORDER OF THE ids; NO MORE THAN
+        2*num_connections SHARDS ARE IN MEMORY AT ONCE
+
+        :param get_ids: SQL to get the ids, and used to select the documents returned
+        :param please_stop: SIGNAL TO STOP EARLY
+        """
+        shard_size = coalesce(self.settings.shard_size, SHARD_SIZE)
+        num_connections = coalesce(self.settings.num_connections, NUM_CONNECTIONS)
+        num_workers = coalesce(self.settings.num_workers, multiprocessing.cpu_count())
+        max_pending = 2 * num_connections
+
+        ids = self._get_ids(get_ids)
+        shards = [ids[i : i + shard_size] for i in range(0, len(ids), shard_size)]
+        DEBUG and Log.note("{{num}} ids in {{shards}} shards", num=len(ids), shards=len(shards))
 
-                # LET'S PLACE next_object AT THE CORRECT NESTED LEVEL
-                children = [curr_doc]
-                for parent_path, path in jx.pairs(reversed(nested_path)):
-                    relative_path = relative_field(path, parent_path)
+        layout = self._layout()
+        null_values = set(self.settings.null_values) | {None}
+        pool = (
+            ProcessPoolExecutor(num_workers, mp_context=multiprocessing.get_context("spawn"))
+            if num_workers
+            else None
+        )
+        todo = Queue("shards to extract", max=max_pending + 1, silent=True)
+
+        def extractor(please_stop):
+            db = None
+            try:
+                while not please_stop:
+                    work = todo.pop(till=please_stop)
+                    if work is THREAD_STOP or work is None:
+                        break
+                    shard, future = work
                     try:
-                        parent = children[-1]
-                        children = unwrap(parent[relative_path])
-                        if not children:
-                            children = parent[relative_path] = []
+                        if db is None:
+                            db = MySQL(kwargs=self.settings.database)
+                        with db.transaction():
+                            rows = list(db.query(self._shard_sql(get_ids, shard), stream=True, row_tuples=True))
+                        if pool:
+                            # result() RAISES BrokenProcessPool IF THE WORKER DIES
+                            future.assign(pool.submit(_build_shard, layout, null_values, rows).result)
+                        else:
+                            future.assign(_constant(_build_shard(layout, null_values, rows)))
                     except Exception as e:
-                        Log.error(
-                            "Document construction error: path={{path}}\nsteps={{steps}}\ndoc={{curr_doc}}\nnext={{next_object}}",
-                            path=path,
-                            steps=nested_path,
-                            curr_doc=curr_doc,
-                            next_object=next_object,
-                            cause=e
-                        )
+                        future.assign(_raise(e))
+            finally:
+                if db is not None:
+                    db.close()
+
+        pending = deque()  # Future FOR EACH SHARD IN FLIGHT, IN ORDER
+        remaining = iter(shards)
+
+        def dispatch():
+            while len(pending) < max_pending:
+                shard = next(remaining, None)
+                if shard is None:
+                    return
+                future = Future()
+                pending.append(future)
+                todo.add((shard, future))
+
+        threads = [
+            Thread.run("extract shard " + text(i), extractor)
+            for i in range(min(num_connections, len(shards)))
+        ]
+        try:
+            dispatch()
+            while pending and not please_stop:
+                docs = pending.popleft().wait()()
+                dispatch()
+                for doc in docs:
+                    yield wrap(doc)
+        finally:
+            todo.add(THREAD_STOP)
+            for t in threads:
+                t.stop()
+            for t in threads:
+                t.join()
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    def _get_ids(self, get_ids):
+        """
+        :return: LIST OF id TUPLES, IN THE ORDER THE DATABASE SORTS THEM
+        """
+        if not isinstance(get_ids, SQL):
+            Log.error("Expecting SQL to get some primary ids")
+        id_columns = [quote_column("s", c) for c in self.id_columns]
+        sql = ConcatSQL(
+            SQL_SELECT,
+            sql_list(id_columns),
+            SQL_FROM,
+            sql_alias(sql_iso(get_ids), "s"),
+            SQL_ORDERBY,
+            sql_list(id_columns),
+        )
+        with self.db.transaction():
+            rows = self.db.query(sql, row_tuples=True)
+        output = []
+        seen = set()
+        for row in rows:
+            row = tuple(row)
+            if row not in seen:
+                seen.add(row)
+                output.append(row)
+        return output
+
+    def _shard_sql(self, get_ids, shard):
+        """
+        :return: SQL FOR THE DOCUMENTS OF THE ids IN shard
+        """
+        id_columns = [quote_column("s", c) for c in self.id_columns]
+        shard_ids = ConcatSQL(
+            SQL_SELECT,
+            SQL_STAR,
+            SQL_FROM,
+            sql_alias(sql_iso(get_ids), "s"),
+            SQL_WHERE,
+            sql_iso(sql_list(id_columns)),
+            SQL_IN,
+            sql_iso(sql_list(quote_list(i) for i in shard)),
+        )
+        return self.get_sql(shard_ids)
 
-                children.append(next_object)
+    def _layout(self):
+        """
+        :return: (nested_path, put) FOR EACH COLUMN, FOR _build_docs()
+        """
+        return [(from_data(c.nested_path), c.put) for c in wrap(self.columns)]
+
+
+def _build_docs(layout, null_values, rows, please_stop=None):
+    """
+    GENERATOR OF DOCUMENTS
+    :param layout: (nested_path, put) FOR EACH COLUMN
+    :param null_values: VALUES THAT ARE NOT EMITTED
+    :param rows: ITERATOR OF RECORD TUPLES, IN THE ORDER OF get_sql()
+    """
+    curr_doc = Null
+    for row in rows:
+        if please_stop:
+            Log.error("Got `please_stop` signal")
+
+        nested_path = []
+        next_object = Data()
+
+        for (c_nested_path, put), value in zip(layout, row):
+            # columns ARE IN ORDER, FROM FACT ['.'] TO EVER-DEEPER-NESTED
+            if value in null_values:
+                # EVERY COLUMN THAT'S NOT NEEDED IS None
+                continue
+            if len(nested_path) < len(c_nested_path):
+                # EACH COLUMN IS DEEPER THAN THE NEXT
+                # THESE WILL BE THE id COLUMNS, WHICH ARE ALWAYS INCLUDED AND BEFORE ALL OTHER VALUES
+                nested_path = c_nested_path
+                next_object = Data()
+            next_object[put] = value
 
-            # DEAL WITH LAST RECORD
+        if len(nested_path) == 1:
+            # TOP LEVEL DOCUMENT, EMIT THE curr_doc AND ADVANCE
             if curr_doc:
-                append(curr_doc["id"])
-                doc_count += 1
+                yield curr_doc
+            curr_doc = next_object
+            continue
+
+        # LET'S PLACE next_object AT THE CORRECT NESTED LEVEL
+        children = [curr_doc]
+        for parent_path, path in jx.pairs(reversed(nested_path)):
+            relative_path = relative_field(path, parent_path)
+            try:
+                parent = children[-1]
+                children = unwrap(parent[relative_path])
+                if not children:
+                    children = parent[relative_path] = []
+            except Exception as e:
+                Log.error(
+                    "Document construction error: path={{path}}\nsteps={{steps}}\ndoc={{curr_doc}}\nnext={{next_object}}",
+                    path=path,
+                    steps=nested_path,
+                    curr_doc=curr_doc,
+                    next_object=next_object,
+                    cause=e
+                )
 
-        Log.note(
-            "{{doc_count}} documents ({{row_count}} db records)",
-            doc_count=doc_count,
-            row_count=row_count,
-        )
+        children.append(next_object)
+
+    # DEAL WITH LAST RECORD
+    if curr_doc:
+        yield curr_doc
+
+
+def _build_shard(layout, null_values, rows):
+    """
+    RUN IN A WORKER PROCESS
+    :return: LIST OF DOCUMENTS (AS PLAIN dicts, SO THEY CAN BE SENT BACK),
+             AS construct_docs() WOULD append() THEM
+    """
+    return [_plain(doc["id"]) for doc in _build_docs(layout, null_values, rows)]
+
+
+def _plain(value):
+    """
+    :return: value, WITH NO Data OR FlatList INSIDE
+    """
+    value = from_data(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _constant(value):
+    return lambda: value
+
+
+def _raise(e):
+    def raiser():
+        raise e
+
+    return raiser
 
 
 def full_name_string(column):
@@ -13,7 +13,9 @@ from mo_json import STRING
 from mo_dots import concat_field, set_default
 
 from jx_base import Facts, Column
+from jx_base.plan_cache import PlanCache
 from jx_sqlite.utils import UID, GUID, DIGITS_TABLE, ABOUT_TABLE
+from jx_sqlite.indexes import IndexAdvisor
 from jx_sqlite.namespace import Namespace
 from jx_sqlite.query_table import QueryTable
 from jx_sqlite.snowflake import Snowflake
@@ -45,14 +47,17 @@ class Container(object):
             self,
             db=None,  # EXISTING Sqlite3 DATBASE, OR CONFIGURATION FOR Sqlite DB
             filename=None,  # FILE FOR THE DATABASE (None FOR MEMORY DATABASE)
+            indexes=None,  # IndexAdvisor PARAMETERS, OR False TO NEVER ADD INDEXES
             kwargs=None   # See Sqlite parameters
     ):
         global _config
         if isinstance(db, Sqlite):
             self.db = db
+            self.own_db = False
         else:
             # PASS CALL PARAMETERS TO Sqlite
             self.db = db = Sqlite(filename=filename, kwargs=set_default({}, db, kwargs))
+            self.own_db = True
 
         self.db.create_new_functions()  # creating new functions: regexp
 
@@ -65,6 +70,11 @@ class Container(object):
 
         self.setup()
         self.ns = Namespace(db=db)
+        if indexes is False:
+            self.indexes = None
+        else:
+            self.indexes = IndexAdvisor(db=db, kwargs=indexes)
+        self.plans = PlanCache("sqlite")
         self.about = QueryTable("meta.about", self)
         self.next_uid = self._gen_ids()  # A DELIGHTFUL SOURCE OF UNIQUE INTEGERS
 
@@ -129,11 +139,13 @@ class Container(object):
     def remove_facts(self, fact_name):
         paths = self.ns.columns._snowflakes[fact_name]
         if paths:
+            dropped = [concat_field(fact_name, p[0]) for p in paths]
             with self.db.transaction() as t:
-                for p in paths:
-                    full_name = concat_field(fact_name, p[0])
+                for full_name in dropped:
                     t.execute("DROP TABLE "+quote_column(full_name))
             self.ns.columns.remove_table(fact_name)
+            if self.indexes:
+                self.indexes.forget(dropped)
 
     def get_or_create_facts(self, fact_name, uid=UID):
         """
@@ -167,3 +179,12 @@ class Container(object):
 
     def get_table(self, table_name):
         return QueryTable(table_name, self)
+
+    def close(self):
+        """
+        STOP THE IndexAdvisor, AND CLOSE THE DATABASE IF THIS CONTAINER OPENED IT
+        """
+        if self.indexes:
+            self.indexes.stop()
+        if self.own_db:
+            self.db.close()
@@ -0,0 +1,179 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http:# mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_base.expressions import NULL
+from mo_dots import listwrap
+from mo_json import STRUCT
+from mo_kwargs import override
+from mo_logs import Log
+from mo_threads import Lock, Queue, Thread, THREAD_STOP
+from jx_sqlite.sqlite import sql_create_index, sql_drop_index
+
+DEBUG = False
+MAX_COMPOSITE = 3  # MOST COLUMNS TO PUT IN A COMPOSITE INDEX
+INDEX_PREFIX = "__index__"
+CREATE = "create"
+DROP = "drop"
+
+
+class IndexAdvisor(object):
+    """
+    WATCH THE where AND groupby CLAUSES OF INCOMING QUERIES, AND BUILD
+    INDEXES ON THE COLUMNS THAT ARE USED OFTEN. USAGE DECAYS OVER TIME SO
+    INDEXES NO LONGER USED ARE DROPPED.
+    INDEXES ARE MADE AND DROPPED ON A BACKGROUND THREAD, NOT ON THE QUERY PATH
+    """
+
+    @override
+    def __init__(
+        self,
+        db,
+        create_threshold=10,  # NUMBER OF (DECAYED) USES BEFORE AN INDEX IS MADE
+        drop_threshold=1,  # INDEXES WITH LESS (DECAYED) USES ARE DROPPED
+        decay_period=1000,  # NUMBER OF OBSERVED QUERIES BETWEEN DECAY STEPS
+        decay=0.5,  # FRACTION OF USAGE REMAINING AFTER EACH DECAY STEP
+        kwargs=None,
+    ):
+        self.db = db
+        self.create_threshold = create_threshold
+        self.drop_threshold = drop_threshold
+        self.decay_period = decay_period
+        self.decay = decay
+        self.locker = Lock("index advisor")
+        self.usage = {}  # MAP FROM (table, tuple(es_column)) TO (DECAYED) USE COUNT
+        self.indexes = {}  # MAP FROM (table, tuple(es_column)) TO NAME OF INDEX WE MADE
+        self.pending = set()  # KEYS WAITING FOR THE WORKER TO MAKE AN INDEX
+        self.num_observed = 0
+        self.todo = Queue("index advisor", max=2 ** 30, silent=True)
+        self.worker = Thread.run("index advisor", self._worker)
+
+    def observe(self, query, schema):
+        """
+        RECORD THE COLUMNS USED BY query, AND QUEUE INDEX CHANGES IF NEEDED
+        :param query: QueryOp
+        :param schema: THE SCHEMA THE QUERY IS RUN AGAINST
+        """
+        try:
+            keys = set()
+            filter_columns = _columns(schema, query.where)
+            for c in filter_columns:
+                keys.add((c.es_index, (c.es_column,)))
+            for table, columns in _group_by_table(filter_columns).items():
+                if 1 < len(columns) <= MAX_COMPOSITE:
+                    keys.add((table, tuple(sorted(columns))))
+
+            for e in listwrap(query.groupby) + listwrap(query.edges):
+                group_columns = _columns(schema, e.value)
+                for c in group_columns:
+                    keys.add((c.es_index, (c.es_column,)))
+
+            with self.locker:
+                self.num_observed += 1
+                for key in keys:
+                    count = self.usage[key] = self.usage.get(key, 0) + 1
+                    if (
+                        count >= self.create_threshold
+                        and key not in self.indexes
+                        and key not in self.pending
+                    ):
+                        self.pending.add(key)
+                        self.todo.add((CREATE, key))
+
+                if self.num_observed % self.decay_period == 0:
+                    for key, count in list(self.usage.items()):
+                        count = count * self.decay
+                        if count >= self.drop_threshold:
+                            self.usage[key] = count
+                            continue
+                        del self.usage[key]
+                        if key in self.indexes:
+                            self.todo.add((DROP, key))
+        except Exception as e:
+            Log.warning("Problem advising on indexes", cause=e)
+
+    def forget(self, tables):
+        """
+        FORGET THE USAGE AND INDEXES OF DROPPED tables (sqlite DROPS THEIR INDEXES WITH THEM)
+        :param tables: NAMES OF THE DROPPED TABLES
+        """
+        tables = set(tables)
+        with self.locker:
+            for lookup in (self.usage, self.indexes):
+                for key in [k for k in lookup if k[0] in tables]:
+                    del lookup[key]
+
+    def stop(self):
+        self.todo.add(THREAD_STOP)
+        self.worker.join()
+
+    def _worker(self, please_stop):
+        while not please_stop:
+            todo = self.todo.pop(till=please_stop)
+            if todo is THREAD_STOP or todo is None:
+                break
+            action, key = todo
+            try:
+                if action == CREATE:
+                    self._create(*key)
+                    with self.locker:
+                        self.indexes[key] = index_name(*key)
+                        if key not in self.usage:
+                            # USAGE DECAYED AWAY WHILE THE INDEX WAS BEING MADE
+                            self.todo.add((DROP, key))
+                else:
+                    with self.locker:
+                        name = self.indexes.pop(key, None)
+                    if name:
+                        self._drop(name)
+            except Exception as e:
+                Log.warning("Problem changing index on {{table}} {{columns}}", table=key[0], columns=key[1], cause=e)
+            finally:
+                if action == CREATE:
+                    with self.locker:
+                        # NOT IN self.indexes IF IT FAILED, SO IT WILL BE TRIED AGAIN
+                        self.pending.discard(key)
+
+    def _create(self, table, columns):
+        DEBUG and Log.note("create index on {{table}} {{columns}}", table=table, columns=columns)
+        with self.db.transaction() as t:
+            t.execute(sql_create_index(index_name(table, columns), table, columns))
+
+    def _drop(self, name):
+        DEBUG and Log.note("drop index {{name}}", name=name)
+        with self.db.transaction() as t:
+            t.execute(sql_drop_index(name))
+
+
+def index_name(table, columns):
+    return INDEX_PREFIX + table + "." + ".".join(columns)
+
+
+def _columns(schema, expr):
+    """
+    :return: THE DATABASE COLUMNS expr REFERS TO
+    """
+    if expr is None or expr is NULL:
+        return []
+    return [
+        c
+        for v in expr.vars()
+        for c in schema.leaves(v.var)
+        if c.jx_type not in STRUCT
+    ]
+
+
+def _group_by_table(columns):
+    output = {}
+    for c in columns:
+        output.setdefault(c.es_index, set()).add(c.es_column)
+    return output
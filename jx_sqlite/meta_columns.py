@@ -49,6 +49,7 @@ class ColumnList(jx_base.Table, jx_base.Container):
     def __init__(self, db):
         Table.__init__(self, META_COLUMNS_NAME)
         self.data = {}  # MAP FROM fact_name TO (abs_column_name to COLUMNS)
+        self.versions = {}  # MAP FROM fact_name TO NUMBER OF CHANGES TO ITS COLUMNS
         self.locker = Lock()
         self._schema = None
         self.dirty = False
@@ -147,6 +148,16 @@ class ColumnList(jx_base.Table, jx_base.Container):
 
     def remove_table(self, table_name):
         del self.data[table_name]
+        self._changed(table_name)
+
+    def version(self, fact_name):
+        """
+        :return: NUMBER THAT CHANGES WHEN THE COLUMNS OF fact_name CHANGE
+        """
+        return self.versions.get(fact_name, 0)
+
+    def _changed(self, fact_name):
+        self.versions[fact_name] = self.versions.get(fact_name, 0) + 1
 
     def _add(self, column):
         """
@@ -169,9 +180,12 @@ class ColumnList(jx_base.Table, jx_base.Container):
                         elif new_value == old_value:
                             pass  # NO NEED TO UPDATE WHEN NO CHANGE MADE (COMMON CASE)
                         else:
+                            if key != "last_updated":
+                                self._changed(column.es_index)
                             canonical[key] = new_value
                 return canonical
         existing_columns.append(column)
+        self._changed(column.es_index)
         return column
 
     def _remove(self, column):
@@ -184,6 +198,7 @@ class ColumnList(jx_base.Table, jx_base.Container):
         for i, canonical in enumerate(existing_columns):
             if canonical is column:
                 del existing_columns[i]
+                self._changed(column.es_index)
                 return
 
     def _update_meta(self):
@@ -255,6 +270,7 @@ class ColumnList(jx_base.Table, jx_base.Container):
                         with self.locker:
                             cols = d[i]
                             del d[i]
+                            self._changed(i)
 
                         for c in cols:
                             mark_as_deleted(c)
@@ -302,6 +318,7 @@ class ColumnList(jx_base.Table, jx_base.Container):
                     for k in command["clear"]:
                         if k == ".":
                             mark_as_deleted(col)
+                            self._changed(col.es_index)
                             self.todo.add(col)
                             lst = self.data[col.es_index]
                             cols = lst[col.name]
@@ -312,10 +329,15 @@ class ColumnList(jx_base.Table, jx_base.Container):
                                     del self.data[col.es_index]
                             break
                         else:
+                            if col[k] != None:
+                                self._changed(col.es_index)
                             col[k] = None
                     else:
                         # DID NOT DELETE COLUMNM ("."), CONTINUE TO SET PROPERTIES
                         for k, v in command.set.items():
+                            if k != "last_updated" and col[k] != v:
+                                # A NEW last_updated ALONE DOES NOT CHANGE ANY PLAN
+                                self._changed(col.es_index)
                             col[k] = v
                         self.todo.add(col)
 
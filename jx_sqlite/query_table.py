@@ -17,6 +17,7 @@ from jx_base.container import type2container
 from jx_base.domains import SimpleSetDomain
 from jx_base.expressions import TupleOp, Variable, jx_expression
 from jx_base.language import is_op
+from jx_base.plan_cache import placeholders_for
 from jx_base.query import QueryOp
 from jx_python import jx
 from jx_sqlite.utils import GUID, sql_aggs, unique_name, untyped_column
@@ -24,14 +25,16 @@ from jx_sqlite.base_table import BaseTable
 from jx_sqlite.expressions._utils import SQLang
 from jx_sqlite.groupby_table import GroupbyTable
 from mo_collections.matrix import Matrix, index_to_coordinate
-from mo_dots import Data, Null, coalesce, concat_field, is_list, listwrap, relative_field, startswith_field, unwrap, \
-    unwraplist, wrap
+from mo_dots import Data, Null, coalesce, concat_field, is_list, listwrap, relative_field, split_field, startswith_field, \
+    unwrap, unwraplist, wrap
 from mo_future import text, transpose
 from mo_json import STRING, STRUCT
 from mo_logs import Log
 from jx_sqlite.sqlite import SQL_FROM, SQL_ORDERBY, SQL_SELECT, SQL_WHERE, sql_count, sql_iso, sql_list, SQL_CREATE, \
     SQL_AS, SQL_DELETE, ConcatSQL, JoinSQL, SQL_COMMA, SQL
-from jx_sqlite.sqlite import quote_column, sql_alias
+from jx_sqlite.sqlite import quote_column, quote_value, sql_alias
+
+FLAT_LIST = True  # list FORMAT ROWS ARE PLAIN dicts WHEN EVERY PROPERTY IS AT THE TOP LEVEL
 
 
 class QueryTable(GroupbyTable, Facts):
@@ -97,28 +100,23 @@ class QueryTable(GroupbyTable, Facts):
             query['from'] = self.name
         elif not startswith_field(query['from'], self.name):
             Log.error("Expecting table, or some nested table")
-        query = QueryOp.wrap(query, self.container, self.namespace)
-        new_table = "temp_" + unique_name()
-
-        if query.format == "container":
-            create_table = SQL_CREATE + quote_column(new_table) + SQL_AS
+        if query.get('format') == "container":
+            version = None  # EVERY RESULT IS A NEW TABLE
         else:
-            create_table = ""
+            version = self.namespace.columns.version(self.snowflake.fact_name)
+        plan = self.container.plans.get(query, version, self._plan)
+        query = plan.query
+        if self.container.indexes:
+            self.container.indexes.observe(query, self.schema)
+        if plan.command is None:
+            return self._set_op(query)
 
-        if query.groupby and query.format != "cube":
-            op, index_to_columns = self._groupby_op(query, self.schema)
-            command = create_table + op
-        elif query.groupby:
-            query.edges, query.groupby = query.groupby, query.edges
-            op, index_to_columns = self._edges_op(query, self.schema)
-            command = create_table + op
-            query.edges, query.groupby = query.groupby, query.edges
-        elif query.edges or any(a != "none" for a in listwrap(query.select).aggregate):
-            op, index_to_columns = self._edges_op(query, query.frum.schema)
-            command = create_table + op
+        new_table = "temp_" + unique_name()
+        index_to_columns = plan.index_to_columns
+        if query.format == "container":
+            command = SQL_CREATE + quote_column(new_table) + SQL_AS + plan.command
         else:
-            op = self._set_op(query)
-            return op
+            command = plan.command
 
         result = self.db.query(command)
 
@@ -266,23 +264,29 @@ class QueryTable(GroupbyTable, Facts):
             column_names = [None] * (max(c.push_column for c in index_to_columns.values()) + 1)
             for c in index_to_columns.values():
                 column_names[c.push_column] = c.push_column_name
+            decoder = [(s.push_column, s.push_child, s.num_push_columns, s.pull) for s in index_to_columns.values()]
+            has_objects = any(push_child != "." and not num for _, push_child, num, _ in decoder)
+            width = len(column_names)
             data = []
             for d in result.data:
-                row = [None for _ in column_names]
-                for s in index_to_columns.values():
-                    if s.push_child == ".":
-                        row[s.push_column] = s.pull(d)
-                    elif s.num_push_columns:
-                        tuple_value = row[s.push_column]
+                row = [None] * width
+                for push_column, push_child, num_push_columns, pull in decoder:
+                    if push_child == ".":
+                        row[push_column] = pull(d)
+                    elif num_push_columns:
+                        tuple_value = row[push_column]
                         if tuple_value == None:
-                            tuple_value = row[s.push_column] = [None] * s.num_push_columns
-                        tuple_value[s.push_child] = s.pull(d)
-                    elif row[s.push_column] == None:
-                        row[s.push_column] = Data()
-                        row[s.push_column][s.push_child] = s.pull(d)
+                            tuple_value = row[push_column] = [None] * num_push_columns
+                        tuple_value[push_child] = pull(d)
+                    elif row[push_column] == None:
+                        row[push_column] = Data()
+                        row[push_column][push_child] = pull(d)
                     else:
-                        row[s.push_column][s.push_child] = s.pull(d)
-                data.append(tuple(unwrap(r) for r in row))
+                        row[push_column][push_child] = pull(d)
+                if has_objects:
+                    data.append(tuple(unwrap(r) for r in row))
+                else:
+                    data.append(tuple(row))
 
             output = Data(
                 meta={"format": "table"},
@@ -319,6 +323,36 @@ class QueryTable(GroupbyTable, Facts):
                         meta={"format": "value"},
                         data=unwrap(data)
                     )
+            elif FLAT_LIST and all(
+                (c.push_child == "." or c.num_push_columns) and len(split_field(c.push_name)) == 1
+                for c in index_to_columns.values()
+            ):
+                # EVERY PROPERTY IS AT THE TOP LEVEL, SO ROWS CAN BE PLAIN dicts
+                decoder = [
+                    (split_field(c.push_name)[0], c.push_child, c.num_push_columns, c.pull)
+                    for c in index_to_columns.values()
+                ]
+                data = []
+                for d in result.data:
+                    row = {}
+                    for name, push_child, num_push_columns, pull in decoder:
+                        value = pull(d)
+                        if push_child == ".":
+                            if value is None:
+                                row.pop(name, None)
+                            else:
+                                row[name] = value
+                        else:
+                            tuple_value = row.get(name)
+                            if not tuple_value:
+                                tuple_value = row[name] = [None] * num_push_columns
+                            tuple_value[push_child] = value
+                    data.append(row)
+
+                output = Data(
+                    meta={"format": "list"},
+                    data=data
+                )
             else:
                 data = []
                 for rownum in result.data:
@@ -345,6 +379,24 @@ class QueryTable(GroupbyTable, Facts):
 
         return output
 
+    def _plan(self, query):
+        """
+        :param query: JSON QUERY
+        :return: QueryPlan, WITH THE SQL FOR ALL BUT SET OPERATIONS
+        """
+        query = QueryOp.wrap(query, self.container, self.namespace)
+        if query.groupby and query.format != "cube":
+            command, index_to_columns = self._groupby_op(query, self.schema)
+        elif query.groupby:
+            query.edges, query.groupby = query.groupby, query.edges
+            command, index_to_columns = self._edges_op(query, self.schema)
+            query.edges, query.groupby = query.groupby, query.edges
+        elif query.edges or any(a != "none" for a in listwrap(query.select).aggregate):
+            command, index_to_columns = self._edges_op(query, query.frum.schema)
+        else:
+            command, index_to_columns = None, None
+        return QueryPlan(query, command, index_to_columns)
+
     def query_metadata(self, query):
         frum, query['from'] = query['from'], self
         schema = self.snowflake.tables["."].schema
@@ -488,3 +540,36 @@ class Transaction:
 
 
 type2container["sqlite"] = QueryTable
+
+
+class QueryPlan(object):
+    """
+    THE NORMALIZED QUERY, AND ITS SQL
+    SET OPERATIONS ARE TRANSLATED WHEN RUN, SO HAVE NO command
+    """
+
+    __slots__ = ["query", "command", "index_to_columns"]
+
+    def __init__(self, query, command, index_to_columns):
+        self.query = query
+        self.command = command
+        self.index_to_columns = index_to_columns
+
+    def bind(self, literals):
+        """
+        :return: COPY OF THIS PLAN, WITH literals IN THE command
+        """
+        if self.command is None:
+            return None if literals else self
+        sql = self.command.sql
+        for placeholder, literal in placeholders_for(literals).items():
+            quoted = quote_value(placeholder).sql
+            count = sql.count(quoted)
+            if not count or sql.count(placeholder) != count:
+                # MISSING, OR NOT ONLY USED AS A STRING LITERAL
+                return None
+            sql = sql.replace(quoted, quote_value(literal).sql)
+        return QueryPlan(self.query, SQL(sql), self.index_to_columns)
+
+    def signature(self):
+        return self.command.sql
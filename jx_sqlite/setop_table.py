@@ -11,6 +11,8 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+from itertools import islice
+
 from jx_base import Column
 from jx_base.language import is_op
 from jx_base.queries import get_property_name
@@ -19,16 +21,17 @@ from jx_sqlite.expressions._utils import SQLang, sql_type_to_json_type
 from jx_sqlite.expressions.boolean_op import BooleanOp
 from jx_sqlite.expressions.leaves_op import LeavesOp
 from jx_sqlite.insert_table import InsertTable
-from mo_dots import Data, Null, concat_field, is_list, listwrap, literal_field, startswith_field, unwrap, unwraplist, \
-    exists
+from mo_dots import Data, Null, concat_field, is_list, listwrap, literal_field, startswith_field, unwraplist
 from mo_future import text, unichr
 from mo_json import IS_NULL, STRUCT
 from mo_math import UNION
 from mo_times import Date
-from jx_sqlite.sqlite import SQL_AND, SQL_FROM, SQL_IS_NULL, SQL_LEFT_JOIN, SQL_LIMIT, SQL_NULL, SQL_ON, \
+from jx_sqlite.sqlite import SQL_AND, SQL_FROM, SQL_IS_NULL, SQL_LEFT_JOIN, SQL_NULL, SQL_ON, \
     SQL_ORDERBY, SQL_SELECT, SQL_TRUE, SQL_UNION_ALL, SQL_WHERE, sql_iso, sql_list, ConcatSQL, SQL_STAR, SQL_EQ, \
     SQL_ZERO
-from jx_sqlite.sqlite import quote_column, quote_value, sql_alias
+from jx_sqlite.sqlite import quote_column, sql_alias
+
+FLAT_SET_OP = True  # DECODE SET QUERIES WITH NO NESTED TABLES WITHOUT MAKING DOCUMENTS
 
 
 class SetOpTable(InsertTable):
@@ -85,6 +88,9 @@ class SetOpTable(InsertTable):
                         sorts.append(quote_column(column_alias) + SQL_IS_NULL)
                         sorts.append(quote_column(column_alias))
 
+        # ASSIGN INNER PROPERTIES, OR IS FACT EXPECTED TO BE A SINGLE VALUE, NOT AN OBJECT?
+        select_is_list = is_list(query.select) or is_op(query.select.value, LeavesOp)
+
         primary_doc_details = Data()
         # EVERY SELECT STATEMENT THAT WILL BE REQUIRED, NO MATTER THE DEPTH
         # WE WILL CREATE THEM ACCORDING TO THE DEPTH REQUIRED
@@ -95,6 +101,7 @@ class SetOpTable(InsertTable):
                 "sub_table": sub_table,
                 "children": [],
                 "index_to_column": {},
+                "decoder": [],  # (index, relative_field) PAIRS, TO MAKE THE DOCUMENT FROM A ROW
                 "nested_path": nested_path
             }
 
@@ -184,6 +191,11 @@ class SetOpTable(InsertTable):
                 finally:
                     si += 1
 
+            nested_doc_details['decoder'] = [
+                (i, concat_field(c.push_name, c.push_child) if select_is_list else c.push_child)
+                for i, c in sorted(nested_doc_details['index_to_column'].items())
+            ]
+
         where_clause = BooleanOp(query.where).partial_eval().to_sql(schema, boolean=True)[0].sql.b
         unsorted_sql = self._make_sql_for_one_nest_in_set_op(
             ".",
@@ -196,17 +208,58 @@ class SetOpTable(InsertTable):
         for n, _ in self.snowflake.tables:
             sorts.append(quote_column(COLUMN + text(index_to_uid[n])))
 
+        # NO SQL LIMIT: IT WOULD COUNT JOINED ROWS, NOT DOCUMENTS
         ordered_sql = ConcatSQL(
             SQL_SELECT, SQL_STAR,
             SQL_FROM, sql_iso(unsorted_sql),
-            SQL_ORDERBY, sql_list(sorts),
-            SQL_LIMIT, quote_value(query.limit)
+            SQL_ORDERBY, sql_list(sorts)
         )
-        result = self.db.query(ordered_sql)
+
+        def _make_doc(row, nested_doc_details):
+            """
+            :return: THE DOCUMENT DESCRIBED BY THE nested_doc_details COLUMNS OF row
+            """
+            doc = Null
+            for i, relative_field in nested_doc_details['decoder']:
+                value = row[i]
+                if value is None or value == "":
+                    continue
+                if relative_field == ".":
+                    doc = value
+                else:
+                    if doc is Null:
+                        doc = Data()
+                    doc[relative_field] = value
+            return doc
+
+        def _add_children(rows, row, nested_doc_details, doc_id, doc):
+            """
+            CONSUME THE ROWS OF THE NESTED DOCUMENTS OF doc_id, AND ASSIGN THEM TO doc
+            :return: doc, WITH ITS NESTED PROPERTIES
+            """
+            curr_nested_path = nested_doc_details['nested_path'][0]
+            for child_details in nested_doc_details['children']:
+                # EACH NESTED TABLE MUST BE ASSEMBLED INTO A LIST OF OBJECTS
+                child_id = row[child_details['id_coord']]
+                if child_id is not None:
+                    nested_value = _accumulate_nested(rows, row, child_details, doc_id, nested_doc_details['id_coord'])
+                    if nested_value != None:
+                        push_name = child_details['nested_path'][0]
+                        if is_list(query.select) or is_op(query.select.value, LeavesOp):
+                            # ASSIGN INNER PROPERTIES
+                            relative_field = relative_field(push_name, curr_nested_path)
+                        else:  # FACT IS EXPECTED TO BE A SINGLE VALUE, NOT AN OBJECT
+                            relative_field = "."
+
+                        if relative_field == ".":
+                            doc = unwraplist(nested_value)
+                        else:
+                            doc[relative_field] = unwraplist(nested_value)
+            return doc
 
         def _accumulate_nested(rows, row, nested_doc_details, parent_doc_id, parent_id_coord):
             """
-            :param rows: REVERSED STACK OF ROWS (WITH push() AND pop())
+            :param rows: _RowStream OF ROWS (WITH push() AND pop())
             :param row: CURRENT ROW BEING EXTRACTED
             :param nested_doc_details: {
                     "nested_path": wrap_nested_path(nested_path),
@@ -226,62 +279,56 @@ class SetOpTable(InsertTable):
                 doc_id = row[id_coord]
 
                 if doc_id == None or (parent_id_coord is not None and row[parent_id_coord] != parent_doc_id):
-                    rows.append(row)  # UNDO PREVIOUS POP (RECORD IS NOT A NESTED RECORD OF parent_doc)
+                    rows.push(row)  # UNDO PREVIOUS POP (RECORD IS NOT A NESTED RECORD OF parent_doc)
                     return output
 
                 if doc_id != previous_doc_id:
                     previous_doc_id = doc_id
-                    doc = Null
-                    curr_nested_path = nested_doc_details['nested_path'][0]
-                    index_to_column = nested_doc_details['index_to_column'].items()
-                    for i, c in index_to_column:
-                        value = row[i]
-                        if is_list(query.select) or is_op(query.select.value, LeavesOp):
-                            # ASSIGN INNER PROPERTIES
-                            relative_field = concat_field(c.push_name, c.push_child)
-                        else:  # FACT IS EXPECTED TO BE A SINGLE VALUE, NOT AN OBJECT
-                            relative_field = c.push_child
-
-                        if relative_field == ".":
-                            if exists(value):
-                                doc = value
-                        elif exists(value):
-                            if doc is Null:
-                                doc = Data()
-                            doc[relative_field] = value
-
-                for child_details in nested_doc_details['children']:
-                    # EACH NESTED TABLE MUST BE ASSEMBLED INTO A LIST OF OBJECTS
-                    child_id = row[child_details['id_coord']]
-                    if child_id is not None:
-                        nested_value = _accumulate_nested(rows, row, child_details, doc_id, id_coord)
-                        if nested_value != None:
-                            push_name = child_details['nested_path'][0]
-                            if is_list(query.select) or is_op(query.select.value, LeavesOp):
-                                # ASSIGN INNER PROPERTIES
-                                relative_field = relative_field(push_name, curr_nested_path)
-                            else:  # FACT IS EXPECTED TO BE A SINGLE VALUE, NOT AN OBJECT
-                                relative_field = "."
-
-                            if relative_field == ".":
-                                doc = unwraplist(nested_value)
-                            else:
-                                doc[relative_field] = unwraplist(nested_value)
-
+                    doc = _make_doc(row, nested_doc_details)
+                doc = _add_children(rows, row, nested_doc_details, doc_id, doc)
                 output.append(doc)
 
-                try:
-                    row = rows.pop()
-                except IndexError:
+                row = rows.pop()
+                if row is None:
                     return output
 
+        def _stream_docs(rows):
+            """
+            GENERATE EACH TOP-LEVEL DOCUMENT AS SOON AS ITS LAST NESTED ROW IS SEEN
+            """
+            previous_doc_id = None
+            doc = Null
+            id_coord = primary_doc_details['id_coord']
+
+            while True:
+                row = rows.pop()
+                if row is None:
+                    return
+                doc_id = row[id_coord]
+                if doc_id == None:
+                    return
+                if doc_id != previous_doc_id:
+                    previous_doc_id = doc_id
+                    doc = _make_doc(row, primary_doc_details)
+                yield _add_children(rows, row, primary_doc_details, doc_id, doc)
+
         cols = tuple([i for i in index_to_column.values() if i.push_name != None])
-        rows = list(reversed(unwrap(result.data)))
-        if rows:
-            row = rows.pop()
-            data = _accumulate_nested(rows, row, primary_doc_details, None, None)
-        else:
-            data = result.data
+        if (
+            FLAT_SET_OP
+            and query.format != "cube"
+            and len(self.snowflake.query_paths) == 1
+            and all(c.push_child == "." and c.push_name != "." for c in cols)
+        ):
+            return _flat_set_op(self.db, ordered_sql, query, select_is_list, index_to_column)
+
+        rows = _RowStream(self.db.stream(ordered_sql))
+        try:
+            # limit IS THE NUMBER OF DOCUMENTS, NOT THE NUMBER OF JOINED ROWS
+            # THE CURSOR IS PAGED, BUT THE RESPONSE IS ONE Data OBJECT, SO
+            # THE DOCUMENTS ARE STILL HELD IN MEMORY: O(limit) DOCUMENTS
+            data = list(islice(_stream_docs(rows), query.limit))
+        finally:
+            rows.close()
 
         if query.format == "cube":
             # for f, full_name in self.snowflake.tables:
@@ -556,6 +603,90 @@ class SetOpTable(InsertTable):
         return sql
 
 
+def _flat_set_op(db, sql, query, select_is_list, index_to_column):
+    """
+    DECODE THE ROWS STRAIGHT INTO THE table OR list FORMAT, WITHOUT MAKING
+    DOCUMENTS. ONLY FOR QUERIES WITH NO NESTED TABLES, AND ONLY PRIMITIVE
+    VALUES IN EACH COLUMN
+    :param index_to_column: MAP FROM ROW INDEX TO ColumnMapping
+    """
+    # LATER COLUMNS WIN, AS THEY DO WHEN ASSIGNED TO A DOCUMENT
+    columns = sorted((i, c) for i, c in index_to_column.items() if c.push_name != None)
+    stream = db.stream(sql)
+    try:
+        rows = islice(stream, query.limit)
+        if not select_is_list:
+            indexes = [i for i, _ in columns]
+            data = []
+            for row in rows:
+                value = None
+                for i in indexes:
+                    v = row[i]
+                    if v is not None and v != "":
+                        value = v
+                data.append(value)
+            if query.format == "table":
+                return Data(
+                    meta={"format": "table"},
+                    header=listwrap(query.select).name,
+                    data=[[v] for v in data]
+                )
+            return Data(meta={"format": "list"}, data=data)
+
+        if query.format == "table":
+            header = [None] * (max(c.push_column for _, c in columns) + 1)
+            for _, c in columns:
+                header[c.push_column] = c.push_column_name
+            decoder = [(i, c.push_column) for i, c in columns]
+            empty = [None] * len(header)
+            new_row = empty.copy
+        else:
+            empty = {c.push_column_name: None for _, c in columns}
+            decoder = [(i, c.push_column_name) for i, c in columns]
+            new_row = empty.copy
+
+        data = []
+        for row in rows:
+            output = new_row()
+            for i, k in decoder:
+                v = row[i]
+                if v is not None and v != "":
+                    output[k] = v
+            data.append(output)
+    finally:
+        stream.close()
+
+    if query.format == "table":
+        return Data(meta={"format": "table"}, header=header, data=data)
+    return Data(meta={"format": "list"}, data=data)
+
+
+class _RowStream(object):
+    """
+    ITERATOR OF ROWS THAT CAN push() BACK A ROW THAT WAS pop()ED
+    """
+
+    __slots__ = ["rows", "pushed"]
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pushed = []
+
+    def pop(self):
+        """
+        :return: NEXT ROW, OR None IF NO MORE
+        """
+        if self.pushed:
+            return self.pushed.pop()
+        return next(self.rows, None)
+
+    def push(self, row):
+        self.pushed.append(row)
+
+    def close(self):
+        self.rows.close()
+
+
 def test_dots(cols):
     for c in cols:
         if "\\" in c.push_column_name:
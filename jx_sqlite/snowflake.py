@@ -9,7 +9,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import jx_base
-from jx_sqlite.utils import quoted_ORDER, quoted_PARENT, quoted_UID, untyped_column
+from jx_sqlite.utils import ORDER, PARENT, quoted_ORDER, quoted_PARENT, quoted_UID, untyped_column
 from jx_sqlite.expressions._utils import SQL_NESTED_TYPE
 from jx_sqlite.schema import Schema
 from jx_sqlite.sqlite import quote_column
@@ -18,7 +18,8 @@ from mo_dots import concat_field, wrap
 from mo_future import text
 from mo_json import NESTED
 from mo_logs import Log
-from jx_sqlite.sqlite import SQL_FROM, SQL_LIMIT, SQL_SELECT, SQL_STAR, SQL_ZERO, sql_iso, sql_list, SQL_CREATE, SQL_AS
+from jx_sqlite.sqlite import SQL_FROM, SQL_LIMIT, SQL_SELECT, SQL_STAR, SQL_ZERO, sql_iso, sql_list, SQL_CREATE, SQL_AS, \
+    sql_create_index
 
 
 class Snowflake(jx_base.Snowflake):
@@ -124,6 +125,10 @@ class Snowflake(jx_base.Snowflake):
             )
             with self.namespace.db.transaction() as t:
                 t.execute(command)
+                # NESTED ROWS ARE ALWAYS JOINED ON PARENT, AND SORTED BY ORDER
+                t.execute(sql_create_index(
+                    parent_index_name(destination_table), destination_table, [PARENT, ORDER]
+                ))
                 self.add_table([new_path]+column.nested_path)
 
         # TEST IF THERE IS ANY DATA IN THE NEW NESTED ARRAY
@@ -182,3 +187,6 @@ class Snowflake(jx_base.Snowflake):
     def query_paths(self):
         return self.namespace.columns._snowflakes[self.fact_name]
 
+
+def parent_index_name(table):
+    return concat_field(table, "__parent_index__")
@@ -17,7 +17,7 @@ from collections import Mapping, namedtuple
 
 from jx_base import jx_expression
 from jx_python.convert import table2csv
-from mo_dots import Data, coalesce, unwraplist, listwrap, wrap
+from mo_dots import Data, coalesce, unwraplist, listwrap, wrap, unwrap
 from mo_files import File
 from mo_future import allocate_lock as _allocate_lock, text, first, zip_longest
 from mo_json import BOOLEAN, INTEGER, NESTED, NUMBER, OBJECT, STRING
@@ -37,6 +37,7 @@ DOUBLE_TRANSACTION_ERROR = (
     "You can not query outside a transaction you have open already"
 )
 TOO_LONG_TO_HOLD_TRANSACTION = 10
+PAGE_SIZE = 1000  # NUMBER OF ROWS stream() PULLS FROM THE CURSOR AT A TIME
 
 _sqlite3 = None
 _load_extension_warning_sent = False
@@ -202,12 +203,46 @@ class Sqlite(DB):
         :param command: COMMAND FOR SQLITE
         :return: list OF RESULTS
         """
+        result = Data()
+        self._wait_for(command, result)
+        return result
+
+    def stream(self, command, page_size=PAGE_SIZE):
+        """
+        GENERATOR OF ROWS FOR command; ROWS ARE PULLED FROM THE CURSOR
+        page_size AT A TIME, SO THE WHOLE RESULT IS NEVER IN MEMORY.
+        CLOSING THE GENERATOR EARLY WILL CLOSE THE CURSOR
+
+        THE CURSOR SHARES THE ONE CONNECTION, SO THE PAGES ARE READ INSIDE A
+        TRANSACTION: COMMANDS FROM OTHER THREADS ARE DELAYED UNTIL THE
+        GENERATOR IS EXHAUSTED OR CLOSED, AND CAN NOT CHANGE THE ROWS BETWEEN
+        PAGES. DO NOT HOLD THE GENERATOR OPEN LONGER THAN NEEDED
+        :param command: COMMAND FOR SQLITE
+        :param page_size: NUMBER OF ROWS TO FETCH PER TRIP TO THE WORKER
+        """
+        result = Data(page_size=page_size)
+        with self.transaction() as t:
+            try:
+                t._wait_for(command, result)
+                while True:
+                    for row in unwrap(result.data):
+                        yield row
+                    if not result.cursor:
+                        return
+                    t._wait_for(FETCH, result)
+            finally:
+                if result.cursor:
+                    t._wait_for(CLOSE_CURSOR, result)
+
+    def _wait_for(self, command, result):
+        """
+        SEND command TO THE WORKER, AND BLOCK UNTIL result IS FILLED
+        """
         if self.closed:
             Log.error("database is closed")
 
         signal = _allocate_lock()
         signal.acquire()
-        result = Data()
         trace = get_stacktrace(1) if self.get_trace else None
 
         if self.get_trace:
@@ -217,12 +252,11 @@ class Sqlite(DB):
                     if t.thread is current_thread:
                         Log.error(DOUBLE_TRANSACTION_ERROR)
 
-        self.queue.add(CommandItem(command, result, signal, trace, None))
+        self.queue.add(CommandItem(command, result, signal, trace, None, None))
         signal.acquire()
 
         if result.exception:
             Log.error("Problem with Sqlite call", cause=result.exception)
-        return result
 
     def close(self):
         """
@@ -233,7 +267,7 @@ class Sqlite(DB):
         self.closed = True
         signal = _allocate_lock()
         signal.acquire()
-        self.queue.add(CommandItem(COMMIT, None, signal, None, None))
+        self.queue.add(CommandItem(COMMIT, None, signal, None, None, None))
         signal.acquire()
         self.worker.please_stop.go()
         return
@@ -304,7 +338,7 @@ class Sqlite(DB):
         )
 
     def _close_transaction(self, command_item):
-        query, result, signal, trace, transaction = command_item
+        query, result, signal, trace, transaction, _ = command_item
 
         transaction.end_of_life = True
         with self.locker:
@@ -365,7 +399,7 @@ class Sqlite(DB):
             self.db.close()
 
     def _process_command_item(self, command_item):
-        query, result, signal, trace, transaction = command_item
+        query, result, signal, trace, transaction, _ = command_item
 
         with Timer("SQL Timing", verbose=self.debug):
             if transaction is None:
@@ -423,7 +457,7 @@ class Sqlite(DB):
 
                     if query in [COMMIT, ROLLBACK]:
                         self._close_transaction(
-                            CommandItem(ROLLBACK, result, signal, trace, transaction)
+                            CommandItem(ROLLBACK, result, signal, trace, transaction, None)
                         )
 
                     signal.release()
@@ -435,6 +469,15 @@ class Sqlite(DB):
                     self._close_transaction(command_item)
                     return
 
+                # CONTINUE A stream()
+                if query is FETCH:
+                    self._fetch_page(result.cursor, result)
+                    return
+                if query is CLOSE_CURSOR:
+                    result.cursor.close()
+                    result.cursor = None
+                    return
+
                 # EXECUTE QUERY
                 self.last_command_item = command_item
                 self.debug and Log.note(FORMAT_COMMAND, command=query)
@@ -443,6 +486,9 @@ class Sqlite(DB):
                 result.header = (
                     [d[0] for d in curr.description] if curr.description else None
                 )
+                if result.page_size:
+                    self._fetch_page(curr, result)
+                    return
                 result.data = curr.fetchall()
                 if self.debug and result.data:
                     csv = table2csv(list(result.data))
@@ -463,6 +509,18 @@ class Sqlite(DB):
                 signal.release()
 
 
+    def _fetch_page(self, curr, result):
+        """
+        FILL result WITH THE NEXT PAGE FROM curr; KEEP curr ONLY IF THERE MAY BE MORE
+        """
+        result.data = rows = curr.fetchmany(result.page_size)
+        if len(rows) < result.page_size:
+            curr.close()
+            result.cursor = None
+        else:
+            result.cursor = curr
+
+
 class Transaction(object):
     def __init__(self, db, parent, thread):
         self.db = db
@@ -495,12 +553,16 @@ class Transaction(object):
             self.db.available_transactions.append(output)
         return output
 
-    def execute(self, command):
+    def execute(self, command, params=None):
+        """
+        :param command: COMMAND FOR SQLITE
+        :param params: OPTIONAL SEQUENCE OF VALUES BOUND TO THE ? PLACEHOLDERS IN command
+        """
         if self.end_of_life:
             Log.error("Transaction is dead")
         trace = get_stacktrace(1) if self.db.get_trace else None
         with self.locker:
-            self.todo.append(CommandItem(command, None, None, trace, self))
+            self.todo.append(CommandItem(command, None, None, trace, self, params))
 
     def do_all(self):
         # ENSURE PARENT TRANSACTION IS UP TO DATE
@@ -518,23 +580,32 @@ class Transaction(object):
             # RUN THEM
             for c in todo:
                 self.db.debug and Log.note(FORMAT_COMMAND, command=c.command, file=c.trace[0]['file'], line=c.trace[0]['line'])
-                self.db.db.execute(text(c.command))
+                if c.params is None:
+                    self.db.db.execute(text(c.command))
+                else:
+                    self.db.db.execute(text(c.command), c.params)
         except Exception as e:
             Log.error("problem running commands", current=c, cause=e)
 
     def query(self, query):
+        result = Data()
+        self._wait_for(query, result)
+        return result
+
+    def _wait_for(self, command, result):
+        """
+        SEND command TO THE WORKER, AND BLOCK UNTIL result IS FILLED
+        """
         if self.db.closed:
             Log.error("database is closed")
 
         signal = _allocate_lock()
         signal.acquire()
-        result = Data()
-        trace = get_stacktrace(1) if self.db.get_trace else None
-        self.db.queue.add(CommandItem(query, result, signal, trace, self))
+        trace = get_stacktrace(2) if self.db.get_trace else None
+        self.db.queue.add(CommandItem(command, result, signal, trace, self, None))
         signal.acquire()
         if result.exception:
             Log.error("Problem with Sqlite call", cause=result.exception)
-        return result
 
     def rollback(self):
         self.query(ROLLBACK)
@@ -544,7 +615,7 @@ class Transaction(object):
 
 
 CommandItem = namedtuple(
-    "CommandItem", ("command", "result", "is_done", "trace", "transaction")
+    "CommandItem", ("command", "result", "is_done", "trace", "transaction", "params")
 )
 
 _simple_word = re.compile(r"^\w+$", re.UNICODE)
@@ -691,6 +762,26 @@ def sql_create(table, properties, primary_key=None, unique=None):
     return ConcatSQL(*acc)
 
 
+def sql_create_index(name, table, columns):
+    """
+    :param name: NAME OF THE INDEX
+    :param table: NAME OF THE TABLE TO INDEX
+    :param columns: COLUMN, OR LIST OF COLUMNS, IN INDEX ORDER
+    :return: SQL
+    """
+    return ConcatSQL(
+        SQL_CREATE_INDEX,
+        quote_column(name),
+        SQL_ON,
+        quote_column(table),
+        sql_iso(sql_list([quote_column(c) for c in listwrap(columns)])),
+    )
+
+
+def sql_drop_index(name):
+    return ConcatSQL(SQL_DROP_INDEX, quote_column(name))
+
+
 def sql_insert(table, records):
     records = listwrap(records)
     keys = list({k for r in records for k in r.keys()})
@@ -705,9 +796,14 @@ def sql_insert(table, records):
     )
 
 
+SQL_CREATE_INDEX = SQL("\nCREATE INDEX IF NOT EXISTS\n")
+SQL_DROP_INDEX = SQL("\nDROP INDEX IF EXISTS\n")
+
 BEGIN = "BEGIN"
 COMMIT = "COMMIT"
 ROLLBACK = "ROLLBACK"
+FETCH = object()  # WORKER COMMAND TO PULL THE NEXT PAGE OF A stream()
+CLOSE_CURSOR = object()  # WORKER COMMAND TO ABANDON A stream()
 
 
 def _upgrade():
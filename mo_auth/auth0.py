@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import requests
 from flask import request, session, Response, redirect
 from jose import jwt
@@ -7,22 +9,26 @@ from mo_sql import SQL_DELETE, SQL_FROM, SQL_WHERE, ConcatSQL
 from jx_sqlite.sqlite import Sqlite, sql_create, sql_insert, sql_query, quote_column, sql_eq
 from mo_dots import Data, wrap, unwrap
 from mo_files import URL, mimetype
-from mo_future import decorate, first, text
+from mo_future import decorate, text
 from mo_json import value2json, json2value
 from mo_kwargs import override
 from mo_logs import Log
 from mo_math import base642bytes, bytes2base64URL, rsa_crypto, crypto
 from mo_math.hashes import sha256
+from mo_threads import Lock
 from mo_threads.threads import register_thread
 from mo_http import http
 from mo_times import Date
 from mo_times.dates import parse, RFC1123
-from pyLibrary.env import http
 from pyLibrary.env.flask_wrappers import cors_wrapper, add_flask_rule, limit_body
 
 DEBUG = True
 REQUEST_LIMIT = 10_000
 LEEWAY = parse("minute").seconds
+JWKS_TTL = parse("hour").seconds  # HOW LONG TO TRUST THE KEY SET
+JWKS_MIN_REFRESH = parse("minute").seconds  # UNKNOWN kid WILL NOT REFRESH KEY SET MORE OFTEN THAN THIS
+OPAQUE_TOKEN_TTL = parse("5minute").seconds  # OPAQUE TOKENS HAVE NO exp, SO TRUST userinfo THIS LONG
+TOKEN_CACHE_SIZE = 10_000  # MOST VERIFIED TOKENS TO REMEMBER
 
 
 class Authenticator(object):
@@ -35,6 +41,13 @@ class Authenticator(object):
         self.permissions = permissions
         self.session_manager = session_manager
 
+        self.jwks_locker = Lock("jwks")
+        self.jwks = {}  # MAP FROM kid TO KEY
+        self.jwks_expires = 0
+        self.jwks_last_fetch = 0
+        self.verified_jwt = TokenCache(TOKEN_CACHE_SIZE)
+        self.verified_opaque = TokenCache(TOKEN_CACHE_SIZE)
+
         # ATTACH ENDPOINTS TO FLASK APP
         endpoints = auth0.endpoints
         if not endpoints.login or not endpoints.logout or not endpoints.keep_alive:
@@ -71,25 +84,31 @@ class Authenticator(object):
 
     def verify_opaque_token(self, token):
         # Opaque Access Token
+        response = self.verified_opaque.get(token)
+        if response is not None:
+            return response
+
         url = "https://" + self.auth0.domain + "/userinfo"
         response = http.get_json(url, headers={"Authorization": "Bearer " + token})
         DEBUG and Log.note("content: {{body|json}}", body=response)
+        self.verified_opaque.set(token, response, Date.now().unix + OPAQUE_TOKEN_TTL)
         return response
 
     def verify_jwt_token(self, token):
-        jwks = http.get_json("https://" + self.auth0.domain + "/.well-known/jwks.json")
+        claims = self.verified_jwt.get(token)
+        if claims is not None:
+            return claims
+
         unverified_header = jwt.get_unverified_header(token)
         algorithm = unverified_header["alg"]
         if algorithm != "RS256":
             Log.error("Expecting a RS256 signed JWT Access Token")
 
         key_id = unverified_header["kid"]
-        key = unwrap(first(key for key in jwks["keys"] if key["kid"] == key_id))
-        if not key:
-            Log.error("could not find {{key}}", key=key_id)
+        key = self._get_signing_key(key_id)
 
         try:
-            return jwt.decode(
+            claims = jwt.decode(
                 token,
                 key,
                 algorithms=algorithm,
@@ -107,6 +126,38 @@ class Authenticator(object):
         except Exception as e:
             Log.error("Problem parsing", cause=e)
 
+        expires = claims.get("exp")
+        if expires:
+            self.verified_jwt.set(token, claims, expires)
+        return claims
+
+    def _get_signing_key(self, key_id):
+        """
+        :return: THE JWKS KEY FOR key_id; THE KEY SET IS FETCHED WHEN STALE,
+                 OR WHEN key_id IS UNKNOWN, BUT NOT MORE THAN ONCE PER JWKS_MIN_REFRESH
+        """
+        with self.jwks_locker:
+            now = Date.now().unix
+            key = self.jwks.get(key_id)
+            if key and now < self.jwks_expires:
+                return key
+            if not self.jwks or now >= self.jwks_last_fetch + JWKS_MIN_REFRESH:
+                self.jwks_last_fetch = now
+                try:
+                    jwks = http.get_json("https://" + self.auth0.domain + "/.well-known/jwks.json")
+                    self.jwks = {k["kid"]: unwrap(k) for k in jwks["keys"]}
+                    self.jwks_expires = now + JWKS_TTL
+                except Exception as e:
+                    if not key:
+                        Log.error("could not get key set", cause=e)
+                    # IDENTITY PROVIDER IS DOWN, KEEP USING THE KEY WE HAVE
+                    Log.warning("could not refresh key set", cause=e)
+                    return key
+                key = self.jwks.get(key_id)
+        if not key:
+            Log.error("could not find {{key}}", key=key_id)
+        return key
+
     @register_thread
     @limit_body(REQUEST_LIMIT)
     @cors_wrapper
@@ -381,6 +432,39 @@ class Authenticator(object):
         return Response(status=200)
 
 
+class TokenCache(object):
+    """
+    BOUNDED MAP FROM TOKEN TO ITS VERIFIED DETAILS, UNTIL THE TOKEN EXPIRES
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.locker = Lock("token cache")
+        self.tokens = OrderedDict()  # MAP FROM TOKEN TO (expires, details) PAIR
+
+    def get(self, token):
+        """
+        :return: DETAILS OF token, OR None IF NOT KNOWN, OR EXPIRED
+        """
+        with self.locker:
+            found = self.tokens.get(token)
+            if found is None:
+                return None
+            expires, details = found
+            if expires <= Date.now().unix:
+                del self.tokens[token]
+                return None
+            self.tokens.move_to_end(token)
+            return details
+
+    def set(self, token, details, expires):
+        with self.locker:
+            self.tokens[token] = (expires, details)
+            self.tokens.move_to_end(token)
+            while len(self.tokens) > self.max_size:
+                self.tokens.popitem(last=False)
+
+
 def verify_user(func):
     """
     VERIFY A user EXISTS IN THE SESSION, PASS IT TO func
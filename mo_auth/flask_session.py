@@ -9,12 +9,12 @@ from mo_json import json2value, value2json
 from mo_kwargs import override
 from mo_logs import Log
 from mo_math import bytes2base64URL, crypto
-from mo_threads import Till
+from mo_threads import Lock, Till
 from mo_threads.threads import register_thread, Thread
 from mo_times import Date
 from mo_times.dates import parse, RFC1123, unix2Date
-from pyLibrary.sql import SQL_WHERE, sql_list, SQL_SET, SQL_UPDATE
-from pyLibrary.sql.sqlite import (
+from mo_sql import SQL_WHERE, sql_list, SQL_SET, SQL_UPDATE
+from jx_sqlite.sqlite import (
     sql_create,
     sql_eq,
     quote_column,
@@ -25,6 +25,9 @@ from pyLibrary.sql.sqlite import (
 )
 
 DEBUG = False
+FLUSH_INTERVAL = 10  # SECONDS BETWEEN WRITES OF last_used/expires TOUCH-UPS
+EXPIRE_INTERVAL = 60  # SECONDS BETWEEN SWEEPS FOR EXPIRED SESSIONS
+TOUCH_PROPERTIES = {"last_used", "expires"}  # CHANGES TO THESE ALONE ARE WRITTEN LATER
 
 
 def generate_sid():
@@ -60,9 +63,13 @@ class SqliteSessionInterface(FlaskSessionInterface):
         self.cookie.max_lifetime = parse(self.cookie.max_lifetime)
         self.cookie.inactive_lifetime = parse(self.cookie.inactive_lifetime)
 
+        self.locker = Lock("session cache")
+        self.cache = {}  # MAP FROM session_id TO SessionRecord
+        self.touched = set()  # session_id WITH TOUCH-UPS NOT YET WRITTEN
+
         if not self.db.about(self.table):
             self.setup()
-        Thread.run("session monitor", self.monitor)
+        self.monitor_thread = Thread.run("session monitor", self.monitor)
 
     def create_session(self, session):
         session.session_id = generate_sid()
@@ -70,19 +77,63 @@ class SqliteSessionInterface(FlaskSessionInterface):
         session.expires = (Date.now() + self.cookie.max_lifetime).unix
 
     def monitor(self, please_stop):
+        next_sweep = 0
         while not please_stop:
-            # Delete expired session
-            try:
-                with self.db.transaction() as t:
-                    t.execute(
-                        "DELETE FROM "
-                        + quote_column(self.table)
-                        + SQL_WHERE
-                        + sql_lt(expires=Date.now().unix)
-                    )
-            except Exception as e:
-                Log.warning("problem with session expires", cause=e)
-            (please_stop | Till(seconds=60)).wait()
+            self.flush()
+            now = Date.now().unix
+            if now >= next_sweep:
+                next_sweep = now + EXPIRE_INTERVAL
+                # Delete expired session
+                try:
+                    # TOUCH-UPS WERE JUST FLUSHED, SO THE DATABASE expires ARE CURRENT
+                    with self.locker:
+                        for session_id, record in list(self.cache.items()):
+                            if record.expires <= now:
+                                del self.cache[session_id]
+                                self.touched.discard(session_id)
+                    with self.db.transaction() as t:
+                        t.execute(
+                            "DELETE FROM "
+                            + quote_column(self.table)
+                            + SQL_WHERE
+                            + sql_lt(expires=now)
+                        )
+                except Exception as e:
+                    Log.warning("problem with session expires", cause=e)
+            (please_stop | Till(seconds=FLUSH_INTERVAL)).wait()
+        self.flush()
+
+    def flush(self):
+        """
+        WRITE THE PENDING TOUCH-UPS, IN ONE TRANSACTION
+        """
+        with self.locker:
+            touched, self.touched = self.touched, set()
+            writes = []
+            for session_id in touched:
+                record = self.cache.get(session_id)
+                if record is None:
+                    continue
+                if record.inserting:
+                    # ANOTHER THREAD IS INSERTING THIS RECORD, WRITE THE TOUCH-UP NEXT TIME
+                    self.touched.add(session_id)
+                    continue
+                writes.append(self._claim(record))
+        if not writes:
+            return
+        DEBUG and Log.note("flush {{num}} sessions", num=len(writes))
+        try:
+            with self.db.transaction() as t:
+                for write in writes:
+                    self._write(t, write)
+        except Exception as e:
+            with self.locker:
+                self._written(writes, False)
+                self.touched |= touched
+            Log.warning("problem writing sessions", cause=e)
+        else:
+            with self.locker:
+                self._written(writes, True)
 
     def setup(self):
         with self.db.transaction() as t:
@@ -114,39 +165,33 @@ class SqliteSessionInterface(FlaskSessionInterface):
         """
         now = Date.now().unix
         session = self.get_session(session_id)
+        if not session:
+            return
         for k, v in props.items():
             session[k] = v
         session.last_used = now
-
-        record = {
-            "session_id": session_id,
-            "data": value2json(session),
-            "expires": session.expires,
-            "last_used": session.last_used,
-        }
-
-        with self.db.transaction() as t:
-            t.execute(
-                SQL_UPDATE
-                + quote_column(self.table)
-                + SQL_SET
-                + sql_list(sql_eq(**{k: v}) for k, v in record.items())
-                + SQL_WHERE
-                + sql_eq(session_id=session_id)
-            )
+        session.session_id = session_id
+        self._save(session, session.expires, now)
 
     def get_session(self, session_id):
         now = Date.now().unix
-        result = self.db.query(
-            sql_query({"from": self.table, "where": {"eq": {"session_id": session_id}}})
-        )
-        saved_record = first(Data(zip(result.header, r)) for r in result.data)
-        if not saved_record or saved_record.expires <= now:
-            return Data()
-        session = json2value(saved_record.data)
+        with self.locker:
+            record = self.cache.get(session_id)
+        if record is None:
+            result = self.db.query(
+                sql_query({"from": self.table, "where": {"eq": {"session_id": session_id}}})
+            )
+            saved_record = first(Data(zip(result.header, r)) for r in result.data)
+            if not saved_record:
+                return Data()
+            DEBUG and Log.note("record from db {{session}}", session=saved_record)
+            record = SessionRecord(saved_record, in_db=True)
+            with self.locker:
+                record = self.cache.setdefault(session_id, record)
 
-        DEBUG and Log.note("record from db {{session}}", session=saved_record)
-        return session
+        if record.expires <= now:
+            return Data()
+        return json2value(record.data)
 
     @register_thread
     def open_session(self, app, request):
@@ -166,37 +211,112 @@ class SqliteSessionInterface(FlaskSessionInterface):
         DEBUG and Log.note("save session {{session}}", session=session)
 
         now = Date.now().unix
-        session_id = session.session_id
-        result = self.db.query(
-            sql_query({"from": self.table, "where": {"eq": {"session_id": session_id}}})
-        )
-        saved_record = first(Data(zip(result.header, r)) for r in result.data)
         expires = min(session.expires, now + self.cookie.inactive_lifetime.seconds)
-        if saved_record:
-            DEBUG and Log.note("found session {{session}}", session=saved_record)
+        self._save(session, expires, now)
+
+    def _save(self, session, expires, now):
+        """
+        WRITE session NOW IF IT CHANGED, OTHERWISE JUST REMEMBER THE TOUCH-UP FOR flush()
+        """
+        session_id = session.session_id
+        data = value2json(session)
+        content = _content(session)
+        with self.locker:
+            record = self.cache.get(session_id)
+            if record is not None and record.content == content:
+                record.data = data
+                record.expires = expires
+                record.last_used = now
+                self.touched.add(session_id)
+                return
+            if record is None:
+                record = self.cache[session_id] = SessionRecord(Data(session_id=session_id), in_db=False)
+            record.data = data
+            record.content = content
+            record.expires = expires
+            record.last_used = now
+            if record.inserting:
+                # ANOTHER THREAD IS INSERTING THIS RECORD, flush() WILL WRITE THE CHANGE
+                self.touched.add(session_id)
+                return
+            self.touched.discard(session_id)
+            write = self._claim(record)
 
-            saved_record.data = value2json(session)
-            saved_record.expires = expires
-            saved_record.last_used = now
+        DEBUG and Log.note("write session {{session}}", session=session_id)
+        try:
             with self.db.transaction() as t:
-                t.execute(
-                    "UPDATE "
-                    + quote_column(self.table)
-                    + SQL_SET
-                    + sql_list(sql_eq(**{k: v}) for k, v in saved_record.items())
-                    + SQL_WHERE
-                    + sql_eq(session_id=session_id)
-                )
+                self._write(t, write)
+        except Exception as e:
+            with self.locker:
+                self._written([write], False)
+                self.touched.add(session_id)
+            Log.error("problem writing session", cause=e)
+        with self.locker:
+            self._written([write], True)
+
+    def _claim(self, record):
+        """
+        EXPECTING self.locker TO BE HELD
+        :return: (record, row, insert) TO WRITE; AN INSERT IS CLAIMED SO NO OTHER THREAD INSERTS THE SAME ROW
+        """
+        row = {
+            "session_id": record.session_id,
+            "data": record.data,
+            "expires": record.expires,
+            "last_used": record.last_used,
+        }
+        insert = not record.in_db
+        if insert:
+            record.inserting = True
+        return record, row, insert
+
+    def _written(self, writes, success):
+        """
+        EXPECTING self.locker TO BE HELD
+        RELEASE THE CLAIMED INSERTS
+        """
+        for record, _, insert in writes:
+            if insert:
+                record.inserting = False
+                record.in_db = success
+
+    def _write(self, t, write):
+        _, row, insert = write
+        if insert:
+            t.execute(sql_insert(self.table, row))
         else:
-            new_record = {
-                "session_id": session_id,
-                "data": value2json(session),
-                "expires": expires,
-                "last_used": now,
-            }
-            DEBUG and Log.note("new record for db {{session}}", session=new_record)
-            with self.db.transaction() as t:
-                t.execute(sql_insert(self.table, new_record))
+            t.execute(
+                SQL_UPDATE
+                + quote_column(self.table)
+                + SQL_SET
+                + sql_list(sql_eq(**{k: v}) for k, v in row.items())
+                + SQL_WHERE
+                + sql_eq(session_id=row["session_id"])
+            )
+
+
+class SessionRecord(object):
+    """
+    CACHED COPY OF A ROW IN THE SESSION TABLE
+    """
+
+    __slots__ = ["session_id", "data", "content", "expires", "last_used", "in_db", "inserting"]
+
+    def __init__(self, row, in_db):
+        self.session_id = row.session_id
+        self.data = row.data  # JSON OF THE WHOLE SESSION
+        self.content = _content(json2value(row.data)) if row.data else None
+        self.expires = row.expires
+        self.last_used = row.last_used
+        self.in_db = in_db
+        self.inserting = False  # A THREAD HAS CLAIMED THE INSERT OF THIS ROW
+
+
+def _content(session):
+    """
+    :return: JSON OF session, WITHOUT THE TOUCH_PROPERTIES, FOR DETECTING CHANGE
+    """
+    return value2json({k: v for k, v in session.items() if k not in TOUCH_PROPERTIES})
 
 
 def setup_flask_session(flask_app, session_config):
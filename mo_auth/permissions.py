@@ -2,8 +2,9 @@ from mo_dots import wrap, Data, listwrap, is_data, FlatList
 from mo_future import first
 from mo_kwargs import override
 from mo_logs import Log
-from pyLibrary.sql import SQL_UPDATE, SQL_SET
-from pyLibrary.sql.sqlite import sql_query, sql_create, sql_insert, quote_column, sql_eq, Sqlite
+from mo_sql import SQL_UPDATE, SQL_SET
+from mo_threads import Lock
+from jx_sqlite.sqlite import sql_query, sql_create, sql_insert, quote_column, sql_eq, Sqlite
 
 
 ROOT_USER = wrap({"_id": 1})
@@ -13,6 +14,7 @@ PERMISSION_TABLE = "security.permissions"
 RESOURCE_TABLE = "security.resources"
 TABLE_OPERATIONS = ["insert", "update", "from"]
 CREATE_TABLE = {"_id": 100, "table": ".", "operation": "insert", "owner": 1}
+MAX_ALLOWANCES = 10000  # MOST (user, resource) CHAINS TO REMEMBER
 
 
 class Permissions:
@@ -29,6 +31,15 @@ class Permissions:
             self.setup()
         self.next_id = id_generator(self.db)
 
+        # IN-MEMORY COPY OF PERMISSION_TABLE, SO verify_allowance() DOES NOT TOUCH THE DATABASE
+        self.locker = Lock("permissions")
+        self.grants = {}  # MAP FROM user TO LIST OF (resource, owner), IN INSERT ORDER
+        self.allowances = {}  # MAP FROM (user, resource) TO ALLOWANCE CHAIN
+        result = self.db.query(
+            sql_query({"select": ["user", "resource", "owner"], "from": PERMISSION_TABLE})
+        )
+        self._add_grants(Data(zip(result.header, r)) for r in result.data)
+
     def setup(self):
         with self.db.transaction() as t:
             t.execute(sql_create(VERSION_TABLE, {"version": "TEXT"}))
@@ -142,14 +153,13 @@ class Permissions:
 
 
 
+        grants = wrap([
+            {"user": owner._id, "resource": r._id, "owner": ROOT_USER._id}
+            for r in new_resources
+        ])
         with self.db.transaction() as t:
-            t.execute(sql_insert(
-                PERMISSION_TABLE,
-                [
-                    {"user": owner._id, "resource": r._id, "owner": ROOT_USER._id}
-                    for r in new_resources
-                ]
-            ))
+            t.execute(sql_insert(PERMISSION_TABLE, grants))
+        self._add_grants(grants)
 
     def get_or_create_user(self, details):
         details = wrap(details)
@@ -230,8 +240,20 @@ class Permissions:
             Log.error("more than one owner has access to resource, who are you acting for?")
 
         owner = qualified_owners[0]
+        grant = wrap({"user": user._id, "resource": resource._id, "owner": owner._id})
         with self.db.transaction() as t:
-            t.execute(sql_insert(PERMISSION_TABLE, {"user": user._id, "resource": resource._id, "owner": owner._id}))
+            t.execute(sql_insert(PERMISSION_TABLE, grant))
+        self._add_grants([grant])
+
+    def _add_grants(self, grants):
+        """
+        ADD PERMISSION_TABLE RECORDS TO THE IN-MEMORY GRAPH
+        """
+        with self.locker:
+            for g in grants:
+                self.grants.setdefault(g.user, []).append((g.resource, g.owner))
+            # ANY CHAIN MAY BE AFFECTED
+            self.allowances = {}
 
     def is_agent_for(self, actor):
         """
@@ -250,40 +272,30 @@ class Permissions:
         """
         user = wrap(user)
         resource = wrap(resource)
-        resources = self.db.query(
-            sql_query(
-                {
-                    "select": ["resource", "owner"],
-                    "from": PERMISSION_TABLE,
-                    "where": {"eq": {"user": user._id}},
-                }
-            )
-        )
-
-        for r in resources.data:
-            record = Data(zip(resources.header, r))
-            if record.resource == resource._id:
-                if record.owner == ROOT_USER._id:
-                    return FlatList(vals=[{"resource": resource, "user": user, "owner": ROOT_USER}])
-                else:
-                    cascade = self.verify_allowance(
-                        wrap({"_id": record.owner}), resource
-                    )
-                    if cascade:
-                        cascade.append(
-                            {"resource": resource, "user": user, "owner": record.owner}
-                        )
-                    return cascade
+        key = (user._id, resource._id)
+        with self.locker:
+            allowances = self.allowances
+            grants = self.grants
+        chain = allowances.get(key)
+        if chain is None:
+            if len(allowances) >= MAX_ALLOWANCES:
+                # NEGATIVE RESULTS ARE REMEMBERED TOO, SO START OVER RATHER THAN GROW
+                allowances.clear()
+            chain = allowances[key] = tuple(_allowance(grants, user._id, resource._id, set()))
+
+        output = FlatList()
+        for i, (group, user_id, owner) in enumerate(chain):
+            # THE LAST LINK IS FOR THE user ASKED ABOUT
+            link_user = user if i == len(chain) - 1 else wrap({"_id": user_id})
+            if group is None:
+                output.append({
+                    "resource": resource,
+                    "user": link_user,
+                    "owner": ROOT_USER if owner == ROOT_USER._id else owner
+                })
             else:
-                group = record.resource
-                cascade = self.verify_allowance(wrap({"_id": group}), resource)
-                if cascade:
-                    cascade.append(
-                        {"group": group, "user": user, "owner": record.owner}
-                    )
-                    return cascade
-
-        return []
+                output.append({"group": group, "user": link_user, "owner": owner})
+        return output
 
     def find_resource(self, table, operation):
         result = self.db.query(
@@ -308,3 +320,53 @@ class Permissions:
         with self.db.transaction() as t:
             t.execute(sql_insert(table, records))
 
+
+def _allowance(grants, user, resource, visiting):
+    """
+    :param grants: MAP FROM user TO LIST OF (resource, owner)
+    :param visiting: users ALREADY ON THE CURRENT PATH (GROUP CYCLES ARE NOT FOLLOWED)
+    :return: LIST OF (group, user, owner) LINKS, FROM ROOT TO user; group IS None FOR THE LINK TO resource
+    """
+    if user in visiting:
+        return []
+    visiting.add(user)
+    try:
+        for granted, owner in grants.get(user, ()):
+            if granted == resource:
+                if owner == ROOT_USER._id:
+                    return [(None, user, owner)]
+                cascade = _allowance(grants, owner, resource, visiting)
+                if cascade:
+                    cascade.append((None, user, owner))
+                return cascade
+            else:
+                cascade = _allowance(grants, granted, resource, visiting)
+                if cascade:
+                    cascade.append((granted, user, owner))
+                    return cascade
+        return []
+    finally:
+        visiting.discard(user)
+
+
+def id_generator(db):
+    """
+    :return: FUNCTION THAT RETURNS THE NEXT UNUSED _id; IDS ARE RESERVED IN BLOCKS IN VERSION_TABLE
+    """
+    about = db.about(VERSION_TABLE)
+    if not any(name == "next_id" for _, name, _, _, _, _ in about):
+        with db.transaction() as t:
+            t.execute("ALTER TABLE " + quote_column(VERSION_TABLE) + " ADD COLUMN next_id LONG")
+            t.execute(SQL_UPDATE + quote_column(VERSION_TABLE) + SQL_SET + sql_eq(next_id=1000))
+
+    def _gen_ids():
+        while True:
+            with db.transaction() as t:
+                top_id = first(first(t.query(sql_query({"select": "next_id", "from": VERSION_TABLE})).data))
+                max_id = top_id + 1000
+                t.execute(SQL_UPDATE + quote_column(VERSION_TABLE) + SQL_SET + sql_eq(next_id=max_id))
+            while top_id < max_id:
+                yield top_id
+                top_id += 1
+
+    return _gen_ids().__next__
@@ -9,10 +9,17 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
-from mo_dots import Data, Null, coalesce, get_module, is_sequence
+from itertools import chain
+
+from mo_dots import Data, Null, NullType, coalesce, get_module, is_sequence
 from mo_future import text, transpose, xrange
 from mo_logs import Log
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class Matrix(object):
     """
@@ -212,6 +219,15 @@ class Matrix(object):
 
         return func(self.num, self.cube)
 
+    def set_many(self, coords, values):
+        """
+        ASSIGN MANY CELLS AT ONCE
+        :param coords: LIST OF COORDINATES
+        :param values: LIST OF VALUES, ONE FOR EACH COORDINATE
+        """
+        for c, v in zip(coords, values):
+            self[c] = v
+
     def forall(self, method):
         """
         IT IS EXPECTED THE method ACCEPTS (value, coord, cube), WHERE
@@ -253,6 +269,241 @@ class Matrix(object):
 Matrix.ZERO = Matrix(value=None)
 
 
+def dense_matrix(dims, zeros=None):
+    """
+    :return: A DenseMatrix, IF numpy IS INSTALLED, OTHERWISE A Matrix
+    """
+    if numpy is None or not dims or any(d == 0 for d in dims):
+        return Matrix(dims=dims, zeros=zeros)
+    return DenseMatrix(dims=dims, zeros=zeros)
+
+
+class DenseMatrix(Matrix):
+    """
+    n-DIMENSIONAL ARRAY BACKED BY A numpy ndarray
+    NUMBERS ARE KEPT IN A float64 ARRAY (WITH nan FOR None), BOOLEANS IN A bool
+    ARRAY; ANY OTHER VALUE TURNS THE ARRAY INTO AN object ARRAY
+
+    THE float64 ARRAY HOLDS ALL INTEGERS, OR ALL FLOATS, NEVER A MIX, SO EVERY
+    VALUE READS BACK AS THE TYPE IT WAS SET WITH. MIXING INTEGERS WITH FLOATS,
+    OR AN INTEGER OF MAGNITUDE 2**53 OR MORE (float64 MAY NOT HOLD IT EXACTLY), TURNS
+    THE ARRAY INTO AN object ARRAY
+    """
+
+    def __init__(self, dims, zeros=None):
+        self.num = len(dims)
+        self.dims = tuple(dims)
+        if hasattr(zeros, "__call__"):
+            array = numpy.empty(self.dims, dtype=object)
+            for c in numpy.ndindex(*self.dims):
+                array[c] = zeros()
+            self.array = array
+            self.integers = False
+        elif zeros is True or zeros is False:
+            self.array = numpy.full(self.dims, zeros, dtype=bool)
+            self.integers = False
+        elif zeros == None:
+            self.array = numpy.full(self.dims, numpy.nan)
+            self.integers = True
+        elif _is_number(zeros) and not abs(zeros) >= MAX_EXACT_INTEGER:
+            self.array = numpy.full(self.dims, zeros, dtype=float)
+            self.integers = zeros.__class__ in _INTEGER_TYPES
+        else:
+            self.array = numpy.empty(self.dims, dtype=object)
+            self.array.fill(zeros)
+            self.integers = False
+
+    @classmethod
+    def _wrap(cls, array, integers):
+        output = object.__new__(cls)
+        output.num = array.ndim
+        output.dims = array.shape
+        output.array = array
+        output.integers = integers
+        return output
+
+    @property
+    def cube(self):
+        return self._objects().tolist()
+
+    def __getitem__(self, index):
+        if not is_sequence(index):
+            index = (index,)
+        elif len(index) == 0:
+            return self.cube
+        index = tuple(slice(None) if i == None else i for i in index)
+        if len(index) == self.num and all(isinstance(i, int) for i in index):
+            return self._value(self.array[index])
+        sub = self.array[index]
+        if not sub.ndim:
+            return self._value(sub)
+        return DenseMatrix._wrap(sub, self.integers)
+
+    def __setitem__(self, key, value):
+        if self.num == 1 and isinstance(key, int):
+            key = (key,)
+        elif len(key) != self.num:
+            Log.error("Expecting coordinates to match the number of dimensions")
+        self.set_many([tuple(key)], [value])
+
+    def set_many(self, coords, values):
+        """
+        ASSIGN MANY CELLS WITH ONE numpy CALL
+        :param coords: LIST OF COORDINATES (NO DUPLICATES)
+        :param values: LIST OF VALUES, ONE FOR EACH COORDINATE
+        """
+        coords = list(coords)
+        if not coords:
+            return
+        values = self._prepare(list(values))
+        coords = numpy.fromiter(chain.from_iterable(coords), dtype=int, count=len(coords) * self.num)
+        index = numpy.ravel_multi_index(coords.reshape(-1, self.num).T, self.dims)
+        self.array.put(index, values)
+
+    def _prepare(self, values):
+        """
+        :return: values AS AN ARRAY OF THE SAME dtype, CHANGING self.array TO object IF THEY DO NOT FIT
+        """
+        kind = self.array.dtype.kind
+        types = set(map(type, values))
+        if NullType in types:
+            values = [None if v is Null else v for v in values]
+            types.discard(NullType)
+            types.add(type(None))
+        if kind == "f":
+            if types <= _NUMBER_TYPES:
+                # numpy CONVERTS None TO nan
+                array = numpy.array(values, dtype=float)
+                if types <= _INTEGER_TYPES:
+                    integers = True
+                    # CONVERSION ROUNDS LARGER INTEGERS TO 2**53, SO CHECK >=
+                    if (numpy.abs(array) >= MAX_EXACT_INTEGER).any():
+                        integers = None
+                elif types <= _FLOAT_TYPES:
+                    integers = False
+                else:
+                    integers = None
+                if integers is not None:
+                    if types <= {type(None)} or integers == self.integers:
+                        return array
+                    if numpy.isnan(self.array).all():
+                        # NOTHING SET YET, SO ADOPT THE TYPE OF THESE values
+                        self.integers = integers
+                        return array
+            self.array = self._objects()
+        elif kind == "b":
+            if types <= _BOOLEAN_TYPES:
+                return numpy.array(values, dtype=bool)
+            self.array = self._objects()
+
+        output = numpy.empty(len(values), dtype=object)
+        for i, v in enumerate(values):
+            output[i] = None if v == None else v
+        return output
+
+    def _objects(self):
+        """
+        :return: object ARRAY WITH None FOR MISSING VALUES
+        """
+        array = self.array
+        kind = array.dtype.kind
+        if kind == "O":
+            return array
+        elif kind == "b":
+            return array.astype(object)
+        missing = numpy.isnan(array)
+        if self.integers:
+            output = numpy.where(missing, 0, array).astype(numpy.int64).astype(object)
+        else:
+            output = array.astype(object)
+        output[missing] = None
+        return output
+
+    def _value(self, value):
+        """
+        :return: PYTHON VERSION OF A SINGLE ARRAY ELEMENT
+        """
+        kind = self.array.dtype.kind
+        if kind == "f":
+            if numpy.isnan(value):
+                return None
+            if self.integers:
+                return int(value)
+            return float(value)
+        elif kind == "b":
+            return bool(value)
+        return value
+
+    def __bool__(self):
+        return True
+
+    def __nonzero__(self):
+        return True
+
+    def __iter__(self):
+        return self.items()
+
+    def groupby(self, io_select):
+        """
+        SLICE THIS MATRIX INTO ONES WITH LESS DIMENSIONALITY
+        :param io_select: 1 IF GROUPING BY THIS DIMENSION, 0 IF FLATTENING
+        :return: LIST OF [coord, DenseMatrix] PAIRS, ONE FOR EACH GROUP; coord HAS -1 FOR FLATTENED DIMENSIONS
+        """
+        group_axes = [i for i, s in enumerate(io_select) if s]
+        other_axes = [i for i, s in enumerate(io_select) if not s]
+        if not other_axes:
+            return self.items()
+
+        group_dims = tuple(self.dims[i] for i in group_axes)
+        new_dims = tuple(self.dims[i] for i in other_axes)
+        array = self.array.transpose(group_axes + other_axes).reshape((_product(group_dims),) + new_dims)
+        output = []
+        for i, g in enumerate(numpy.ndindex(*group_dims)):
+            coord = [-1] * self.num
+            for a, c in zip(group_axes, g):
+                coord[a] = c
+            output.append([tuple(coord), DenseMatrix._wrap(array[i], self.integers)])
+        return output
+
+    def aggregate(self, type):
+        if type not in aggregates:
+            Log.error("Aggregate of type {{type}} is not supported yet", type=type)
+        if self.array.dtype.kind != "f":
+            return aggregates[type](self.num, self.cube)
+        if numpy.isnan(self.array).all():
+            return None
+        if aggregates[type] is _max:
+            return self._value(numpy.nanmax(self.array))
+        return self._value(numpy.nanmin(self.array))
+
+    def forall(self, method):
+        """
+        IT IS EXPECTED THE method ACCEPTS (value, coord, cube), WHERE
+        value - VALUE FOUND AT ELEMENT
+        coord - THE COORDINATES OF THE ELEMENT (PLEASE, READ ONLY)
+        cube - THE WHOLE CUBE, FOR USE IN WINDOW FUNCTIONS
+        """
+        cube = self.cube
+        for c, v in zip(numpy.ndindex(*self.dims), self._objects().flat):
+            method(v, c, cube)
+
+    def items(self):
+        """
+        ITERATE THROUGH ALL coord, value PAIRS
+        """
+        return zip(numpy.ndindex(*self.dims), self._objects().flat)
+
+    def _all_combos(self):
+        return numpy.ndindex(*self.dims)
+
+    def __str__(self):
+        return "DenseMatrix " + get_module("mo_json").value2json(self.dims) + ": " + str(self.cube)
+
+
+def _is_number(value):
+    return value.__class__ in _NUMBER_TYPES and value is not None
+
+
 def _max(depth, cube):
     if depth == 0:
         return cube
@@ -430,3 +681,15 @@ def _MAX(values):
         else:
             pass
     return output
+
+
+MAX_EXACT_INTEGER = 2 ** 53  # INTEGERS SMALLER THAN THIS (IN MAGNITUDE) ARE EXACT IN float64
+
+_INTEGER_TYPES = {int, type(None)}
+_FLOAT_TYPES = {float, type(None)}
+_NUMBER_TYPES = {int, float, type(None)}
+_BOOLEAN_TYPES = {bool}
+if numpy is not None:
+    _INTEGER_TYPES |= {numpy.int64}
+    _FLOAT_TYPES |= {numpy.float64}
+    _NUMBER_TYPES |= {numpy.int64, numpy.float64}
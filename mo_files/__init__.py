@@ -15,6 +15,7 @@ import os
 import re
 import shutil
 from datetime import datetime
+from itertools import chain
 from mimetypes import MimeTypes
 from tempfile import NamedTemporaryFile, mkdtemp
 
@@ -207,7 +208,10 @@ class File(object):
         """
         with open(self._filename, "rb") as f:
             if self.key:
-                return get_module("mo_math.crypto").decrypt(f.read(), self.key)
+                content = self._decrypt(f)
+                if is_text(content):
+                    return content
+                return content.decode(encoding)
             else:
                 content = f.read().decode(encoding)
                 return content
@@ -247,7 +251,10 @@ class File(object):
                 self.parent.create()
             with open(self._filename, "rb") as f:
                 if self.key:
-                    return get_module("mo_math.crypto").decrypt(f.read(), self.key)
+                    content = self._decrypt(f)
+                    if is_text(content):
+                        return content.encode("utf8")
+                    return content
                 else:
                     return f.read()
         except Exception as e:
@@ -258,10 +265,23 @@ class File(object):
             self.parent.create()
         with open(self._filename, "wb") as f:
             if self.key:
-                f.write(get_module("mo_math.crypto").encrypt(content, self.key))
+                for chunk in get_module("mo_math.aes_crypto").encrypt_stream([content], self.key):
+                    f.write(chunk)
             else:
                 f.write(content)
 
+    def _decrypt(self, f):
+        """
+        :param f: OPEN FILE, AT THE START
+        :return: DECRYPTED bytes, OR text (FOR THE OLD JSON FORMAT)
+        """
+        aes_crypto = get_module("mo_math.aes_crypto")
+        magic = f.read(len(aes_crypto.MAGIC))
+        if magic != aes_crypto.MAGIC:
+            return aes_crypto.decrypt(magic + f.read(), self.key)
+        blocks = iter(lambda: f.read(aes_crypto.CHUNK_SIZE), b"")
+        return b"".join(aes_crypto.decrypt_stream(chain([magic], blocks), self.key))
+
     def write(self, content):
         """
         :param content: text, or iterable of text
@@ -270,9 +290,6 @@ class File(object):
         if not self.parent.exists:
             self.parent.create()
         with open(self._filename, "wb") as f:
-            if is_list(content) and self.key:
-                Log.error(u"list of data and keys are not supported, encrypt before sending to file")
-
             if is_list(content):
                 pass
             elif isinstance(content, text):
@@ -280,14 +297,19 @@ class File(object):
             elif hasattr(content, "__iter__"):
                 pass
 
-            for d in content:
-                if not is_text(d):
-                    Log.error(u"Expecting unicode data only")
-                if self.key:
-                    from mo_math.aes_crypto import encrypt
-                    f.write(encrypt(d, self.key).encode("utf8"))
-                else:
-                    f.write(d.encode("utf8"))
+            def encoded():
+                for d in content:
+                    if not is_text(d):
+                        Log.error(u"Expecting unicode data only")
+                    yield d.encode("utf8")
+
+            if self.key:
+                # ONE ENCRYPTED STREAM FOR ALL THE CONTENT
+                for chunk in get_module("mo_math.aes_crypto").encrypt_stream(encoded(), self.key):
+                    f.write(chunk)
+            else:
+                for d in encoded():
+                    f.write(d)
 
     def __iter__(self):
         # NOT SURE HOW TO MAXIMIZE FILE READ SPEED
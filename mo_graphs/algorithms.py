@@ -14,13 +14,11 @@ from __future__ import unicode_literals
 from collections import deque
 
 from mo_collections.queue import Queue
-from mo_dots import Data
 from mo_future import zip_longest
 from mo_graphs import Edge
 from mo_graphs.paths import Step, Path
 from mo_graphs.tree_graph import Tree
 from mo_logs import Log
-from mo_math import INTERSECT
 
 
 def dfs(graph, func, head, reverse=None):
@@ -86,26 +84,30 @@ def dominator(graph, head):
     # INSTEAD OF DOMINATORS, WE COULD USE MANY PERF RESULTS, FROM EACH OF THE
     # PARENT BRANCHES, AND AS LONG AS THEY ALL ARE PART OF A LONG LINE OF
     # STATISTICALLY IDENTICAL PERF RESULTS, WE CAN ASSUME THEY ARE A DOMINATOR
-
-    visited = set()
-    dom = Data(output=None)
-
-    def find_dominator(node, path, graph, todo):
-        if dom.output:
-            return False
-        if not todo:
-            dom.output = node
-            return False
-        if node in visited:
-            common = INTERSECT(p[1::] for p in todo)  # DO NOT INCLUDE head
-            if node in common:
-                dom.output = node  #ALL REMAINING PATHS HAVE node IN COMMON TOO
-            return False
-        return True
-
-    bfs(graph, find_dominator, head)
-
-    return dom.output
+    """
+    :return: THE FIRST NODE ALL PATHS (THROUGH CHILDREN) FROM head PASS THROUGH, OR None
+    """
+    nodes, index, parents, children = _index(graph)
+    start = index.get(head)
+    if start is None:
+        return None
+
+    # ONLY CONSIDER NODES BELOW head; WALK BACKWARDS FROM THE LEAVES
+    below = _reachable(children, [start])
+    exit = len(nodes)
+    leaves = [i for i in range(exit) if below[i] and not children[i]]
+    reverse_children = [[p for p in parents[i] if below[p]] if below[i] else [] for i in range(exit)]
+    reverse_children.append(leaves)
+    reverse_parents = [[c for c in children[i] if below[c]] for i in range(exit)]
+    for i in leaves:
+        reverse_parents[i].append(exit)
+    reverse_parents.append([])
+
+    idom = _immediate_dominators(reverse_children, reverse_parents, exit)
+    dom = idom[start]
+    if dom is None or dom == exit:
+        return None
+    return nodes[dom]
 
 
 LOOPS = "LOOPS"
@@ -121,10 +123,134 @@ def dominator_tree(graph):
 
     roots = dominator_tree(graph).get_children(ROOTS)
     """
-    todo = Queue()
-    done = set()
+    nodes, index, parents, children = _index(graph)
+
+    # ONE VIRTUAL root ABOVE ALL THE ROOTS
+    root = len(nodes)
+    roots = [i for i, p in enumerate(parents) if not p]
+    children.append(roots)
+    parents.append([])
+    for i in roots:
+        parents[i].append(root)
+
+    idom = _immediate_dominators(children, parents, root)
+
     dominator = Tree(None)
+    in_loops = []
+    for i, node in enumerate(nodes):
+        dom = idom[i]
+        if dom is None:
+            # ONLY REACHABLE FROM CYCLES
+            in_loops.append(node)
+        elif dom == root:
+            dominator.add_edge(Edge(ROOTS, node))
+        else:
+            dominator.add_edge(Edge(nodes[dom], node))
+
+    if in_loops:
+        _loop_dominator_tree(graph, in_loops, dominator)
+    return dominator
+
+
+def _index(graph):
+    """
+    :return: (nodes, index, parents, children) WHERE nodes[i] IS THE NODE WITH
+    INTEGER i, index IS THE REVERSE, AND parents[i], children[i] ARE LISTS OF
+    INTEGERS (SELF-LOOPS REMOVED)
+    """
     nodes = list(graph.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    parents = [[index[p] for p in graph.get_parents(n) if p != n] for n in nodes]
+    children = [[] for _ in nodes]
+    for c, ps in enumerate(parents):
+        for p in ps:
+            children[p].append(c)
+    return nodes, index, parents, children
+
+
+def _reachable(children, starts):
+    """
+    :return: bytearray, WITH 1 FOR EVERY NODE REACHABLE FROM starts
+    """
+    output = bytearray(len(children))
+    todo = list(starts)
+    for i in todo:
+        output[i] = 1
+    while todo:
+        for c in children[todo.pop()]:
+            if not output[c]:
+                output[c] = 1
+                todo.append(c)
+    return output
+
+
+def _immediate_dominators(children, parents, root):
+    """
+    COOPER, HARVEY, KENNEDY "A SIMPLE, FAST DOMINANCE ALGORITHM"
+    :param children: LIST OF INTEGER LISTS
+    :param parents: LIST OF INTEGER LISTS
+    :param root: THE START NODE
+    :return: LIST OF IMMEDIATE DOMINATORS, None FOR NODES NOT REACHABLE FROM root
+    """
+    num = len(children)
+
+    # POST-ORDER NUMBERING, WITHOUT RECURSION
+    post = [-1] * num
+    order = []
+    visited = bytearray(num)
+    visited[root] = 1
+    stack = [(root, iter(children[root]))]
+    while stack:
+        node, todo = stack[-1]
+        for c in todo:
+            if not visited[c]:
+                visited[c] = 1
+                stack.append((c, iter(children[c])))
+                break
+        else:
+            stack.pop()
+            post[node] = len(order)
+            order.append(node)
+    order.reverse()
+
+    idom = [None] * num
+    idom[root] = root
+    changed = True
+    while changed:
+        # ONE PASS FOR A DAG, PLUS ONE TO CONFIRM
+        changed = False
+        for node in order[1:]:
+            new_idom = None
+            for p in parents[node]:
+                if idom[p] is None:
+                    continue
+                if new_idom is None:
+                    new_idom = p
+                    continue
+                # INTERSECT
+                a, b = p, new_idom
+                while a != b:
+                    while post[a] < post[b]:
+                        a = idom[a]
+                    while post[b] < post[a]:
+                        b = idom[b]
+                new_idom = a
+            if idom[node] != new_idom:
+                idom[node] = new_idom
+                changed = True
+    return idom
+
+
+def _loop_dominator_tree(graph, nodes, dominator):
+    """
+    ADD THE nodes TO THE dominator TREE, BY WALKING PATHS TO THE ROOT
+    (SLOW, BUT USED ONLY FOR nodes THAT CAN ONLY BE REACHED FROM CYCLES)
+    THERE IS NO TRUE DOMINATOR FOR THOSE, SO EACH CYCLE IS BROKEN AT SOME
+    NODE, WHICH BECOMES A CHILD OF LOOPS
+    """
+    todo = Queue()
+    done = set()
+    nodes = list(nodes)
 
     while True:
         # FIGURE OUT NET ITEM TO WORK ON
@@ -198,5 +324,3 @@ def dominator_tree(graph):
 
         dominator.add_edge(Edge(dom, node))
         done.add(node)
-
-    return dominator
@@ -10,26 +10,30 @@
 from __future__ import division, unicode_literals
 
 import json
+import zlib
 
 from flask import Response
 
 from mo_dots import coalesce
 from mo_files.url import URL
-from mo_future import text, xrange
+from mo_future import OrderedDict, is_text, text
+from mo_hg.relay.limiter import RateLimiter
 from mo_hg.relay.rate_logger import RateLogger
 from mo_json import value2json
 from mo_kwargs import override
 from mo_logs import Log
-from mo_threads import Lock, Queue, Signal, Thread, Till
+from mo_threads import Lock, Queue, Signal, Thread, Till, THREAD_STOP
 from mo_times import Date, MINUTE, SECOND
 from mo_http import http
-from jx_sqlite.sqlite import Sqlite, quote_list, quote_value
+from jx_sqlite.sqlite import Sqlite, quote_value
 
 APP_NAME = "HG Cache"
 CONCURRENCY = 5
 AMORTIZATION_PERIOD = SECOND
 HG_REQUEST_PER_SECOND = 10
 CACHE_RETENTION = 10 * MINUTE
+MAX_MEMORY = 200 * 1000 * 1000  # BYTES OF RESPONSE BODIES KEPT IN MEMORY
+WRITE_BEHIND_DELAY = SECOND  # TIME TO COLLECT DATABASE WRITES INTO ONE TRANSACTION
 
 
 class Cache(object):
@@ -39,18 +43,34 @@ class Cache(object):
 
     @override
     def __init__(
-        self, rate=None, amortization_period=None, source=None, database=None, kwargs=None
+        self,
+        rate=None,
+        amortization_period=None,
+        source=None,
+        database=None,
+        max_memory=None,
+        lanes=None,
+        weights=None,
+        min_share=None,
+        kwargs=None,
     ):
         self.amortization_period = coalesce(amortization_period, AMORTIZATION_PERIOD)
         self.rate = coalesce(rate, HG_REQUEST_PER_SECOND)
+        self.max_memory = coalesce(max_memory, MAX_MEMORY)
         self.cache_locker = Lock()
-        self.cache = {}  # MAP FROM url TO (ready, headers, response, timestamp) PAIR
+        self.cache = OrderedDict()  # MAP FROM url TO (ready, headers, response, timestamp), LEAST RECENTLY USED FIRST
+        self.cache_size = 0  # BYTES OF response IN self.cache
         self.no_cache = {}  # VERY SHORT TERM CACHE
         self.workers = []
-        self.todo = Queue(APP_NAME + " todo")
-        self.requests = Queue(
-            APP_NAME + " requests", max=int(self.rate * self.amortization_period.seconds)
+        self.requests = RateLimiter(
+            APP_NAME + " requests",
+            rate=self.rate,
+            burst=int(self.rate * self.amortization_period.seconds),
+            lanes=lanes,
+            weights=weights,
+            min_share=min_share,
         )
+        self.db_todo = Queue(APP_NAME + " database writes")  # (path, timestamp, headers, response) TUPLES, headers IS None FOR HITS
         self.url = URL(source.url)
         self.db = Sqlite(database)
         self.inbound_rate = RateLogger("Inbound")
@@ -62,7 +82,7 @@ class Cache(object):
                     "CREATE TABLE cache ("
                     "   path TEXT PRIMARY KEY, "
                     "   headers TEXT, "
-                    "   response TEXT, "
+                    "   response BLOB, "
                     "   timestamp REAL "
                     ")"
                 )
@@ -71,47 +91,108 @@ class Cache(object):
             Thread.run(APP_NAME + " worker" + text(i), self._worker)
             for i in range(CONCURRENCY)
         ]
-        self.limiter = Thread.run(APP_NAME + " limiter", self._rate_limiter)
         self.cleaner = Thread.run(APP_NAME + " cleaner", self._cache_cleaner)
+        self.writer = Thread.run(APP_NAME + " writer", self._db_writer)
 
-    def _rate_limiter(self, please_stop):
-        try:
-            max_requests = self.requests.max
-            recent_requests = []
-
-            while not please_stop:
-                now = Date.now()
-                too_old = now - self.amortization_period
-
-                recent_requests = [t for t in recent_requests if t > too_old]
-
-                num_recent = len(recent_requests)
-                if num_recent >= max_requests:
-                    space_free_at = recent_requests[0] + self.amortization_period
-                    (please_stop | Till(till=space_free_at.unix)).wait()
-                    continue
-                for _ in xrange(num_recent, max_requests):
-                    request = self.todo.pop()
-                    now = Date.now()
-                    recent_requests.append(now)
-                    self.requests.add(request)
-        except Exception as e:
-            Log.warning("failure", cause=e)
+    def stop(self):
+        """
+        STOP THE THREADS, AND WAIT FOR THE WRITER TO FLUSH TO THE DATABASE
+        """
+        for t in self.threads:
+            t.stop()
+        self.cleaner.stop()
+        self.writer.stop()
+        self.writer.join()
 
     def _cache_cleaner(self, please_stop):
         while not please_stop:
-            now = Date.now()
-            too_old = now - CACHE_RETENTION
+            too_old = Date.now() - CACHE_RETENTION
 
-            remove = set()
             with self.cache_locker:
-                for path, (ready, headers, response, timestamp) in self.cache:
-                    if timestamp < too_old:
-                        remove.add(path)
-                for r in remove:
-                    del self.cache[r]
+                # LEAST RECENTLY USED ARE FIRST
+                for path, (ready, headers, response, timestamp) in list(self.cache.items()):
+                    if timestamp >= too_old:
+                        break
+                    if response is None:
+                        continue  # STILL WAITING ON hg.mo
+                    del self.cache[path]
+                    self.cache_size -= len(response)
             (please_stop | Till(seconds=CACHE_RETENTION.seconds / 2)).wait()
 
+    def _set(self, path, ready, headers, response, timestamp):
+        """
+        EXPECTS self.cache_locker TO BE HELD
+        ADD TO THE MOST-RECENTLY-USED END OF THE CACHE, AND EVICT IF TOO BIG
+        """
+        old = self.cache.pop(path, None)
+        if old and old[2] is not None:
+            self.cache_size -= len(old[2])
+        self.cache[path] = (ready, headers, response, timestamp)
+        if response is None:
+            return
+        self.cache_size += len(response)
+
+        excess = self.cache_size - self.max_memory
+        if excess <= 0:
+            return
+        evict = []
+        for old_path, (_, _, old_response, _) in self.cache.items():
+            if excess <= 0:
+                break
+            if old_path == path or old_response is None:
+                continue  # KEEP WHAT WAS JUST ADDED, AND WHAT IS STILL WAITING ON hg.mo
+            evict.append(old_path)
+            excess -= len(old_response)
+        for old_path in evict:
+            self.cache_size -= len(self.cache.pop(old_path)[2])
+
+    def _db_writer(self, please_stop):
+        """
+        WRITE-BEHIND: COLLECT CACHE HITS AND NEW RESPONSES INTO ONE TRANSACTION
+        """
+        please_stop.then(lambda: self.db_todo.add(THREAD_STOP))
+        while not please_stop:
+            todo = self.db_todo.pop(till=please_stop)
+            if todo is THREAD_STOP:
+                break
+            (please_stop | Till(seconds=WRITE_BEHIND_DELAY.seconds)).wait()
+            self._db_write([todo] + self.db_todo.pop_all())
+        # FLUSH WHAT IS LEFT
+        self._db_write(self.db_todo.pop_all())
+
+    def _db_write(self, todo):
+        try:
+            inserts = {}  # MAP FROM path TO (timestamp, headers, response)
+            hits = {}  # MAP FROM path TO LATEST timestamp
+            for item in todo:
+                if item is None or item is THREAD_STOP:
+                    continue
+                path, timestamp, headers, response = item
+                if headers is None:
+                    hits[path] = max(hits.get(path, timestamp), timestamp)
+                else:
+                    inserts[path] = (timestamp, headers, response)
+            if not inserts and not hits:
+                return
+
+            with self.db.transaction() as t:
+                for path, (timestamp, headers, response) in inserts.items():
+                    t.execute(
+                        "INSERT OR REPLACE INTO cache (path, headers, response, timestamp) VALUES (?, ?, ?, ?)",
+                        (path, headers, zlib.compress(response), timestamp),
+                    )
+                for path, timestamp in hits.items():
+                    t.execute(
+                        "UPDATE cache SET timestamp="
+                        + quote_value(timestamp)
+                        + " WHERE path="
+                        + quote_value(path)
+                        + " AND timestamp<"
+                        + quote_value(timestamp)
+                    )
+        except Exception as e:
+            Log.warning("problem writing {{num}} cache updates", num=len(todo), cause=e)
+
     def please_cache(self, path):
         """
         :return: False if `path` is not to be cached
@@ -146,7 +227,9 @@ class Cache(object):
         with self.cache_locker:
             pair = self.cache.get(path)
             if pair is None:
-                self.cache[path] = (ready, None, None, now)
+                self._set(path, ready, None, None, now)
+            elif pair[2] is not None:
+                self._set(path, pair[0], pair[1], pair[2], now)
 
         if pair is not None:
             # REQUEST IS IN THE QUEUE ALREADY, WAIT
@@ -154,16 +237,11 @@ class Cache(object):
             if response is None:
                 ready.wait()
                 with self.cache_locker:
-                    ready, headers, response, timestamp = self.cache.get(path)
-            with self.db.transaction() as t:
-                t.execute(
-                    "UPDATE cache SET timestamp="
-                    + quote_value(now)
-                    + " WHERE path="
-                    + quote_value(path)
-                    + " AND timestamp<"
-                    + quote_value(now)
-                )
+                    pair = self.cache.get(path)
+                if pair is None or pair[2] is None:
+                    Log.error("Problem with request to {{path}}", path=path)
+                ready, headers, response, timestamp = pair
+            self.db_todo.add((path, now, None, None))
             return Response(response, status=200, headers=json.loads(headers))
 
         # TEST DB
@@ -172,26 +250,26 @@ class Cache(object):
         ).data
         if db_response:
             headers, response = db_response[0]
-            with self.db.transaction() as t:
-                t.execute(
-                    "UPDATE cache SET timestamp="
-                    + quote_value(now)
-                    + " WHERE path="
-                    + quote_value(path)
-                    + " AND timestamp<"
-                    + quote_value(now)
-                )
+            if is_text(response):
+                # OLDER RECORDS WERE STORED AS latin1 TEXT
+                response = response.encode("latin1")
+            else:
+                response = zlib.decompress(response)
+            self.db_todo.add((path, now, None, None))
             with self.cache_locker:
-                self.cache[path] = (ready, headers, response.encode("latin1"), now)
+                self._set(path, ready, headers, response, now)
             ready.go()
 
             return Response(response, status=200, headers=json.loads(headers))
 
         # MAKE A NETWORK REQUEST
-        self.todo.add((ready, method, path, headers, now))
+        self.requests.add(path, (ready, method, path, headers, now))
         ready.wait()
         with self.cache_locker:
-            ready, headers, response, timestamp = self.cache[path]
+            pair = self.cache.get(path)
+        if pair is None or pair[2] is None:
+            Log.error("Problem with request to {{path}}", path=path)
+        ready, headers, response, timestamp = pair
         return Response(response, status=200, headers=json.loads(headers))
 
     def _worker(self, please_stop):
@@ -212,19 +290,13 @@ class Cache(object):
 
                 please_cache = self.please_cache(path)
                 if please_cache:
-                    with self.db.transaction() as t:
-                        t.execute(
-                            "INSERT INTO cache (path, headers, response, timestamp) VALUES"
-                            + quote_list(
-                                (path, resp_headers, resp_content.decode("latin1"), timestamp)
-                            )
-                        )
+                    self.db_todo.add((path, timestamp, resp_headers, resp_content))
                 with self.cache_locker:
-                    self.cache[path] = (ready, resp_headers, resp_content, timestamp)
+                    self._set(path, ready, resp_headers, resp_content, timestamp)
             except Exception as e:
                 Log.warning("problem with request to {{path}}", path=path, cause=e)
                 with self.cache_locker:
-                    ready, headers, response = self.cache[path]
-                    del self.cache[path]
+                    self.cache.pop(path, None)
             finally:
                 ready.go()
+
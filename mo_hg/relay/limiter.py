@@ -0,0 +1,157 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Contact: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import division, unicode_literals
+
+from collections import deque
+from time import time
+
+from mo_dots import coalesce
+from mo_threads import Lock, Till
+
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+NUM_LANES = 3
+
+# MAP FROM PATH PATTERN TO LANE; LOWER LANES ARE SERVED FIRST
+LANES = {
+    "/json-rev/": INTERACTIVE,
+    "/json-info/": INTERACTIVE,
+    "/rev/": INTERACTIVE,
+    "/raw-rev/": INTERACTIVE,
+    "/json-annotate/": BULK,
+    "/raw-file/": BULK,
+    "/file/": BULK,
+}
+
+# MAP FROM PATH PATTERN TO NUMBER OF TOKENS A REQUEST COSTS (DEFAULT 1)
+WEIGHTS = {"/json-annotate/": 2}
+
+# FRACTION OF TOKENS A WAITING LOWER LANE IS GUARANTEED, SO IT IS NOT STARVED
+MIN_SHARE = 0.1
+
+
+class RateLimiter(object):
+    """
+    TOKEN BUCKET THAT RELEASES REQUESTS AT rate PER SECOND, HIGHEST
+    PRIORITY LANE FIRST. A REQUEST FOR A path ALREADY WAITING IS DROPPED.
+    EACH WAITING LOWER LANE EARNS min_share OF THE TOKENS SPENT ON OTHER
+    LANES AS CREDIT, AND IS SERVED WHEN ITS CREDIT PAYS FOR ITS NEXT REQUEST.
+    """
+
+    def __init__(self, name, rate, burst=None, lanes=None, weights=None, min_share=None, clock=None):
+        """
+        :param rate: TOKENS ADDED PER SECOND
+        :param burst: MOST TOKENS THAT CAN ACCUMULATE
+        :param lanes: MAP FROM PATH PATTERN TO LANE
+        :param weights: MAP FROM PATH PATTERN TO TOKEN COST
+        :param min_share: FRACTION OF TOKENS GUARANTEED TO EACH WAITING LOWER LANE
+        :param clock: FUNCTION RETURNING SECONDS; FOR SIMULATED TIME
+        """
+        self.rate = rate
+        self.burst = max(1, coalesce(burst, rate))
+        self.lanes = coalesce(lanes, LANES)
+        self.weights = coalesce(weights, WEIGHTS)
+        self.min_share = coalesce(min_share, MIN_SHARE)
+        self.clock = clock or time
+        self.tokens = self.burst
+        self.last = self.clock()
+        self.queues = [deque() for _ in range(NUM_LANES)]  # (path, weight, request) TRIPLES
+        self.credit = [0] * NUM_LANES  # TOKENS EARNED BY EACH LOWER LANE WHILE IT WAITS
+        self.waiting = set()  # PATHS IN THE queues
+        self.locker = Lock(name)
+
+    def lane_and_weight(self, path):
+        """
+        :return: (lane, weight) FOR path; THE MOST URGENT LANE, AND HIGHEST WEIGHT, OF ALL MATCHING PATTERNS
+        """
+        lanes = [lane for pattern, lane in self.lanes.items() if pattern in path]
+        weights = [weight for pattern, weight in self.weights.items() if pattern in path]
+        lane = min(lanes) if lanes else NORMAL
+        weight = max(weights) if weights else 1
+        # A REQUEST COSTING MORE THAN THE BUCKET HOLDS WOULD NEVER BE SENT
+        return lane, min(weight, self.burst)
+
+    def add(self, path, request):
+        """
+        :return: False IF path IS ALREADY WAITING, AND request IS DROPPED
+        """
+        lane, weight = self.lane_and_weight(path)
+        with self.locker:
+            if path in self.waiting:
+                return False
+            self.waiting.add(path)
+            self.queues[lane].append((path, weight, request))
+        return True
+
+    def __len__(self):
+        return len(self.waiting)
+
+    def pop(self, till=None):
+        """
+        :return: NEXT request, WHEN THERE IS A TOKEN FOR IT; None IF till
+        """
+        with self.locker:
+            while not till:
+                request, wait = self._next(self.clock())
+                if request is not None:
+                    return request
+                if wait is None:
+                    self.locker.wait(till=till)
+                else:
+                    self.locker.wait(till=Till(seconds=wait) | till)
+        return None
+
+    def pop_ready(self):
+        """
+        :return: NEXT request, OR None IF NOTHING CAN BE RELEASED NOW
+        """
+        with self.locker:
+            request, _ = self._next(self.clock())
+            return request
+
+    def _next(self, now):
+        """
+        EXPECTS self.locker TO BE HELD
+        :return: (request, None) IF RELEASED, OR (None, seconds TO WAIT), OR (None, None) IF EMPTY
+        """
+        # REFILL
+        if now > self.last:
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+        waiting = [lane for lane, queue in enumerate(self.queues) if queue]
+        if not waiting:
+            return None, None
+
+        # A LOWER LANE WITH ENOUGH CREDIT GOES BEFORE THE HIGHEST PRIORITY LANE
+        lane = waiting[0]
+        for l in waiting[1:]:
+            if self.credit[l] >= self.queues[l][0][1]:
+                lane = l
+                break
+
+        queue = self.queues[lane]
+        path, weight, request = queue[0]
+        if self.tokens < weight:
+            return None, (weight - self.tokens) / self.rate
+        queue.popleft()
+        self.waiting.discard(path)
+        self.tokens -= weight
+
+        if lane == waiting[0]:
+            for l in waiting[1:]:
+                self.credit[l] += weight * self.min_share
+        else:
+            self.credit[lane] -= weight
+        if not queue:
+            # NO SAVING CREDIT FOR LATER
+            self.credit[lane] = 0
+        return request, None
@@ -10,6 +10,7 @@
 from __future__ import absolute_import, division, unicode_literals
 
 import json
+import re
 from types import GeneratorType
 
 from mo_dots import (
@@ -30,6 +31,14 @@ DEBUG = False
 MIN_READ_SIZE = 8 * 1024
 WHITESPACE = b" \n\r\t"
 CLOSE = {b"{": b"}", b"[": b"]"}
+
+# SCANNING IS DONE OVER WHOLE CHUNKS, NOT ONE BYTE AT A TIME
+NOT_WHITESPACE = re.compile(br"[^ \n\r\t]")
+STRING_END = re.compile(br'["\\]')
+STRING_BODY = re.compile(br'[^"\\]*(?:\\.[^"\\]*)*"')
+# A WHOLE STRING, OR A STRUCTURAL CHARACTER (A LONE QUOTE MEANS THE STRING IS NOT ALL IN THE BUFFER)
+SKIP_TOKEN = re.compile(br'"[^"\\]*(?:\\.[^"\\]*)*"|(["\[\]{}])')
+PRIMITIVE_END = re.compile(br"[,\]}]")
 NO_VARS = set()
 
 json_decoder = json.JSONDecoder().decode
@@ -258,58 +267,50 @@ class Parser(object):
         DO NOT PROCESS THIS JSON OBJECT, JUST RETURN WHERE IT ENDS
         """
         if c == b'"':
-            while True:
-                c = self.json[index]
-                index += 1
-                if c == b"\\":
-                    index += 1
-                elif c == b'"':
-                    break
-            return index
+            return self._string_end(index)
         elif c not in b"[{":
-            while True:
-                c = self.json[index]
-                index += 1
-                if c in b",]}":
-                    break
-            return index - 1
+            return self.json.search(PRIMITIVE_END, index)
 
         # OBJECTS AND ARRAYS ARE MORE INVOLVED
-        stack = [b" "] * 1024
-        stack[0] = CLOSE[c]
-        i = 0  # FOR INDEXING THE STACK
+        json = self.json
+        stack = [CLOSE[c]]
+        while True:
+            for match, index in json.tokens(SKIP_TOKEN, index):
+                c = match.group(1)
+                if c is None:
+                    continue  # WHOLE STRING
+                elif c == b'"':
+                    # STRING IS NOT ALL IN THE BUFFER
+                    index = self._string_end(index)
+                    break
+                elif c in b"[{":
+                    stack.append(CLOSE[c])
+                elif c == stack[-1]:
+                    stack.pop()
+                    if not stack:
+                        return index  # FOUND THE MATCH!  RETURN
+                else:
+                    Log.error("expecting {{symbol}}", symbol=stack[-1])
+
+    def _string_end(self, index):
+        """
+        :param index: JUST PAST THE OPENING QUOTE
+        :return: INDEX JUST PAST THE CLOSING QUOTE
+        """
+        json = self.json
+        end = json.match(STRING_BODY, index)
+        if end is not None:
+            return end
         while True:
-            c = self.json[index]
-            index += 1
-
-            if c == b'"':
-                while True:
-                    c = self.json[index]
-                    index += 1
-                    if c == b"\\":
-                        index += 1
-                    elif c == b'"':
-                        break
-            elif c in b"[{":
-                i += 1
-                stack[i] = CLOSE[c]
-            elif c == stack[i]:
-                i -= 1
-                if i == -1:
-                    return index  # FOUND THE MATCH!  RETURN
-            elif c in b"]}":
-                Log.error("expecting {{symbol}}", symbol=stack[i])
+            index = json.search(STRING_END, index)
+            if json[index] == b'"':
+                return index + 1
+            index += 2  # SKIP THE ESCAPED CHARACTER
 
     def simple_token(self, index, c):
         if c == b'"':
             self.json.mark(index - 1)
-            while True:
-                c = self.json[index]
-                index += 1
-                if c == b"\\":
-                    index += 1
-                elif c == b'"':
-                    break
+            index = self._string_end(index)
             return json_decoder(self.json.release(index).decode("utf8")), index
         elif c in b"{[":
             self.json.mark(index - 1)
@@ -325,11 +326,7 @@ class Parser(object):
             return False, index + 4
         else:
             self.json.mark(index - 1)
-            while True:
-                c = self.json[index]
-                if c in b",]}":
-                    break
-                index += 1
+            index = self.json.search(PRIMITIVE_END, index)
             text = self.json.release(index)
             try:
                 return float(text), index
@@ -340,11 +337,8 @@ class Parser(object):
         """
         RETURN NEXT NON-WHITESPACE CHAR, AND ITS INDEX
         """
-        c = self.json[index]
-        while c in WHITESPACE:
-            index += 1
-            c = self.json[index]
-        return c, index + 1
+        index = self.json.search(NOT_WHITESPACE, index)
+        return self.json[index], index + 1
 
 
 def parse(json, query_path, expected_vars=NO_VARS):
@@ -402,6 +396,10 @@ def needed(name, required):
 class List_usingStream(object):
     """
     EXPECTING A FUNCTION
+
+    BYTES BEFORE THE CURRENT READ POSITION (OR BEFORE THE mark()) ARE
+    DROPPED AS MORE BYTES ARE READ, SO MEMORY IS BOUNDED BY THE LARGEST
+    MARKED VALUE, NOT THE SIZE OF THE STREAM
     """
 
     def __init__(self, get_more_bytes):
@@ -412,53 +410,101 @@ class List_usingStream(object):
             Log.error("Expecting a function that will return bytes")
 
         self.get_more = get_more_bytes
-        self.start = 0
+        self.start = 0  # STREAM INDEX OF self.buffer[0]
         self._mark = -1
         self.buffer = self.get_more()
         self.buffer_length = len(self.buffer)
-        pass
 
     def __getitem__(self, index):
         offset = index - self.start
-        if offset < len(self.buffer):
-            return self.buffer[offset : offset + 1]
-
         if offset < 0:
             Log.error(
                 "Can not go in reverse on stream index=={{index}} (offset={{offset}})",
                 index=index,
                 offset=offset,
             )
-
-        if self._mark == -1:
-            self.start += self.buffer_length
-            offset = index - self.start
-            self.buffer = self.get_more()
-            self.buffer_length = len(self.buffer)
-            if self.buffer_length == 0:
-                raise EOFError()
-            while self.buffer_length <= offset:
-                more = self.get_more()
-                self.buffer += more
-                self.buffer_length = len(self.buffer)
-            return self.buffer[offset : offset + 1]
-
-        needless_bytes = self._mark - self.start
-        if needless_bytes:
-            self.start = self._mark
+        if offset >= self.buffer_length:
+            self._more(index)
             offset = index - self.start
-            self.buffer = self.buffer[needless_bytes:]
-            self.buffer_length = len(self.buffer)
+        return self.buffer[offset : offset + 1]
 
-        while self.buffer_length <= offset:
-            more = self.get_more()
-            self.buffer += more
-            self.buffer_length = len(self.buffer)
+    def search(self, pattern, index):
+        """
+        :param pattern: COMPILED REGEX THAT MATCHES A SINGLE BYTE
+        :param index: WHERE TO START SEARCHING
+        :return: INDEX OF THE FIRST MATCH AT, OR AFTER, index
+        """
+        return self.find(pattern, index)[0]
 
-        try:
-            return self.buffer[offset : offset + 1]
-        except Exception as e:
-            Log.error("error", cause=e)
+    def find(self, pattern, index):
+        """
+        :param pattern: COMPILED REGEX; ONLY SINGLE BYTE MATCHES MAY SPAN CHUNKS
+        :param index: WHERE TO START SEARCHING
+        :return: (start, end) OF THE FIRST MATCH AT, OR AFTER, index
+        """
+        if index < self.start:
+            Log.error("Can not go in reverse on stream")
+        while True:
+            match = pattern.search(self.buffer, index - self.start)
+            if match:
+                start = self.start
+                return start + match.start(), start + match.end()
+            index = max(index, self.start + self.buffer_length)
+            self._more(index)
+
+    def tokens(self, pattern, index):
+        """
+        :param pattern: COMPILED REGEX; ONLY SINGLE BYTE MATCHES MAY SPAN CHUNKS
+        :param index: WHERE TO START SEARCHING
+        :return: GENERATOR OF (match, end) FOR EACH MATCH AT, OR AFTER, index
+                 STOP ITERATING IF YOU READ FROM THE STREAM IN THE MEANTIME
+        """
+        if index < self.start:
+            Log.error("Can not go in reverse on stream")
+        while True:
+            start = self.start
+            for match in pattern.finditer(self.buffer, index - start):
+                index = start + match.end()
+                yield match, index
+            index = max(index, self.start + self.buffer_length)
+            self._more(index)
+
+    def match(self, pattern, index):
+        """
+        MATCH pattern AT index, USING ONLY THE BYTES ALREADY IN THE BUFFER
+        :return: END INDEX OF THE MATCH, OR None
+        """
+        match = pattern.match(self.buffer, index - self.start)
+        if match:
+            return self.start + match.end()
+        return None
+
+    def _more(self, index):
+        """
+        FORGET BYTES THAT ARE NO LONGER NEEDED, AND READ UNTIL index IS IN THE BUFFER
+        """
+        keep = index if self._mark == -1 else min(self._mark, index)
+        needless_bytes = keep - self.start
+        if needless_bytes > 0:
+            self.buffer = self.buffer[needless_bytes:]
+            self.start = keep
+
+        # COLLECT CHUNKS, AND JOIN ONCE; AT LEAST DOUBLE THE BUFFER SO
+        # GROWING A LARGE MARKED VALUE IS NOT QUADRATIC
+        required = index - self.start + 1
+        minimum = max(required, 2 * len(self.buffer))
+        chunks = [self.buffer]
+        length = len(self.buffer)
+        while length < minimum:
+            more = self.get_more()
+            if not more:
+                break
+            chunks.append(more)
+            length += len(more)
+        self.buffer = b"".join(chunks)
+        self.buffer_length = length
+        if length < required:
+            raise EOFError()
 
     def slice(self, start, stop):
         self.mark(start)
@@ -478,11 +524,8 @@ class List_usingStream(object):
         if self._mark == -1:
             Log.error("Must mark() this stream before release")
 
-        end_offset = end - self.start
-        while self.buffer_length < end_offset:
-            self.buffer += self.get_more()
-            self.buffer_length = len(self.buffer)
-
-        output = self.buffer[self._mark - self.start : end_offset]
+        if end - self.start > self.buffer_length:
+            self._more(end - 1)
+        output = self.buffer[self._mark - self.start : end - self.start]
         self._mark = -1
         return output
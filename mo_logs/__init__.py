@@ -14,7 +14,7 @@ import platform
 import sys
 from datetime import datetime
 
-from mo_dots import Data, FlatList, coalesce, is_list, listwrap, unwraplist, dict_to_data, is_data
+from mo_dots import Data, FlatList, coalesce, is_list, listwrap, unwraplist, dict_to_data, is_data, from_data
 from mo_future import PY3, is_text, text, STDOUT
 from mo_imports import delay_import
 from mo_kwargs import override
@@ -28,6 +28,16 @@ from mo_logs.strings import CR, indent
 
 _Thread = None
 
+# LOWEST LEVEL IS MOST VERBOSE
+LEVELS = {
+    exceptions.NOTE: 10,
+    exceptions.ALARM: 20,
+    exceptions.UNEXPECTED: 30,
+    exceptions.WARNING: 30,
+    exceptions.ERROR: 40,
+}
+MAX_FORMATS = 1000  # NUMBER OF LOG FORMATS TO REMEMBER
+
 
 class Log(object):
     """
@@ -38,10 +48,14 @@ class Log(object):
     logging_multi = None
     profiler = None   # simple pypy-friendly profiler
     error_mode = False  # prevent error loops
+    level = LEVELS[exceptions.NOTE]  # LOWEST LEVEL LOGGED, FOR MODULES NOT IN levels
+    levels = {}  # MAP FROM MODULE (OR PACKAGE) NAME TO LOWEST LEVEL LOGGED
+    filtered = False  # True IF SOME NOTES ARE NOT LOGGED
+    _thresholds = {}  # MEMO FROM MODULE NAME TO LOWEST LEVEL LOGGED
 
     @classmethod
     @override("settings")
-    def start(cls, trace=False, cprofile=False, constants=None, logs=None, app_name=None, settings=None):
+    def start(cls, trace=False, cprofile=False, constants=None, logs=None, app_name=None, level=None, levels=None, settings=None):
         """
         RUN ME FIRST TO SETUP THE THREADED LOGGING
         https://fangpenlin.com/posts/2012/08/26/good-logging-practice-in-python/
@@ -52,6 +66,8 @@ class Log(object):
         :param constants: UPDATE MODULE CONSTANTS AT STARTUP (PRIMARILY INTENDED TO CHANGE DEBUG STATE)
         :param logs: LIST OF PARAMETERS FOR LOGGER(S)
         :param app_name: GIVE THIS APP A NAME, AND RETURN A CONTEXT MANAGER
+        :param level: LOWEST LEVEL LOGGED (note, alarm, warning, ...) (default note)
+        :param levels: MAP FROM MODULE (OR PACKAGE) NAME TO LOWEST LEVEL LOGGED, FOR THAT MODULE
         :param settings: ALL THE ABOVE PARAMTERS
         :return:
         """
@@ -63,6 +79,7 @@ class Log(object):
 
         cls.settings = settings
         cls.trace = trace
+        cls.set_levels(level, levels)
         if trace:
             from mo_threads import Thread as _Thread
             _ = _Thread
@@ -118,10 +135,15 @@ class Log(object):
         if log_type == "logger":
             from mo_logs.log_usingLogger import StructuredLogger_usingLogger
             return StructuredLogger_usingLogger(settings)
-        if log_type == "file" or settings.file:
-            return StructuredLogger_usingFile(settings.file)
-        if log_type == "file" or settings.filename:
-            return StructuredLogger_usingFile(settings.filename)
+        if log_type == "file" or settings.file or settings.filename:
+            return StructuredLogger_usingFile(
+                settings.file or settings.filename,
+                buffer_size=settings.buffer_size,
+                flush_period=settings.flush_period,
+                max_size=settings.max_size,
+                max_age=settings.max_age,
+                compress=settings.compress,
+            )
         if log_type == "console":
             from mo_logs.log_usingThread import StructuredLogger_usingThread
             return StructuredLogger_usingThread(StructuredLogger_usingStream(STDOUT))
@@ -146,6 +168,43 @@ class Log(object):
 
         Log.error("Log type of {{config|json}} is not recognized", config=settings)
 
+    @classmethod
+    def set_levels(cls, level=None, levels=None):
+        """
+        :param level: LOWEST LEVEL LOGGED (note, alarm, warning, ...)
+        :param levels: MAP FROM MODULE (OR PACKAGE) NAME TO LOWEST LEVEL LOGGED, FOR THAT MODULE
+        """
+        note = LEVELS[exceptions.NOTE]
+        cls.level = _level_number(coalesce(level, exceptions.NOTE))
+        cls.levels = {k: _level_number(v) for k, v in (from_data(levels) or {}).items()}
+        cls._thresholds = {}
+        cls.filtered = cls.level > note or any(v > note for v in cls.levels.values())
+
+    @classmethod
+    def _accept(cls, level, stack_depth):
+        """
+        :param level: LEVEL OF THE MESSAGE
+        :param stack_depth: HOW FAR UP THE STACK THE CALLER IS
+        :return: True IF THE CALLER'S MODULE LOGS AT THIS level
+        """
+        module = sys._getframe(stack_depth + 1).f_globals.get("__name__", "")
+        threshold = cls._thresholds.get(module)
+        if threshold is None:
+            threshold = cls._thresholds[module] = cls._threshold(module)
+        return level >= threshold
+
+    @classmethod
+    def _threshold(cls, module):
+        """
+        :return: LOWEST LEVEL LOGGED FOR module, FROM THE LONGEST MATCHING PACKAGE IN levels
+        """
+        path = module.split(".")
+        for i in range(len(path), 0, -1):
+            threshold = cls.levels.get(".".join(path[:i]))
+            if threshold is not None:
+                return threshold
+        return cls.level
+
     @classmethod
     def _add_log(cls, log):
         cls.logging_multi.add_log(log)
@@ -176,6 +235,8 @@ class Log(object):
         :param more_params: *any more parameters (which will overwrite default_params)
         :return:
         """
+        if cls.filtered and not cls._accept(LEVELS[exceptions.NOTE], stack_depth + 1):
+            return
         timestamp = datetime.utcnow()
         if not is_text(template):
             Log.error("Log.note was expecting a unicode template")
@@ -210,6 +271,8 @@ class Log(object):
         :param more_params: *any more parameters (which will overwrite default_params)
         :return:
         """
+        if cls.filtered and not cls._accept(LEVELS[exceptions.UNEXPECTED], stack_depth + 1):
+            return
         timestamp = datetime.utcnow()
         if not is_text(template):
             Log.error("Log.warning was expecting a unicode template")
@@ -249,6 +312,8 @@ class Log(object):
         :param more_params: more parameters (which will overwrite default_params)
         :return:
         """
+        if cls.filtered and not cls._accept(LEVELS[exceptions.ALARM], stack_depth + 1):
+            return
         timestamp = datetime.utcnow()
         format = ("*" * 80) + CR + indent(template, prefix="** ").strip() + CR + ("*" * 80)
         Log._annotate(
@@ -283,6 +348,8 @@ class Log(object):
         :param more_params: *any more parameters (which will overwrite default_params)
         :return:
         """
+        if cls.filtered and not cls._accept(LEVELS[exceptions.WARNING], stack_depth + 1):
+            return
         timestamp = datetime.utcnow()
         if not is_text(template):
             Log.error("Log.warning was expecting a unicode template")
@@ -373,16 +440,23 @@ class Log(object):
         item.machine = machine_metadata
         item.template = strings.limit(item.template, 10000)
 
-        item.format = strings.limit(item.format, 10000)
         if item.format == None:
-            format = text(item)
+            log_format = item.format = _log_format(text(item), cls.trace)
         else:
-            format = item.format.replace("{{", "{{params.")
-        if not format.startswith(CR) and format.find(CR) > -1:
-            format = CR + format
+            # MOST FORMATS ARE LITERALS, SO REMEMBER THEM
+            key = (item.format, cls.trace)
+            log_format = _formats.get(key)
+            if log_format is None:
+                if len(_formats) >= MAX_FORMATS:
+                    _formats.clear()
+                log_format = _formats[key] = _log_format(
+                    strings.limit(item.format, 10000).replace("{{", "{{params."),
+                    cls.trace
+                )
+            item.format = log_format
 
         if cls.trace:
-            log_format = item.format = "{{machine.name}} (pid {{machine.pid}}) - {{timestamp|datetime}} - {{thread.name}} - \"{{location.file}}:{{location.line}}\" - ({{location.method}}) - " + format
+            # ONLY THE trace FORMAT SHOWS WHERE, AND ON WHICH THREAD, THE MESSAGE CAME FROM
             f = sys._getframe(stack_depth + 1)
             item.location = {
                 "line": f.f_lineno,
@@ -391,8 +465,6 @@ class Log(object):
             }
             thread = _Thread.current()
             item.thread = {"name": thread.name, "id": thread.id}
-        else:
-            log_format = item.format = "{{timestamp|datetime}} - " + format
 
         cls.main_log.write(log_format, item.__data__())
 
@@ -419,6 +491,33 @@ class LoggingContext:
         Log.stop()
 
 
+_formats = {}  # MEMO FROM (format, trace) TO LOG FORMAT
+
+
+def _log_format(format, trace):
+    """
+    :param format: THE MESSAGE, WITH ANY PARAMETERS ALREADY UNDER params
+    :return: FORMAT FOR THE WHOLE LOG LINE
+    """
+    if not format.startswith(CR) and format.find(CR) > -1:
+        format = CR + format
+    if trace:
+        return "{{machine.name}} (pid {{machine.pid}}) - {{timestamp|datetime}} - {{thread.name}} - \"{{location.file}}:{{location.line}}\" - ({{location.method}}) - " + format
+    return "{{timestamp|datetime}} - " + format
+
+
+def _level_number(level):
+    """
+    :return: NUMBER FOR level, WHICH IS A NAME (CASE INSENSITIVE) OR NUMBER
+    """
+    if isinstance(level, int):
+        return level
+    number = LEVELS.get(text(level).upper())
+    if number is None:
+        Log.error("Expecting level to be one of {{levels}}, not {{level}}", levels=sorted(LEVELS.keys()), level=level)
+    return number
+
+
 def _same_frame(frameA, frameB):
     return (frameA.line, frameA.file) == (frameB.line, frameB.file)
 
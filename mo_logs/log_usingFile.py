@@ -11,18 +11,45 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import gzip
+import os
+import shutil
 import time
+from datetime import datetime
 
-from mo_future import allocate_lock
+from mo_future import allocate_lock, start_new_thread
 from mo_imports import expect
 from mo_logs.log_usingNothing import StructuredLogger
 from mo_logs.strings import expand_template
 
 Log = expect("Log")
 
+BUFFER_SIZE = 2 ** 16  # BYTES HELD BEFORE WRITING TO DISK
+FLUSH_PERIOD = 1  # MOST SECONDS A LINE WAITS IN THE BUFFER
+
 
 class StructuredLogger_usingFile(StructuredLogger):
-    def __init__(self, file):
+    """
+    KEEP THE FILE OPEN, AND WRITE LINES IN BATCHES
+    """
+
+    def __init__(
+        self,
+        file,
+        buffer_size=None,
+        flush_period=None,
+        max_size=None,
+        max_age=None,
+        compress=False,
+    ):
+        """
+        :param file: NAME OF THE LOG FILE
+        :param buffer_size: BYTES TO HOLD BEFORE WRITING
+        :param flush_period: MOST SECONDS A LINE WAITS BEFORE IT IS WRITTEN
+        :param max_size: ROTATE THE FILE WHEN IT HAS THIS MANY BYTES
+        :param max_age: ROTATE THE FILE AFTER THIS MANY SECONDS
+        :param compress: GZIP THE ROTATED FILES
+        """
         assert file
         from mo_files import File
 
@@ -31,13 +58,117 @@ class StructuredLogger_usingFile(StructuredLogger):
             self.file.backup()
             self.file.delete()
 
+        self.buffer_size = BUFFER_SIZE if buffer_size is None else buffer_size
+        self.flush_period = FLUSH_PERIOD if flush_period is None else flush_period
+        self.max_size = max_size
+        self.max_age = max_age
+        self.compress = compress
+
         self.file_lock = allocate_lock()
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.handle = None  # OPENED ON FIRST WRITE
+        self.size = 0  # BYTES IN CURRENT SEGMENT
+        self.opened = time.time()  # WHEN THE CURRENT SEGMENT STARTED
+        self.stopped = False
+        start_new_thread(self._flusher, ())
 
     def write(self, template, params):
+        line = (expand_template(template, params) + "\n").encode("utf8")
         try:
             with self.file_lock:
-                self.file.append(expand_template(template, params))
+                self.buffer.append(line)
+                self.buffer_bytes += len(line)
+                if self.stopped or self.buffer_bytes >= self.buffer_size:
+                    self._flush()
         except Exception as e:
             Log.warning("Problem writing to file {{file}}, waiting...", file=self.file.name, cause=e)
             time.sleep(5)
 
+    def flush(self):
+        with self.file_lock:
+            self._flush()
+
+    def stop(self):
+        with self.file_lock:
+            self.stopped = True
+            self._flush()
+            if self.handle:
+                self.handle.close()
+                self.handle = None
+
+    def _flusher(self):
+        """
+        WRITE THE BUFFER EVERY flush_period, SO QUIET LOGS STILL REACH DISK
+        """
+        while not self.stopped:
+            time.sleep(self.flush_period)
+            try:
+                with self.file_lock:
+                    if self.stopped:
+                        return
+                    self._flush()
+            except Exception as e:
+                Log.warning("Problem writing to file {{file}}", file=self.file.name, cause=e)
+
+    def _flush(self):
+        """
+        EXPECTS self.file_lock TO BE HELD
+        """
+        if self.buffer:
+            if self.handle is None:
+                self._open()
+            data = b"".join(self.buffer)
+            self.buffer = []
+            self.buffer_bytes = 0
+            self.handle.write(data)
+            self.handle.flush()
+            self.size += len(data)
+
+        if not self.size:
+            return
+        if (self.max_size and self.size >= self.max_size) or (
+            self.max_age and time.time() - self.opened >= self.max_age
+        ):
+            self._rotate()
+
+    def _open(self):
+        if not self.file.parent.exists:
+            self.file.parent.create()
+        self.handle = open(self.file.abspath, "ab")
+        self.size = self.handle.tell()
+        self.opened = time.time()
+
+    def _rotate(self):
+        """
+        MOVE THE CURRENT FILE ASIDE; THE NEXT WRITE STARTS A NEW ONE
+        """
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+        self.size = 0
+        self.opened = time.time()
+
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        segment = self.file.add_suffix(timestamp)
+        count = 0
+        while segment.exists or os.path.exists(segment.abspath + ".gz"):
+            count += 1
+            segment = self.file.add_suffix(timestamp + "_" + str(count))
+        os.rename(self.file.abspath, segment.abspath)
+
+        if self.compress:
+            start_new_thread(_gzip, (segment.abspath,))
+
+
+def _gzip(filename):
+    """
+    REPLACE filename WITH filename.gz
+    """
+    try:
+        with open(filename, "rb") as source:
+            with gzip.open(filename + ".gz", "wb") as dest:
+                shutil.copyfileobj(source, dest)
+        os.remove(filename)
+    except Exception as e:
+        Log.warning("Problem compressing {{file}}", file=filename, cause=e)
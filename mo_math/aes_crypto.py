@@ -8,6 +8,8 @@
 
 from __future__ import absolute_import, division, unicode_literals
 
+import struct
+
 from mo_dots import Data, get_module
 from mo_future import PY2, binary_type
 from mo_future import is_text, is_binary
@@ -15,7 +17,29 @@ from mo_logs import Log
 from mo_math import base642bytes, crypto, bytes2base64
 from mo_math.vendor.aespython import aes_cipher, cbc_mode, key_expander
 
+try:
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
 DEBUG = False
+BLOCK_SIZE = 16
+CHUNK_SIZE = 2 ** 16  # PLAINTEXT BYTES PER FRAME OF THE STREAM FORMAT (MULTIPLE OF BLOCK_SIZE)
+MAX_CACHED_KEYS = 10
+
+# STREAM FORMAT
+#   MAGIC
+#   16 BYTE SALT
+#   FRAMES, EACH IS:
+#       4 BYTE (BIG-ENDIAN) PLAINTEXT LENGTH
+#       CIPHERTEXT, ZERO-PADDED TO BLOCK_SIZE
+#   A ZERO LENGTH FRAME, TO MARK THE END
+# ALL FRAMES SHARE ONE CBC CHAIN
+MAGIC = b"\x00AES256\x01"
+FRAME_HEADER = struct.Struct(">I")
+
+_key_schedules = {}  # MAP FROM KEY TO EXPANDED KEY, FOR THE PURE PYTHON CIPHER
 
 
 def encrypt(text, _key, salt=None):
@@ -35,27 +59,16 @@ def encrypt(text, _key, salt=None):
 
     if _key is None:
         Log.error("Expecting a key")
-    if is_binary(_key):
-        _key = bytearray(_key)
     if salt is None:
         salt = crypto.bytes(16)
 
-    # Initialize encryption using key and iv
-    key_expander_256 = key_expander.KeyExpander(256)
-    expanded_key = key_expander_256.expand(_key)
-    aes_cipher_256 = aes_cipher.AESCipher(expanded_key)
-    aes_cbc_256 = cbc_mode.CBCMode(aes_cipher_256, 16)
-    aes_cbc_256.set_iv(salt)
-
     output = Data()
     output.type = "AES256"
     output.salt = bytes2base64(salt)
     output.length = len(data)
     output.encoding = encoding
 
-    encrypted = bytearray()
-    for _, d in _groupby16(data):
-        encrypted.extend(aes_cbc_256.encrypt_block(d))
+    encrypted = _cbc(_key, salt).encrypt(_pad(data))
     output.data = bytes2base64(encrypted)
     json = get_module("mo_json").value2json(output, pretty=True).encode("utf8")
 
@@ -70,26 +83,21 @@ def encrypt(text, _key, salt=None):
 def decrypt(data, _key):
     """
     ACCEPT BYTES -> UTF8 -> JSON -> {"salt":s, "length":l, "data":d}
+    ALSO ACCEPT THE STREAM FORMAT, WHICH DECRYPTS TO BYTES
     """
     # Key and iv have not been generated or provided, bail out
     if _key is None:
         Log.error("Expecting a key")
 
+    if data[: len(MAGIC)] == MAGIC:
+        return b"".join(decrypt_stream([data], _key))
+
     _input = get_module("mo_json").json2value(
         data.decode("utf8"), leaves=False, flexible=False
     )
 
-    # Initialize encryption using key and iv
-    key_expander_256 = key_expander.KeyExpander(256)
-    expanded_key = key_expander_256.expand(_key)
-    aes_cipher_256 = aes_cipher.AESCipher(expanded_key)
-    aes_cbc_256 = cbc_mode.CBCMode(aes_cipher_256, 16)
-    aes_cbc_256.set_iv(base642bytes(_input.salt))
-
     raw = base642bytes(_input.data)
-    out_data = bytearray()
-    for _, e in _groupby16(raw):
-        out_data.extend(aes_cbc_256.decrypt_block(e))
+    out_data = _cbc(_key, base642bytes(_input.salt)).decrypt(raw)
 
     if _input.encoding:
         return binary_type(out_data[: _input.length :]).decode(_input.encoding)
@@ -97,11 +105,150 @@ def decrypt(data, _key):
         return binary_type(out_data[: _input.length :])
 
 
-def _groupby16(bytes):
-    count = 0
-    index = 0
-    length = len(bytes)
-    while index < length:
-        yield count, bytes[index : index + 16]
-        count += 1
-        index += 16
+def encrypt_stream(chunks, _key, salt=None):
+    """
+    GENERATOR OF THE STREAM FORMAT
+    :param chunks: ITERABLE OF PLAINTEXT bytes, OF ANY SIZE
+    :param _key: 32 BYTE KEY
+    :param salt: OPTIONAL 16 BYTE INITIALIZATION VECTOR
+    :return: GENERATOR OF bytes
+    """
+    if _key is None:
+        Log.error("Expecting a key")
+    if salt is None:
+        salt = crypto.bytes(16)
+
+    cbc = _cbc(_key, salt)
+    yield MAGIC + binary_type(salt)
+
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer.extend(chunk)
+        if len(buffer) < CHUNK_SIZE:
+            continue
+        end = len(buffer) - len(buffer) % CHUNK_SIZE
+        for start in range(0, end, CHUNK_SIZE):
+            plain = buffer[start : start + CHUNK_SIZE]
+            yield FRAME_HEADER.pack(CHUNK_SIZE) + cbc.encrypt(plain)
+        del buffer[:end]
+    if buffer:
+        yield FRAME_HEADER.pack(len(buffer)) + cbc.encrypt(_pad(buffer))
+    yield FRAME_HEADER.pack(0)
+
+
+def decrypt_stream(chunks, _key):
+    """
+    GENERATOR OF PLAINTEXT FROM THE STREAM FORMAT
+    :param chunks: ITERABLE OF bytes, OF ANY SIZE
+    :param _key: 32 BYTE KEY
+    :return: GENERATOR OF bytes
+    """
+    if _key is None:
+        Log.error("Expecting a key")
+
+    reader = _Reader(chunks)
+    if reader.read(len(MAGIC)) != MAGIC:
+        Log.error("Expecting AES256 stream")
+    cbc = _cbc(_key, reader.read(BLOCK_SIZE))
+
+    while True:
+        header = reader.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            Log.error("AES256 stream is truncated")
+        length, = FRAME_HEADER.unpack(header)
+        if not length:
+            return
+        padded = _padded_length(length)
+        encrypted = reader.read(padded)
+        if len(encrypted) < padded:
+            Log.error("AES256 stream is truncated")
+        yield binary_type(cbc.decrypt(encrypted)[:length])
+
+
+class _Reader(object):
+    """
+    READ EXACT NUMBER OF BYTES FROM AN ITERABLE OF bytes
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = bytearray()
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer.extend(chunk)
+        output = binary_type(self.buffer[:size])
+        del self.buffer[:size]
+        return output
+
+
+def _cbc(key, salt):
+    """
+    :return: CBC CIPHER, WITH encrypt() AND decrypt() FOR WHOLE BLOCKS
+    """
+    key = binary_type(key)
+    salt = binary_type(salt)
+    if Cipher is not None:
+        return _FastCBC(key, salt)
+    return _SlowCBC(key, salt)
+
+
+class _FastCBC(object):
+    """
+    CBC USING THE cryptography LIBRARY
+    """
+
+    def __init__(self, key, salt):
+        cipher = Cipher(algorithms.AES(key), modes.CBC(salt), backend=default_backend())
+        self.encryptor = cipher.encryptor()
+        self.decryptor = cipher.decryptor()
+
+    def encrypt(self, data):
+        return self.encryptor.update(binary_type(data))
+
+    def decrypt(self, data):
+        return self.decryptor.update(binary_type(data))
+
+
+class _SlowCBC(object):
+    """
+    CBC USING THE VENDORED (PURE PYTHON) aespython
+    """
+
+    def __init__(self, key, salt):
+        expanded_key = _key_schedules.get(key)
+        if expanded_key is None:
+            if len(_key_schedules) >= MAX_CACHED_KEYS:
+                _key_schedules.clear()
+            expanded_key = _key_schedules[key] = key_expander.KeyExpander(256).expand(bytearray(key))
+        self.cbc = cbc_mode.CBCMode(aes_cipher.AESCipher(expanded_key), BLOCK_SIZE)
+        self.cbc.set_iv(bytearray(salt))
+
+    def encrypt(self, data):
+        output = bytearray()
+        for i in range(0, len(data), BLOCK_SIZE):
+            output.extend(self.cbc.encrypt_block(data[i : i + BLOCK_SIZE]))
+        return output
+
+    def decrypt(self, data):
+        output = bytearray()
+        for i in range(0, len(data), BLOCK_SIZE):
+            output.extend(self.cbc.decrypt_block(data[i : i + BLOCK_SIZE]))
+        return output
+
+
+def _padded_length(length):
+    return -(-length // BLOCK_SIZE) * BLOCK_SIZE
+
+
+def _pad(data):
+    """
+    ZERO-PAD data TO A WHOLE NUMBER OF BLOCKS
+    """
+    extra = _padded_length(len(data)) - len(data)
+    if not extra:
+        return data
+    return bytearray(data) + bytearray(extra)
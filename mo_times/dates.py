@@ -35,6 +35,14 @@ except Exception:
 ISO8601 = '%Y-%m-%dT%H:%M:%SZ'
 RFC1123 = '%a, %d %b %Y %H:%M:%S GMT'
 
+# ISO-8601/RFC-3339 SHAPES PARSED WITHOUT strptime, eg 2014-07-16, 2014-07-16 10:57, 2014-07-16T10:57:00.123+02:00
+ISO_PATTERN = re.compile(
+    r"^(\d{4})-(\d\d)-(\d\d)"
+    r"(?:[Tt ](\d\d):(\d\d)(?::(\d\d)(?:[.,](\d{1,9}))?)?)?"
+    r" ?(?:([Zz])|([+-])(\d\d):?(\d\d))?$"
+)
+MAX_SHAPES = 1000  # NUMBER OF LEARNED FORMATS TO REMEMBER
+
 
 class Date(object):
     __slots__ = ["unix"]
@@ -425,6 +433,10 @@ def unicode2Date(value, format=None):
             Log.error("Can not format {{value}} with {{format}}", value=value, format=format, cause=e)
 
     value = value.strip()
+    unix = _parse_iso(value)
+    if unix is not None:
+        return _unix2Date(unix)
+
     if value.lower() == "now":
         return _unix2Date(datetime2unix(_utcnow()))
     elif value.lower() == "today":
@@ -442,51 +454,136 @@ def unicode2Date(value, format=None):
         e = Except.wrap(e)  # FOR DEBUGGING
         pass
 
-    formats = [
-        "%Y-%m-%dT%H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%f"
-    ]
-    for f in formats:
-        try:
-            return _unix2Date(datetime2unix(datetime.strptime(value, f)))
-        except Exception:
-            pass
-
-
-
-    deformats = [
-        "%Y-%m",# eg 2014-07-16 10:57 +0200
-        "%Y%m%d",
-        "%d%m%Y",
-        "%d%m%y",
-        "%d%b%Y",
-        "%d%b%y",
-        "%d%B%Y",
-        "%d%B%y",
-        "%B%d%Y",
-        "%b%d%Y",
-        "%B%d%",
-        "%b%d%y",
-        "%Y%m%d%H%M%S%f",
-        "%Y%m%d%H%M%S",
-        "%Y%m%dT%H%M%S",
-        "%d%m%Y%H%M%S",
-        "%d%m%y%H%M%S",
-        "%d%b%Y%H%M%S",
-        "%d%b%y%H%M%S",
-        "%d%B%Y%H%M%S",
-        "%d%B%y%H%M%S"
-    ]
-    value = deformat(value)
-    for f in deformats:
-        try:
-            return unicode2Date(value, format=f)
-        except Exception:
-            pass
+    # TRY THE FORMAT THAT LAST WORKED FOR A VALUE OF THE SAME SHAPE
+    shape = _shape(value)
+    learned = _learned_formats.get(shape)
+    if learned:
+        clean, f = learned
+        unix = _strptime(deformat(value) if clean else value, f)
+        if unix is not None:
+            return _unix2Date(unix)
+
+    for f in FORMATS:
+        unix = _strptime(value, f)
+        if unix is not None:
+            _learn(shape, False, f)
+            return _unix2Date(unix)
+
+    clean = deformat(value)
+    for f in DEFORMATS:
+        unix = _strptime(clean, f)
+        if unix is not None:
+            _learn(shape, True, f)
+            return _unix2Date(unix)
+
+    from mo_logs import Log
+    Log.error("Can not interpret {{value}} as a datetime", value=clean)
+
+
+def strings2unix(values, format=None):
+    """
+    CONVERT AN ITERABLE OF STRINGS (LIKE A COLUMN OF TIMESTAMPS) TO UNIX TIMESTAMPS
+    :param values: STRINGS, OR None
+    :param format: OPTIONAL strptime FORMAT FOR ALL values
+    :return: LIST OF UNIX TIMESTAMPS (None FOR None)
+    """
+    output = []
+    seen = {}  # COLUMNS OFTEN REPEAT VALUES
+    for value in values:
+        if value == None:
+            output.append(None)
+            continue
+        unix = seen.get(value)
+        if unix is None:
+            unix = _parse_iso(value.strip()) if format is None else None
+            if unix is None:
+                unix = unicode2Date(value, format=format).unix
+            seen[value] = unix
+        output.append(unix)
+    return output
 
-    else:
-        from mo_logs import Log
-        Log.error("Can not interpret {{value}} as a datetime", value=value)
+
+FORMATS = [
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f"
+]
+
+# FORMATS FOR THE deformat()ED VALUE
+DEFORMATS = [
+    "%Y-%m",# eg 2014-07-16 10:57 +0200
+    "%Y%m%d",
+    "%d%m%Y",
+    "%d%m%y",
+    "%d%b%Y",
+    "%d%b%y",
+    "%d%B%Y",
+    "%d%B%y",
+    "%B%d%Y",
+    "%b%d%Y",
+    "%B%d%",
+    "%b%d%y",
+    "%Y%m%d%H%M%S%f",
+    "%Y%m%d%H%M%S",
+    "%Y%m%dT%H%M%S",
+    "%d%m%Y%H%M%S",
+    "%d%m%y%H%M%S",
+    "%d%b%Y%H%M%S",
+    "%d%b%y%H%M%S",
+    "%d%B%Y%H%M%S",
+    "%d%B%y%H%M%S"
+]
+
+_learned_formats = {}  # MAP FROM SHAPE TO (deformat?, FORMAT) THAT LAST WORKED
+
+
+def _learn(shape, clean, format):
+    if "a" not in shape:
+        # ALL-DIGIT SHAPES (eg 99999999, 99/99/9999) FIT MORE THAN ONE FORMAT
+        return
+    if len(_learned_formats) >= MAX_SHAPES:
+        _learned_formats.clear()
+    _learned_formats[shape] = (clean, format)
+
+
+def _shape(value):
+    """
+    :return: value WITH DIGITS AS 9, AND LETTERS AS a, eg "16/Jul/2014" -> "99/aaa/9999"
+    """
+    return value.translate(_SHAPE_TABLE)
+
+
+def _strptime(value, format):
+    """
+    :return: UNIX TIMESTAMP, OR None IF value DOES NOT MATCH format
+    """
+    try:
+        return datetime2unix(datetime.strptime(value, format))
+    except Exception:
+        return None
+
+
+def _parse_iso(value):
+    """
+    :return: UNIX TIMESTAMP, OR None IF value IS NOT A SIMPLE ISO-8601 TIMESTAMP
+    """
+    match = ISO_PATTERN.match(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, zulu, sign, tz_hour, tz_minute = match.groups()
+    hour, minute, second = int(hour or 0), int(minute or 0), int(second or 0)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    try:
+        days = date(int(year), int(month), int(day)).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return None
+    unix = days * 86400 + hour * 3600 + minute * 60 + second
+    if fraction:
+        unix += int(fraction) / (10 ** len(fraction))
+    if sign:
+        offset = int(tz_hour) * 3600 + int(tz_minute) * 60
+        unix = unix - offset if sign == "+" else unix + offset
+    return float(unix)
 
 
 if PY3:
@@ -495,6 +592,7 @@ if PY3:
 else:
     DATETIME_EPOCH = datetime(1970, 1, 1)
 DATE_EPOCH = date(1970, 1, 1)
+EPOCH_ORDINAL = DATE_EPOCH.toordinal()
 
 
 def datetime2unix(value):
@@ -542,18 +640,19 @@ def _unix2Date(unix):
 
 
 delchars = "".join(c for c in map(unichr, range(256)) if not c.isalnum())
+_DELETE_TABLE = {ord(c): None for c in delchars}
+_SHAPE_TABLE = {
+    ord(c): "9" if c.isdigit() else "a"
+    for c in map(unichr, range(256))
+    if c.isalnum()
+}
 
 
 def deformat(value):
     """
     REMOVE NON-ALPHANUMERIC CHARACTERS
     """
-    output = []
-    for c in value:
-        if c in delchars:
-            continue
-        output.append(c)
-    return "".join(output)
+    return value.translate(_DELETE_TABLE)
 
 
 if PY3:
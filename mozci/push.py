@@ -24,6 +24,11 @@ MAX_DEPTH = 14
 when the task did not run on the currently considered push.
 """
 
+PREFETCH_DEPTH = MAX_DEPTH
+"""The number of parents or children to fetch with a single pushlog query, when
+one of them is needed.
+"""
+
 
 class Push:
     """A representation of a single push.
@@ -35,6 +40,8 @@ class Push:
 
     # static thread pool, to avoid spawning threads too often.
     THREAD_POOL_EXECUTOR = concurrent.futures.ThreadPoolExecutor()
+    # separate pool for loading whole pushes, which themselves wait on THREAD_POOL_EXECUTOR.
+    PREFETCH_POOL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8)
 
     def __init__(self, revs, branch="autoland"):
         if isinstance(revs, str):
@@ -126,7 +133,7 @@ class Push:
             )
 
         result = result[str(push_id)]
-        push = Push(result["changesets"][::-1])
+        push = Push(result["changesets"][::-1], branch=self.branch)
         # avoids the need to query hgmo to find this info
         push._id = push_id
         push._date = result["date"]
@@ -147,7 +154,18 @@ class Push:
         # Mozilla-unified and try allow multiple heads, so we can't rely on
         # `self.id - 1` to be the parent.
         if self.branch not in ("mozilla-unified", "try"):
-            return self.create_push(self.id - 1)
+            # Fetch the parents of the parent too, they are likely to be needed next.
+            pushes = make_push_range(
+                self.id - 1 - PREFETCH_DEPTH, self.id - 1, branch=self.branch
+            )
+            if not pushes or pushes[-1].id != self.id - 1:
+                raise PushNotFound(
+                    f"push id {self.id - 1} does not exist",
+                    rev=self.rev,
+                    branch=self.branch,
+                )
+            pushes[-1]._child = self
+            return pushes[-1]
 
         changesets = [c for c in self._hgmo.changesets if c.get("phase") == "draft"]
         if not changesets:
@@ -207,12 +225,16 @@ class Push:
                 push can be detected.
         """
         if self.branch not in ("mozilla-unified", "try"):
-            try:
-                return self.create_push(self.id + 1)
-            except PushNotFound as e:
+            # Fetch the children of the child too, they are likely to be needed next.
+            pushes = make_push_range(
+                self.id, self.id + PREFETCH_DEPTH, branch=self.branch
+            )
+            if not pushes or pushes[0].id != self.id + 1:
                 raise ChildPushNotFound(
                     f"child push does not exist", rev=self.rev, branch=self.branch
-                ) from e
+                )
+            pushes[0]._parent = self
+            return pushes[0]
 
         raise ChildPushNotFound(
             f"finding child pushes not supported on {self.branch}",
@@ -1060,7 +1082,59 @@ def make_push_objects(**kwargs):
         pushes.append(cur)
 
     pushes.sort(key=lambda p: p._id)
+    _link_pushes(pushes)
+
+    return pushes
+
+
+def make_push_range(push_id_start, push_id_end, branch="autoland", prefetch=False):
+    """Returns the pushes with id in (push_id_start, push_id_end], linked to each other.
+
+    All pushes come from a single pushlog query, rather than one query per push
+    when following `child` or `parent`.
+
+    Args:
+        push_id_start (int): Exclusive lower bound of the push ids.
+        push_id_end (int): Inclusive upper bound of the push ids.
+        branch (str): Branch to look on (default: autoland).
+        prefetch (bool): Also load the tasks (and their groups) of all pushes concurrently.
+
+    Returns:
+        list: List of Push objects, ordered by id.
+    """
+    push_id_start = max(0, push_id_start)
+    if push_id_end <= push_id_start:
+        return []
 
+    result = HGMO.pushes(push_id_start, push_id_end, branch=branch)
+
+    pushes = []
+    for push_id, data in sorted(result.items(), key=lambda item: int(item[0])):
+        if not data["changesets"]:
+            continue
+
+        cur = Push(data["changesets"][::-1], branch=branch)
+
+        # avoids the need to query hgmo to find this info
+        cur._id = int(push_id)
+        cur._date = data["date"]
+
+        pushes.append(cur)
+
+    _link_pushes(pushes)
+
+    if prefetch:
+        concurrent.futures.wait(
+            [
+                Push.PREFETCH_POOL_EXECUTOR.submit(lambda push: push.tasks, push)
+                for push in pushes
+            ]
+        )
+
+    return pushes
+
+
+def _link_pushes(pushes):
     for i, cur in enumerate(pushes):
         if i != 0:
             cur._parent = pushes[i - 1]
@@ -1068,8 +1142,6 @@ def make_push_objects(**kwargs):
         if i != len(pushes) - 1:
             cur._child = pushes[i + 1]
 
-    return pushes
-
 
 def make_summary_objects(from_date, to_date, branch, type):
     """Returns a list of summary objects matching the parameters.
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from typing import Dict, Tuple
 
 import requests
@@ -20,8 +22,10 @@ class HGMO:
         + "{branch}/json-pushes?version=2&startID={push_id_start}&endID={push_id_end}"
     )
 
-    # instance cache
-    CACHE: Dict[Tuple[str, str], HGMO] = {}
+    # instance cache, least recently used first
+    CACHE: Dict[Tuple[str, str], HGMO] = OrderedDict()
+    CACHE_SIZE = 1000
+    CACHE_LOCK = threading.Lock()
 
     def __init__(self, rev, branch="autoland"):
         self.context = {
@@ -32,12 +36,26 @@ class HGMO:
     @staticmethod
     def create(rev, branch="autoland"):
         key = (branch, rev[:12])
-        if key in HGMO.CACHE:
-            return HGMO.CACHE[key]
-        instance = HGMO(rev, branch)
-        HGMO.CACHE[key] = instance
+        with HGMO.CACHE_LOCK:
+            instance = HGMO.CACHE.get(key)
+            if instance is not None:
+                HGMO.CACHE.move_to_end(key)
+                return instance
+
+            instance = HGMO.CACHE[key] = HGMO(rev, branch)
+            while len(HGMO.CACHE) > HGMO.CACHE_SIZE:
+                HGMO.CACHE.popitem(last=False)
         return instance
 
+    @staticmethod
+    def pushes(push_id_start, push_id_end, branch="autoland"):
+        """Returns the pushes with id in (push_id_start, push_id_end], with one pushlog query.
+
+        Returns:
+            dict: Map from (string) push id to the push's `changesets` and `date`.
+        """
+        return HGMO(None, branch).json_pushes(push_id_start, push_id_end)
+
     def _get_resource(self, url):
         try:
             r = get_session("hgmo").get(url)
@@ -11,12 +11,12 @@ from __future__ import absolute_import, division, unicode_literals
 
 import gzip
 import zipfile
+from io import BytesIO
 
 import boto
 from boto.s3.connection import Location
 from bs4 import BeautifulSoup
 
-import mo_files
 from mo_dots import Data, Null, coalesce, unwrap, to_data, is_many, list_to_data
 from mo_files import mimetype
 from mo_files.url import value2url_param
@@ -26,12 +26,13 @@ from mo_http.big_data import (
     LazyLines,
     MAX_STRING_SIZE,
     ibytes2ilines,
+    icompressed2ibytes,
     safe_size,
-    scompressed2ibytes,
 )
 from mo_kwargs import override
 from mo_logs import Except, Log
 from mo_testing.fuzzytestcase import assertAlmostEqual
+from mo_threads import Queue, THREAD_STOP, Thread
 from mo_times.dates import Date
 from mo_times.timer import Timer
 from pyLibrary import convert
@@ -43,6 +44,11 @@ READ_ERROR = "S3 read error"
 MAX_FILE_SIZE = 100 * 1024 * 1024
 VALID_KEY = r"\d+([.:]\d+)*"
 KEY_IS_WRONG_FORMAT = "key {{key}} in bucket {{bucket}} is of the wrong format"
+PART_SIZE = 8 * 1024 * 1024  # S3 REQUIRES PARTS (EXCEPT THE LAST) TO BE AT LEAST 5MB
+MAX_PENDING_PARTS = 2  # PARTS WAITING FOR UPLOAD; write() BLOCKS WHEN THERE ARE MORE
+NUM_UPLOAD_THREADS = 2
+NUM_RETRIES = 3
+READ_PART_SIZE = 8 * 1024 * 1024  # BYTES PER RANGED GET
 
 
 class File(object):
@@ -310,7 +316,7 @@ class Bucket(object):
         if source is None:
             Log.error("{{key}} does not exist", key=key)
         elif source.key.endswith(".gz"):
-            return LazyLines(ibytes2ilines(scompressed2ibytes(source)))
+            return LazyLines(ibytes2ilines(icompressed2ibytes(_ranged_reads(source))))
         elif source.size < MAX_STRING_SIZE:
             return source.read().decode("utf8").split("\n")
         else:
@@ -378,16 +384,20 @@ class Bucket(object):
 
     def write_lines(self, key, lines):
         self._verify_key_format(key)
-        storage = self.bucket.new_key(str(key + ".json.gz"))
+        filename = str(key + ".json.gz")
 
         if VERIFY_UPLOAD:
             lines = list(lines)
 
-        with mo_files.TempFile() as tempfile:
-            with open(tempfile.abspath, "wb") as buff:
-                DEBUG and Log.note("Temp file {{filename}}", filename=tempfile.abspath)
-                archive = gzip.GzipFile(filename=str(key + ".json"), fileobj=buff, mode="w")
-                count = 0
+        count = 0
+        with Timer(
+            "Sending lines for {{key}}", {"key": key}, verbose=self.settings.debug
+        ):
+            # COMPRESSED BYTES ARE UPLOADED, IN PARTS, WHILE MORE LINES ARE COMPRESSED
+            with MultipartUpload(
+                self.bucket, filename, headers={"Content-Type": mimetype.GZIP}
+            ) as upload:
+                archive = gzip.GzipFile(filename=str(key + ".json"), fileobj=upload, mode="w")
                 for l in lines:
                     if is_many(l):
                         for ll in l:
@@ -399,53 +409,24 @@ class Bucket(object):
                         archive.write(b"\n")
                         count += 1
                 archive.close()
+        DEBUG and Log.note(
+            "Sent {{count}} lines in {{file_length|comma}} bytes for {{key}}",
+            key=key,
+            file_length=upload.length,
+            count=count,
+        )
 
-            retry = 3
-            while retry:
-                try:
-                    with Timer(
-                        "Sending {{count}} lines in {{file_length|comma}} bytes for {{key}}",
-                        {"key": key, "file_length": tempfile.length, "count": count},
-                        verbose=self.settings.debug,
-                    ):
-                        storage.set_contents_from_filename(
-                            tempfile.abspath, headers={"Content-Type": mimetype.GZIP}
-                        )
-                    break
-                except Exception as e:
-                    e = Except.wrap(e)
-                    retry -= 1
-                    if (
-                        retry == 0
-                        or "Access Denied" in e
-                        or "No space left on device" in e
-                    ):
-                        Log.error("could not push data to s3", cause=e)
-                    else:
-                        Log.warning("could not push data to s3, will retry", cause=e)
-
-            if self.settings.public:
-                storage.set_acl("public-read")
+        if self.settings.public:
+            self.bucket.new_key(filename).set_acl("public-read")
 
-            if VERIFY_UPLOAD:
-                try:
-                    with open(tempfile.abspath, mode="rb") as source:
-                        result = list(ibytes2ilines(scompressed2ibytes(source)))
-                        assertAlmostEqual(result, lines, msg="file is different")
-
-                    # full_url = "https://"+self.name+".s3-us-west-2.amazonaws.com/"+storage.key.replace(":", "%3A")
-                    # https://active-data-test-result.s3-us-west-2.amazonaws.com/tc.1524896%3A152488763.0.json.gz
-
-                    # dest_bucket = s3.MultiBucket(bucket="self.name", kwargs=self.settings.aws)
-
-                    result = list(self.read_lines(strip_extension(key)))
-                    assertAlmostEqual(result, lines, result, msg="S3 is different")
-
-                except Exception as e:
-                    from activedata_etl.transforms import TRY_AGAIN_LATER
+        if VERIFY_UPLOAD:
+            try:
+                result = list(self.read_lines(strip_extension(key)))
+                assertAlmostEqual(result, lines, result, msg="S3 is different")
+            except Exception as e:
+                from activedata_etl.transforms import TRY_AGAIN_LATER
 
-                    Log.error(TRY_AGAIN_LATER, reason="did not pass verification", cause=e)
-        return
+                Log.error(TRY_AGAIN_LATER, reason="did not pass verification", cause=e)
 
     @property
     def name(self):
@@ -480,6 +461,158 @@ content_keys = {
 }
 
 
+class MultipartUpload(object):
+    """
+    FILE-LIKE OBJECT THAT SENDS BYTES TO S3 AS THEY ARE WRITTEN
+    FULL PARTS ARE UPLOADED BY WORKER THREADS; write() BLOCKS WHEN
+    MAX_PENDING_PARTS ARE WAITING, SO MEMORY USE IS BOUNDED
+    SMALL FILES (ONE PART) ARE SENT WITH A SINGLE REQUEST
+    """
+
+    def __init__(self, bucket, filename, headers=None, policy=None, part_size=None):
+        """
+        :param bucket: boto BUCKET
+        :param filename: KEY TO WRITE
+        :param headers: HTTP HEADERS, LIKE Content-Type
+        :param policy: CANNED ACL, LIKE "public-read"
+        :param part_size: BYTES PER PART, AT LEAST 5MB
+        """
+        self.bucket = bucket
+        self.filename = filename
+        self.headers = headers
+        self.policy = policy
+        self.part_size = coalesce(part_size, PART_SIZE)
+        self.upload = None
+        self.buffer = []
+        self.buffer_size = 0
+        self.length = 0
+        self.num_parts = 0
+        self.parts = Queue("parts of " + filename, max=MAX_PENDING_PARTS, silent=True)
+        self.workers = []
+        self.failure = None
+
+    def write(self, data):
+        self.buffer.append(data)
+        self.buffer_size += len(data)
+        self.length += len(data)
+        if self.buffer_size >= self.part_size:
+            self._send()
+
+    def flush(self):
+        pass
+
+    def _send(self):
+        if self.failure:
+            Log.error("Problem uploading {{file}}", file=self.filename, cause=self.failure)
+        if not self.upload:
+            self.upload = self.bucket.initiate_multipart_upload(
+                self.filename, headers=self.headers, policy=self.policy
+            )
+            self.workers = [
+                Thread.run("upload " + self.filename + " " + text(i), self._worker)
+                for i in range(NUM_UPLOAD_THREADS)
+            ]
+        data = b"".join(self.buffer)
+        self.buffer = []
+        self.buffer_size = 0
+        self.num_parts += 1
+        self.parts.add((self.num_parts, data))
+
+    def _worker(self, please_stop):
+        while not please_stop:
+            part = self.parts.pop(till=please_stop)
+            if part is THREAD_STOP:
+                break
+            if part is None or self.failure:
+                # KEEP DRAINING, SO THE WRITER DOES NOT BLOCK
+                continue
+            part_num, data = part
+            try:
+                _retry(
+                    "upload part " + text(part_num) + " of " + self.filename,
+                    lambda: self.upload.upload_part_from_file(BytesIO(data), part_num=part_num),
+                )
+            except Exception as e:
+                self.failure = e
+
+    def _stop_workers(self):
+        self.parts.add(THREAD_STOP)
+        for w in self.workers:
+            w.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.upload:
+            if exc_val:
+                return
+            data = b"".join(self.buffer)
+            storage = self.bucket.new_key(self.filename)
+            _retry(
+                "upload " + self.filename,
+                lambda: storage.set_contents_from_string(data, headers=self.headers, policy=self.policy),
+            )
+            return
+
+        if exc_val:
+            self._stop_workers()
+            self._cancel()
+            return
+
+        try:
+            try:
+                if self.buffer:
+                    self._send()
+            finally:
+                self._stop_workers()
+            if self.failure:
+                Log.error("Problem uploading {{file}}", file=self.filename, cause=self.failure)
+            _retry("complete upload of " + self.filename, self.upload.complete_upload)
+        except Exception:
+            # DO NOT LEAVE THE UPLOADED PARTS ON S3
+            self._cancel()
+            raise
+
+    def _cancel(self):
+        try:
+            self.upload.cancel_upload()
+        except Exception as e:
+            Log.warning("Problem cancelling upload of {{file}}", file=self.filename, cause=e)
+
+
+def _retry(description, action):
+    for attempt in range(NUM_RETRIES):
+        try:
+            return action()
+        except Exception as e:
+            e = Except.wrap(e)
+            if (
+                attempt == NUM_RETRIES - 1
+                or "Access Denied" in e
+                or "No space left on device" in e
+            ):
+                Log.error("could not {{description}}", description=description, cause=e)
+            Log.warning("could not {{description}}, will retry", description=description, cause=e)
+
+
+def _ranged_reads(source):
+    """
+    :param source: S3 KEY
+    :return: GENERATOR OF BYTES, READ IN READ_PART_SIZE RANGES
+    """
+    start = 0
+    while start < source.size:
+        end = min(start + READ_PART_SIZE, source.size) - 1
+        yield _retry(
+            "read " + source.key + " bytes " + text(start) + "-" + text(end),
+            lambda: source.get_contents_as_string(
+                headers={"Range": "bytes=" + text(start) + "-" + text(end)}
+            ),
+        )
+        start = end + 1
+
+
 class PublicBucket(object):
     """
     USE THE https PUBLIC API TO INTERACT WITH A BUCKET
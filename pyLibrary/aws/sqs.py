@@ -9,6 +9,9 @@
 #
 from __future__ import absolute_import, division, unicode_literals
 
+from collections import deque
+from time import time
+
 from boto import sqs
 from boto.sqs.message import Message
 
@@ -18,9 +21,15 @@ from mo_dots import unwrap, to_data
 from mo_json import value2json
 from mo_kwargs import override
 from mo_logs import Log
-from mo_threads import Signal
+from mo_threads import Lock, Signal, Thread, Till
 from mo_times.durations import SECOND
 
+BATCH_SIZE = 10  # MOST MESSAGES SQS ACCEPTS IN ONE BATCH CALL
+MAX_BATCH_BYTES = 256 * 1024  # MOST PAYLOAD SQS ACCEPTS IN ONE BATCH CALL
+PREFETCH = 2 * BATCH_SIZE  # MOST MESSAGES HELD LOCALLY, NOT YET POPPED
+VISIBILITY_TIMEOUT = 5 * 60  # SECONDS A RECEIVED MESSAGE IS HIDDEN FROM OTHER CONSUMERS
+LONG_POLL = 20  # MOST SECONDS SQS WILL WAIT FOR A MESSAGE
+
 
 class Queue(object):
     @override
@@ -30,11 +39,29 @@ class Queue(object):
         region,
         aws_access_key_id=None,
         aws_secret_access_key=None,
+        prefetch=PREFETCH,
+        visibility_timeout=VISIBILITY_TIMEOUT,
         debug=False,
+        queue=None,  # USE THIS (boto) QUEUE, RATHER THAN CONNECTING
         kwargs=None
     ):
+        """
+        :param prefetch: MOST MESSAGES TO RECEIVE BEFORE THEY ARE POPPED
+        :param visibility_timeout: SECONDS TO HIDE RECEIVED MESSAGES; THE VISIBILITY
+                                   OF UNCOMMITTED MESSAGES IS EXTENDED UNTIL commit()
+        """
         self.settings = kwargs
+        self.prefetch = max(1, prefetch)
+        self.visibility_timeout = visibility_timeout
+        self.long_poll = max(1, min(LONG_POLL, visibility_timeout // 4))
+        self.locker = Lock("sqs " + name)
+        self.prefetched = deque()  # MESSAGES RECEIVED, BUT NOT POPPED
         self.pending = []  # MESSAGES READ, BUT NOT CONFIRMED
+        self.prefetcher = None  # STARTED ON FIRST pop()
+
+        if queue is not None:
+            self.queue = queue
+            return
 
         if kwargs.region not in [r.name for r in sqs.regions()]:
             Log.error("Can not find region {{region}} in {{regions}}", region=kwargs.region, regions=[r.name for r in sqs.regions()])
@@ -69,29 +96,49 @@ class Queue(object):
         return self.settings.name
 
     def extend(self, messages):
-        for m in messages:
-            self.add(m)
+        """
+        SEND MESSAGES IN BATCHES OF BATCH_SIZE
+        """
+        bodies = []
+        for message in messages:
+            m = Message()
+            m.set_body(value2json(to_data(message)))
+            bodies.append(m.get_body_encoded())
+        self._write(bodies)
+
+    def _write(self, bodies):
+        for batch in _batches(bodies, len):
+            result = self.queue.write_batch([(str(i), body, 0) for i, body in enumerate(batch)])
+            if result.errors:
+                Log.error(
+                    "Failed to send {{num}} of {{total}} messages: {{errors}}",
+                    num=len(result.errors),
+                    total=len(batch),
+                    errors=[e.get("message") for e in result.errors],
+                )
 
     def pop(self, wait=SECOND, till=None):
         if till is not None and not isinstance(till, Signal):
             Log.error("Expecting a signal")
 
-        m = self.queue.read(wait_time_seconds=mo_math.floor(wait.seconds))
+        m = self._next(wait, till)
         if not m:
             return None
 
-        self.pending.append(m)
+        with self.locker:
+            self.pending.append(m)
         output = mo_json.json2value(m.get_body())
         return output
 
     def pop_message(self, wait=SECOND, till=None):
         """
         RETURN TUPLE (message, payload) CALLER IS RESPONSIBLE FOR CALLING message.delete() WHEN DONE
+        THE VISIBILITY OF THESE MESSAGES IS NOT EXTENDED
         """
         if till is not None and not isinstance(till, Signal):
             Log.error("Expecting a signal")
 
-        message = self.queue.read(wait_time_seconds=mo_math.floor(wait.seconds))
+        message = self._next(wait, till)
         if not message:
             return None
         message.delete = lambda: self.queue.delete_message(message)
@@ -99,23 +146,111 @@ class Queue(object):
         payload = mo_json.json2value(message.get_body())
         return message, payload
 
+    def _next(self, wait, till):
+        """
+        :return: NEXT PREFETCHED MESSAGE, OR None IF NONE ARRIVES IN TIME
+        """
+        with self.locker:
+            if not self.prefetcher:
+                self.prefetcher = Thread.run("sqs prefetch " + self.name, self._prefetch)
+            timeout = Till(seconds=mo_math.floor(wait.seconds)) | till
+            while not self.prefetched:
+                if timeout:
+                    return None
+                self.locker.wait(till=timeout | self.prefetcher.stopped)
+                if self.prefetcher.stopped:
+                    return None
+            return self.prefetched.popleft()
+
+    def _prefetch(self, please_stop):
+        """
+        KEEP UP TO prefetch MESSAGES LOCALLY, AND EXTEND THE VISIBILITY OF
+        THE MESSAGES NOT YET COMMITTED
+        """
+        while not please_stop:
+            self._extend_visibility()
+            with self.locker:
+                room = self.prefetch - len(self.prefetched)
+                if room <= 0:
+                    # ANY RELEASE OF THE LOCK (BY pop()) WAKES US
+                    self.locker.wait(till=please_stop | Till(seconds=self.long_poll))
+                    continue
+
+            try:
+                messages = self.queue.get_messages(
+                    num_messages=min(room, BATCH_SIZE),
+                    wait_time_seconds=self.long_poll,
+                    visibility_timeout=self.visibility_timeout,
+                )
+            except Exception as e:
+                Log.warning("Problem receiving from {{queue}}, waiting...", queue=self.name, cause=e)
+                (please_stop | Till(seconds=self.long_poll)).wait()
+                continue
+            if not messages:
+                continue
+            visible_at = time() + self.visibility_timeout
+            for m in messages:
+                m.visible_at = visible_at
+            with self.locker:
+                self.prefetched.extend(messages)
+
+        # RETURN WHAT WAS NEVER POPPED
+        with self.locker:
+            unpopped, self.prefetched = list(self.prefetched), deque()
+        self._change_visibility(unpopped, 0)
+
+    def _extend_visibility(self):
+        """
+        EXTEND THE VISIBILITY OF HELD MESSAGES THAT WILL SOON BE VISIBLE
+        """
+        soon = time() + max(self.visibility_timeout / 2, 2 * self.long_poll)
+        with self.locker:
+            expiring = [m for m in list(self.prefetched) + self.pending if m.visible_at < soon]
+        if expiring:
+            self._change_visibility(expiring, self.visibility_timeout)
+            visible_at = time() + self.visibility_timeout
+            for m in expiring:
+                m.visible_at = visible_at
+
+    def _change_visibility(self, messages, timeout):
+        for batch in _batches(messages):
+            try:
+                result = self.queue.change_message_visibility_batch([(m, timeout) for m in batch])
+                if result.errors:
+                    Log.warning(
+                        "Failed to change visibility of {{num}} messages: {{errors}}",
+                        num=len(result.errors),
+                        errors=[e.get("message") for e in result.errors],
+                    )
+            except Exception as e:
+                Log.warning("Failed to change visibility of {{num}} messages", num=len(batch), cause=e)
+
     def commit(self):
-        pending, self.pending = self.pending, []
-        for p in pending:
-            self.queue.delete_message(p)
+        with self.locker:
+            pending, self.pending = self.pending, []
+        for batch in _batches(pending):
+            result = self.queue.delete_message_batch(batch)
+            if result.errors:
+                Log.warning(
+                    "Failed to delete {{num}} messages: {{errors}}",
+                    num=len(result.errors),
+                    errors=[e.get("message") for e in result.errors],
+                )
 
     def rollback(self):
-        if self.pending:
+        with self.locker:
             pending, self.pending = self.pending, []
-
+        if pending:
             try:
+                bodies = []
                 for p in pending:
                     m = Message()
                     m.set_body(p.get_body())
-                    self.queue.write(m)
+                    bodies.append(m.get_body_encoded())
+                self._write(bodies)
 
-                for p in pending:
-                    self.queue.delete_message(p)
+                for batch in _batches(pending):
+                    self.queue.delete_message_batch(batch)
 
                 if self.settings.debug:
                     Log.alert("{{num}} messages returned to queue", num=len(pending))
@@ -123,5 +258,26 @@ class Queue(object):
                 Log.warning("Failed to return {{num}} messages to the queue", num=len(pending), cause=e)
 
     def close(self):
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher.join()
         self.commit()
 
+
+def _batches(items, size=None):
+    """
+    :param size: OPTIONAL FUNCTION GIVING THE BYTES OF AN ITEM
+    :return: GENERATOR OF LISTS OF NO MORE THAN BATCH_SIZE ITEMS (AND MAX_BATCH_BYTES)
+    """
+    batch = []
+    total = 0
+    for item in items:
+        item_size = size(item) if size else 0
+        if batch and (len(batch) >= BATCH_SIZE or total + item_size > MAX_BATCH_BYTES):
+            yield batch
+            batch = []
+            total = 0
+        batch.append(item)
+        total += item_size
+    if batch:
+        yield batch
@@ -0,0 +1,121 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import random
+import sys
+
+from mo_graphs import Edge
+from mo_graphs.algorithms import LOOPS, ROOTS, _loop_dominator_tree, dominator_tree
+from mo_graphs.graph import Graph
+from mo_graphs.tree_graph import Tree
+from mo_logs import Log
+from mo_times.timer import Timer
+
+WINDOW = 50  # PARENTS ARE CHOSEN FROM THIS MANY RECENT NODES, LIKE CHANGESETS
+MERGE_RATE = 0.05  # FRACTION OF NODES WITH MORE THAN ONE PARENT
+MAX_PARENTS = 3
+
+
+def synthetic_dag(num_edges, num_roots=3):
+    """
+    A DAG WITH ABOUT num_edges, LIKE A CHANGESET HISTORY: MOSTLY A LONG LINE,
+    WITH SOME NODES MERGING A FEW RECENT NODES
+    """
+    graph = Graph(int)
+    count = 0
+    node = 0
+    while count < num_edges:
+        if node < num_roots:
+            parents = []
+        elif random.random() < MERGE_RATE:
+            parents = random.sample(range(max(0, node - WINDOW), node), min(node, random.randint(2, MAX_PARENTS)))
+        else:
+            parents = [node - 1]
+        for p in parents:
+            graph.add_edge(Edge(p, node))
+            count += 1
+        node += 1
+    return graph
+
+
+def reference_dominator_tree(graph):
+    """
+    BY DEFINITION: d DOMINATES n IF n CAN NOT BE REACHED FROM THE ROOTS WITHOUT d
+    """
+    roots = [n for n in graph.nodes if not graph.get_parents(n) - {n}]
+
+    def reachable(without):
+        done = set()
+        todo = [r for r in roots if r != without]
+        while todo:
+            n = todo.pop()
+            if n in done:
+                continue
+            done.add(n)
+            todo.extend(c for c in graph.get_children(n) if c != without)
+        return done
+
+    everything = reachable(None)
+    dominators = {n: {ROOTS} for n in everything}
+    for d in everything:
+        for n in everything - reachable(d) - {d}:
+            dominators[n].add(d)
+
+    # THE IMMEDIATE DOMINATOR IS THE STRICT DOMINATOR WITH THE MOST DOMINATORS
+    output = Tree(None)
+    for n, doms in dominators.items():
+        output.add_edge(Edge(max(doms, key=lambda d: len(dominators.get(d, ()))), n))
+    return output
+
+
+def test_agreement(num_edges):
+    graph = synthetic_dag(num_edges)
+    expected = reference_dominator_tree(graph)
+    with Timer("new dominator_tree on {{num|comma}} edges", {"num": num_edges}):
+        result = dominator_tree(graph)
+    if result.edges != expected.edges:
+        Log.error("dominator tree does not match the definition")
+    Log.note("new dominator tree matches the definition")
+
+    with Timer("old dominator_tree on {{num|comma}} edges", {"num": num_edges}):
+        old = Tree(None)
+        _loop_dominator_tree(graph, graph.nodes, old)
+    Log.note(
+        "old dominator tree agrees on {{agree}} of {{total}} nodes, with {{loops}} nodes wrongly under LOOPS",
+        agree=len(old.edges & expected.edges),
+        total=len(expected.edges),
+        loops=sum(1 for p in old.parents.values() if p == LOOPS),
+    )
+
+
+def test_large(num_edges):
+    graph = synthetic_dag(num_edges)
+    with Timer("new dominator_tree on {{num|comma}} edges", {"num": num_edges}):
+        result = dominator_tree(graph)
+    with Timer("old dominator_tree on {{num|comma}} edges", {"num": num_edges}):
+        old = Tree(None)
+        _loop_dominator_tree(graph, graph.nodes, old)
+    Log.note(
+        "old dominator tree agrees on {{agree}} of {{total}} nodes",
+        agree=len(old.edges & result.edges),
+        total=len(result.edges),
+    )
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1000 * 1000
+        test_agreement(num_edges // 500)
+        test_large(num_edges)
+    finally:
+        Log.stop()
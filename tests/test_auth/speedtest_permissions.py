@@ -0,0 +1,101 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from jx_sqlite.sqlite import Sqlite, sql_insert, sql_query
+from mo_auth.permissions import PERMISSION_TABLE, ROOT_USER, Permissions
+from mo_dots import Data, wrap
+from mo_logs import Log
+from mo_threads import Thread
+from mo_times.timer import Timer
+
+NUM_THREADS = 20
+
+
+def make_permissions(depth):
+    """
+    user 10000 IS IN GROUP 10001, WHICH IS IN GROUP 10002, ... WHICH CAN ACCESS THE RESOURCE
+    """
+    permissions = Permissions(db=Sqlite())
+    permissions.create_table_resource("deep", ROOT_USER)
+    resource = permissions.find_resource("deep", "from")
+
+    first_user = 10000
+    grants = [
+        {"user": first_user + i, "resource": first_user + i + 1, "owner": ROOT_USER._id}
+        for i in range(depth)
+    ]
+    grants.append({"user": first_user + depth, "resource": resource._id, "owner": ROOT_USER._id})
+    grants = wrap(grants)
+    with permissions.db.transaction() as t:
+        t.execute(sql_insert(PERMISSION_TABLE, grants))
+    permissions._add_grants(grants)
+    return permissions, wrap({"_id": first_user}), resource
+
+
+def verify_by_query(db, user, resource):
+    """
+    THE ORIGINAL verify_allowance: ONE QUERY PER HOP
+    """
+    resources = db.query(sql_query({
+        "select": ["resource", "owner"],
+        "from": PERMISSION_TABLE,
+        "where": {"eq": {"user": user._id}},
+    }))
+    for r in resources.data:
+        record = Data(zip(resources.header, r))
+        if record.resource == resource._id:
+            if record.owner == ROOT_USER._id:
+                return [record]
+            return []
+        cascade = verify_by_query(db, wrap({"_id": record.resource}), resource)
+        if cascade:
+            cascade.append(record)
+            return cascade
+    return []
+
+
+def test_deep_nesting(depth, num_checks):
+    permissions, user, resource = make_permissions(depth)
+
+    def checker(method):
+        def check(please_stop):
+            for _ in range(num_checks // NUM_THREADS):
+                if not method(user, resource):
+                    Log.error("expecting allowance")
+        return check
+
+    def run_all(method):
+        threads = [Thread.run("check " + str(i), checker(method)) for i in range(NUM_THREADS)]
+        for t in threads:
+            t.join()
+
+    expected = verify_by_query(permissions.db, user, resource)
+    if len(permissions.verify_allowance(user, resource)) != len(expected):
+        Log.error("expecting same chain length")
+
+    with Timer("{{num}} checks at depth {{depth}}, by query", {"num": num_checks, "depth": depth}):
+        run_all(lambda u, r: verify_by_query(permissions.db, u, r))
+    with Timer("{{num}} checks at depth {{depth}}, in memory", {"num": num_checks, "depth": depth}):
+        run_all(permissions.verify_allowance)
+    permissions.db.close()
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        depth = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+        num_checks = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+        test_deep_nesting(depth, num_checks)
+    finally:
+        Log.stop()
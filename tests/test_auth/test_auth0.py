@@ -0,0 +1,115 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flask import Flask
+from jose import jwk, jwt
+
+from mo_auth import auth0
+from mo_auth.auth0 import Authenticator
+from mo_dots import to_data
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times import Date
+
+DOMAIN = "identity.example.com"
+AUDIENCE = "https://api.example.com"
+
+
+class TestAuth0(FuzzyTestCase):
+    def setUp(self):
+        self.provider = FakeIdentityProvider()
+        self.get_json = auth0.http.get_json
+        auth0.http.get_json = self.provider.get_json
+        self.auth = Authenticator(
+            flask_app=Flask("test_auth0"),
+            auth0=to_data({
+                "domain": DOMAIN,
+                "api": {"identifier": AUDIENCE},
+                "endpoints": {"login": "login", "logout": "logout", "keep_alive": "ping"},
+            }),
+            permissions=None,
+            session_manager=None,
+        )
+
+    def tearDown(self):
+        auth0.http.get_json = self.get_json
+
+    def test_jwt_steady_state(self):
+        tokens = [self.provider.token("user" + str(i)) for i in range(10)]
+        for _ in range(100):
+            for token in tokens:
+                self.assertEqual(self.auth.verify_jwt_token(token)["sub"], token_user(token))
+
+        # ONE KEY SET FETCH, THEN NO OUTBOUND CALLS
+        self.assertEqual(self.provider.calls, {"jwks": 1})
+
+    def test_opaque_steady_state(self):
+        for _ in range(100):
+            for i in range(10):
+                self.assertEqual(self.auth.verify_opaque_token("opaque" + str(i)).sub, "opaque" + str(i))
+
+        # ONE userinfo CALL PER TOKEN, THEN NO OUTBOUND CALLS
+        self.assertEqual(self.provider.calls, {"userinfo": 10})
+
+    def test_unknown_key_does_not_flood_provider(self):
+        self.auth.verify_jwt_token(self.provider.token("user"))
+        for _ in range(100):
+            with self.assertRaises(Exception):
+                self.auth.verify_jwt_token(self.provider.token("user", kid="unknown"))
+
+        # AT MOST ONE REFRESH PER JWKS_MIN_REFRESH
+        self.assertEqual(self.provider.calls, {"jwks": 1})
+
+
+def token_user(token):
+    return jwt.get_unverified_claims(token)["sub"]
+
+
+class FakeIdentityProvider(object):
+    """
+    SIGN TOKENS, AND ANSWER THE KEY SET AND userinfo ENDPOINTS, COUNTING CALLS
+    """
+
+    def __init__(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_key = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        public_key = jwk.construct(self.private_key, "RS256").public_key().to_dict()
+        public_key["kid"] = "key1"
+        self.jwks = {"keys": [public_key]}
+        self.calls = {}
+
+    def token(self, user, kid="key1"):
+        claims = {
+            "sub": user,
+            "aud": AUDIENCE,
+            "iss": "https://" + DOMAIN + "/",
+            "exp": Date.now().unix + 3600,
+        }
+        return jwt.encode(claims, self.private_key, algorithm="RS256", headers={"kid": kid})
+
+    def get_json(self, url, headers=None):
+        if url == "https://" + DOMAIN + "/.well-known/jwks.json":
+            self._count("jwks")
+            return to_data(self.jwks)
+        if url == "https://" + DOMAIN + "/userinfo":
+            self._count("userinfo")
+            return to_data({"sub": headers["Authorization"][len("Bearer "):]})
+        Log.error("unexpected call to {{url}}", url=url)
+
+    def _count(self, name):
+        self.calls[name] = self.calls.get(name, 0) + 1
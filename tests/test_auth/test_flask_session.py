@@ -0,0 +1,132 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_auth import flask_session
+from mo_auth.flask_session import SqliteSessionInterface
+from mo_dots import Data
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Lock, Signal, Thread, Till
+
+
+class TestFlaskSession(FuzzyTestCase):
+    def setUp(self):
+        flask_session.SINGLTON = None
+        self.db = FakeDatabase()
+        self.manager = SqliteSessionInterface(
+            flask_app=None,
+            db=self.db,
+            cookie=Data(max_lifetime="hour", inactive_lifetime="10minute"),
+        )
+        # ONLY THE TEST CALLS flush()
+        self.manager.monitor_thread.stop()
+        self.manager.monitor_thread.join()
+
+    def tearDown(self):
+        flask_session.SINGLTON = None
+
+    def test_touch_ups_are_batched(self):
+        session = Data(user="kyle")
+        self.manager.create_session(session)
+        for i in range(100):
+            session.last_used = i
+            self.manager.save_session(None, session, None)
+            self.assertEqual(self.manager.get_session(session.session_id).user, "kyle")
+
+        self.assertEqual(self.db.counts, {"INSERT": 1})
+        self.manager.flush()
+        self.assertEqual(self.db.counts, {"INSERT": 1, "UPDATE": 1})
+
+    def test_flush_during_insert(self):
+        session = Data(user="kyle")
+        self.manager.create_session(session)
+        self.db.slow_insert = Signal()
+
+        # THE FIRST SAVE IS STUCK IN ITS INSERT
+        saving = Thread.run("save", lambda please_stop: self.manager.save_session(None, session, None))
+        while not self.db.inserting:
+            Till(seconds=0.01).wait()
+
+        # A TOUCH-UP, AND A flush(), DURING THE INSERT
+        session.last_used = 42
+        self.manager.save_session(None, session, None)
+        self.manager.flush()
+
+        self.db.slow_insert.go()
+        saving.join()
+        self.manager.flush()
+
+        self.assertEqual(self.db.errors, [])
+        self.assertEqual(self.db.counts, {"INSERT": 1, "UPDATE": 1})
+        # THE TOUCH-UP WAS WRITTEN AFTER THE INSERT
+        self.assertIn('"last_used":42', self.db.statements[-1])
+
+
+class FakeDatabase(object):
+    """
+    ONE-ROW SESSION TABLE THAT COUNTS STATEMENTS, AND REJECTS A SECOND INSERT
+    """
+
+    def __init__(self):
+        self.locker = Lock()
+        self.counts = {}
+        self.errors = []
+        self.statements = []
+        self.row = None
+        self.slow_insert = None
+        self.inserting = False
+
+    def about(self, table):
+        return True
+
+    def query(self, sql):
+        self._count("SELECT")
+        return Data(header=[], data=[])
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def _count(self, name):
+        with self.locker:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+
+class FakeTransaction(object):
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def execute(self, sql):
+        db = self.db
+        sql = str(sql).strip()
+        if sql.startswith("INSERT"):
+            db._count("INSERT")
+            if db.slow_insert is not None and not db.inserting:
+                db.inserting = True
+                db.slow_insert.wait()
+            if db.row is not None:
+                db.errors.append("UNIQUE constraint failed")
+                Log.error("UNIQUE constraint failed: sessions.session_id")
+            db.row = sql
+        elif sql.startswith("UPDATE"):
+            db._count("UPDATE")
+            if db.row is None:
+                db.errors.append("no row to update")
+        elif not sql.startswith("DELETE"):
+            Log.error("unexpected {{sql}}", sql=sql)
+        db.statements.append(sql)
+
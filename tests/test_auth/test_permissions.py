@@ -0,0 +1,90 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_sqlite.sqlite import Sqlite, sql_insert
+from mo_auth import permissions as permissions_module
+from mo_auth.permissions import PERMISSION_TABLE, ROOT_USER, Permissions
+from mo_dots import wrap
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestPermissions(FuzzyTestCase):
+    def setUp(self):
+        self.permissions = Permissions(db=Sqlite())
+        self.permissions.create_table_resource("table", ROOT_USER)
+        self.resource = self.permissions.find_resource("table", "from")
+
+    def tearDown(self):
+        self.permissions.db.close()
+
+    def grant(self, *grants):
+        grants = wrap([{"user": u, "resource": r, "owner": o} for u, r, o in grants])
+        with self.permissions.db.transaction() as t:
+            t.execute(sql_insert(PERMISSION_TABLE, grants))
+        self.permissions._add_grants(grants)
+
+    def test_root_owner(self):
+        self.grant((20, self.resource._id, ROOT_USER._id))
+        allowance = self.permissions.verify_allowance({"_id": 20}, self.resource)
+        self.assertEqual(len(allowance), 1)
+        self.assertEqual(allowance[0].user._id, 20)
+        self.assertEqual(allowance[0].resource._id, self.resource._id)
+        self.assertEqual(allowance[0].owner, ROOT_USER)
+
+    def test_owner_must_be_allowed(self):
+        # 31 GAVE 30 THE RESOURCE, BUT 31 HAS NO ACCESS ITSELF
+        self.grant((30, self.resource._id, 31))
+        self.assertFalse(self.permissions.verify_allowance({"_id": 30}, self.resource))
+
+        self.grant((31, self.resource._id, ROOT_USER._id))
+        allowance = self.permissions.verify_allowance({"_id": 30}, self.resource)
+        self.assertListEqual([a.user._id for a in allowance], [31, 30])
+        self.assertEqual(allowance[1].owner, 31)
+
+    def test_group_chain(self):
+        # 40 IS IN GROUP 41, WHICH IS IN GROUP 42, WHICH CAN ACCESS THE RESOURCE
+        self.grant(
+            (40, 41, ROOT_USER._id),
+            (41, 42, ROOT_USER._id),
+            (42, self.resource._id, ROOT_USER._id),
+        )
+        allowance = self.permissions.verify_allowance({"_id": 40}, self.resource)
+        self.assertListEqual([a.user._id for a in allowance], [42, 41, 40])
+        self.assertEqual(allowance[0].resource._id, self.resource._id)
+        self.assertListEqual([a.group for a in allowance[1:]], [42, 41])
+
+    def test_cycle(self):
+        self.grant((50, 51, ROOT_USER._id), (51, 50, ROOT_USER._id))
+        self.assertFalse(self.permissions.verify_allowance({"_id": 50}, self.resource))
+
+        # A WAY OUT OF THE CYCLE
+        self.grant((51, self.resource._id, ROOT_USER._id))
+        allowance = self.permissions.verify_allowance({"_id": 50}, self.resource)
+        self.assertListEqual([a.user._id for a in allowance], [51, 50])
+
+    def test_add_permission_clears_cache(self):
+        user = wrap({"_id": 60})
+        self.assertFalse(self.permissions.verify_allowance(user, self.resource))
+
+        self.permissions.add_permission(user, self.resource, ROOT_USER)
+        allowance = self.permissions.verify_allowance(user, self.resource)
+        self.assertEqual(len(allowance), 1)
+        self.assertEqual(allowance[0].user._id, 60)
+
+    def test_cache_is_bounded(self):
+        old_max, permissions_module.MAX_ALLOWANCES = permissions_module.MAX_ALLOWANCES, 10
+        try:
+            for i in range(100):
+                self.assertFalse(self.permissions.verify_allowance({"_id": 1000 + i}, self.resource))
+                self.assertLessEqual(len(self.permissions.allowances), 10)
+        finally:
+            permissions_module.MAX_ALLOWANCES = old_max
@@ -0,0 +1,181 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+import gzip
+
+from mo_dots import Data
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Till
+
+from pyLibrary.aws import s3
+from pyLibrary.aws.s3 import MultipartUpload, SkeletonBucket
+
+
+class TestS3(FuzzyTestCase):
+    def setUp(self):
+        self.part_size = s3.PART_SIZE
+        self.read_part_size = s3.READ_PART_SIZE
+        s3.PART_SIZE = 64 * 1024
+        s3.READ_PART_SIZE = 10 * 1024
+
+    def tearDown(self):
+        s3.PART_SIZE = self.part_size
+        s3.READ_PART_SIZE = self.read_part_size
+
+    def test_write_lines_in_parts(self):
+        bucket, storage = fake_bucket(fail_parts={2})
+        lines = [random_line(i) for i in range(20000)]
+
+        bucket.write_lines("1.2", lines)
+
+        parts = storage.completed["1.2.json.gz"]
+        self.assertGreaterEqual(len(parts), 3)
+        self.assertEqual(parts, list(range(1, len(parts) + 1)))
+        # PART 2 FAILED ONCE, AND WAS SENT AGAIN
+        self.assertEqual(storage.attempts[2], 2)
+        self.assertEqual(gzip.decompress(storage.files["1.2.json.gz"]).decode("utf8"), "\n".join(lines) + "\n")
+
+    def test_read_lines_in_ranges(self):
+        bucket, storage = fake_bucket()
+        lines = [random_line(i) for i in range(20000)]
+        storage.files["1.3.json.gz"] = gzip.compress(("\n".join(lines) + "\n").encode("utf8"))
+
+        result = list(bucket.read_lines("1.3"))
+
+        self.assertEqual(result, lines)
+        self.assertEqual(
+            storage.num_ranges,
+            (len(storage.files["1.3.json.gz"]) + s3.READ_PART_SIZE - 1) // s3.READ_PART_SIZE,
+        )
+
+    def test_small_file_is_one_request(self):
+        bucket, storage = fake_bucket()
+        bucket.write_lines("1.4", ["a", "b"])
+
+        self.assertEqual(storage.completed, {})
+        self.assertEqual(list(bucket.read_lines("1.4")), ["a", "b"])
+
+    def test_failed_upload_is_cancelled(self):
+        bucket, storage = fake_bucket(fail_parts={2}, failures_per_part=s3.NUM_RETRIES)
+
+        with self.assertRaises(Exception):
+            with MultipartUpload(storage, "1.5.json.gz", part_size=10) as upload:
+                for i in range(10):
+                    upload.write(b"0123456789")
+
+        self.assertEqual(storage.cancelled, ["1.5.json.gz"])
+        self.assertNotIn("1.5.json.gz", storage.files)
+
+    def test_failure_found_by_last_part_is_cancelled(self):
+        bucket, storage = fake_bucket(fail_parts={1}, failures_per_part=s3.NUM_RETRIES)
+
+        with self.assertRaises(Exception):
+            with MultipartUpload(storage, "1.6.json.gz", part_size=10) as upload:
+                upload.write(b"0123456789")
+                while not upload.failure:
+                    Till(seconds=0.01).wait()
+                # NOT A FULL PART, SO ONLY __exit__ WILL SEND IT
+                upload.write(b"01234")
+
+        self.assertEqual(storage.cancelled, ["1.6.json.gz"])
+        self.assertNotIn("1.6.json.gz", storage.files)
+
+    def test_failed_complete_is_cancelled(self):
+        bucket, storage = fake_bucket()
+
+        def complete_upload():
+            Log.error("Connection reset by peer")
+
+        with self.assertRaises(Exception):
+            with MultipartUpload(storage, "1.7.json.gz", part_size=10) as upload:
+                for i in range(3):
+                    upload.write(b"0123456789")
+                upload.upload.complete_upload = complete_upload
+
+        self.assertEqual(storage.cancelled, ["1.7.json.gz"])
+        self.assertNotIn("1.7.json.gz", storage.files)
+
+
+def random_line(i):
+    return '{"id":' + str(i) + ',"value":"' + str(hash(str(i)) % 100000) * 4 + '"}'
+
+
+def fake_bucket(fail_parts=(), failures_per_part=1):
+    storage = FakeStorage(fail_parts, failures_per_part)
+    bucket = SkeletonBucket()
+    bucket.settings = Data()
+    bucket.bucket = storage
+    return bucket, storage
+
+
+class FakeStorage(object):
+    """
+    LOCAL STAND-IN FOR A boto BUCKET
+    """
+
+    def __init__(self, fail_parts, failures_per_part):
+        self.name = "fake"
+        self.files = {}
+        self.completed = {}
+        self.cancelled = []
+        self.attempts = {}
+        self.fail_parts = fail_parts
+        self.failures_per_part = failures_per_part
+        self.num_ranges = 0
+
+    def new_key(self, name):
+        return FakeKey(self, name)
+
+    def list(self, prefix):
+        return [FakeKey(self, name) for name in sorted(self.files) if name.startswith(prefix)]
+
+    def initiate_multipart_upload(self, name, headers=None, policy=None):
+        return FakeUpload(self, name)
+
+
+class FakeKey(object):
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = self.key = name
+
+    @property
+    def size(self):
+        return len(self.storage.files[self.name])
+
+    def set_contents_from_string(self, data, headers=None, policy=None):
+        self.storage.files[self.name] = data
+
+    def get_contents_as_string(self, headers):
+        self.storage.num_ranges += 1
+        start, end = map(int, headers["Range"][len("bytes="):].split("-"))
+        return self.storage.files[self.name][start : end + 1]
+
+
+class FakeUpload(object):
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+        self.parts = {}
+
+    def upload_part_from_file(self, fp, part_num):
+        attempts = self.storage.attempts[part_num] = self.storage.attempts.get(part_num, 0) + 1
+        if part_num in self.storage.fail_parts and attempts <= self.storage.failures_per_part:
+            Log.error("Connection reset by peer")
+        self.parts[part_num] = fp.read()
+
+    def complete_upload(self):
+        self.storage.completed[self.name] = sorted(self.parts)
+        self.storage.files[self.name] = b"".join(self.parts[p] for p in sorted(self.parts))
+
+    def cancel_upload(self):
+        self.storage.cancelled.append(self.name)
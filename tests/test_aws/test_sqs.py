@@ -0,0 +1,196 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from collections import Counter
+from time import time
+
+from boto.sqs.message import Message
+
+from mo_dots import Data
+from mo_future import allocate_lock
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Till
+from mo_times.durations import SECOND
+
+from pyLibrary.aws.sqs import Queue
+
+
+class TestSqs(FuzzyTestCase):
+    def test_batched_round_trip(self):
+        fake = FakeQueue()
+        queue = Queue(name="test", region=None, queue=fake)
+
+        queue.extend({"value": i} for i in range(25))
+        self.assertEqual(fake.calls["write_batch"], 3)
+        self.assertEqual(len(fake.messages), 25)
+
+        results = []
+        while True:
+            v = queue.pop(wait=SECOND)
+            if v is None:
+                break
+            results.append(v.value)
+        self.assertEqual(sorted(results), list(range(25)))
+        self.assertLessEqual(fake.calls["get_messages"] - fake.calls["empty"], 3)
+
+        queue.commit()
+        self.assertEqual(fake.calls["delete_message_batch"], 3)
+        self.assertEqual(len(fake.messages), 0)
+        queue.close()
+
+        self.assertEqual(fake.calls["write"], 0)
+        self.assertEqual(fake.calls["read"], 0)
+        self.assertEqual(fake.calls["delete_message"], 0)
+
+    def test_prefetch_is_bounded(self):
+        fake = FakeQueue()
+        queue = Queue(name="test", region=None, queue=fake, prefetch=5)
+        queue.extend({"value": i} for i in range(30))
+
+        self.assertEqual(queue.pop().value, 0)
+        Till(seconds=0.5).wait()
+        self.assertLessEqual(len(queue.prefetched), 5)
+        self.assertLessEqual(len(fake.received()), 6)
+
+        queue.close()
+        # UNPOPPED MESSAGES ARE RETURNED, THE POPPED ONE IS DELETED
+        self.assertEqual(len(fake.messages), 29)
+        self.assertEqual(len(fake.received()), 0)
+
+    def test_visibility_is_extended(self):
+        fake = FakeQueue()
+        queue = Queue(name="test", region=None, queue=fake, visibility_timeout=4)
+        queue.extend([{"value": 1}])
+
+        self.assertEqual(queue.pop().value, 1)
+        Till(seconds=5).wait()
+
+        # STILL HIDDEN, SO NOT RECEIVED AGAIN
+        self.assertGreater(fake.calls["change_message_visibility_batch"], 0)
+        self.assertEqual(fake.calls["received"], 1)
+        queue.commit()
+        self.assertEqual(len(fake.messages), 0)
+        queue.close()
+
+    def test_rollback(self):
+        fake = FakeQueue()
+        queue = Queue(name="test", region=None, queue=fake, prefetch=1)
+        queue.extend({"value": i} for i in range(3))
+
+        self.assertEqual(queue.pop().value, 0)
+        self.assertEqual(queue.pop().value, 1)
+        queue.rollback()
+        queue.close()
+
+        self.assertEqual(sorted(m[0] for m in fake.messages.values()), sorted(encode({"value": i}) for i in range(3)))
+        self.assertEqual(fake.calls["write_batch"], 2)
+
+
+class FakeQueue(object):
+    """
+    IN-PROCESS STAND-IN FOR A boto SQS QUEUE, COUNTING THE API CALLS
+    """
+
+    def __init__(self):
+        self.locker = allocate_lock()
+        self.calls = Counter()
+        self.messages = {}  # MAP FROM id TO [encoded body, visible_at]
+        self.next_id = 0
+
+    def received(self):
+        now = time()
+        with self.locker:
+            return [i for i, (_, visible_at) in self.messages.items() if visible_at > now]
+
+    def write(self, message):
+        self.calls["write"] += 1
+        self._add(message.get_body_encoded())
+
+    def write_batch(self, messages):
+        self.calls["write_batch"] += 1
+        if len(messages) > 10:
+            raise Exception("too many messages in batch")
+        for _, body, _ in messages:
+            self._add(body)
+        return Data(results=[{"id": i} for i, _, _ in messages], errors=[])
+
+    def _add(self, body):
+        with self.locker:
+            self.next_id += 1
+            self.messages[self.next_id] = [body, 0]
+
+    def read(self, wait_time_seconds=None):
+        self.calls["read"] += 1
+        found = self.get_messages(1)
+        return found[0] if found else None
+
+    def get_messages(self, num_messages=1, visibility_timeout=None, wait_time_seconds=None):
+        self.calls["get_messages"] += 1
+        if num_messages > 10:
+            raise Exception("too many messages requested")
+        now = time()
+        output = []
+        with self.locker:
+            for i, record in sorted(self.messages.items()):
+                if len(output) >= num_messages:
+                    break
+                body, visible_at = record
+                if visible_at > now:
+                    continue
+                record[1] = now + (visibility_timeout or 30)
+                m = Message()
+                m.set_body(m.decode(body))
+                m.id = i
+                output.append(m)
+        self.calls["received"] += len(output)
+        if not output:
+            self.calls["empty"] += 1
+            Till(seconds=0.1).wait()  # A SHORT "LONG POLL"
+        return output
+
+    def delete_message(self, message):
+        self.calls["delete_message"] += 1
+        with self.locker:
+            self.messages.pop(message.id, None)
+
+    def delete_message_batch(self, messages):
+        self.calls["delete_message_batch"] += 1
+        if len(messages) > 10:
+            raise Exception("too many messages in batch")
+        with self.locker:
+            for m in messages:
+                self.messages.pop(m.id, None)
+        return Data(results=[{"id": m.id} for m in messages], errors=[])
+
+    def change_message_visibility_batch(self, messages):
+        self.calls["change_message_visibility_batch"] += 1
+        if len(messages) > 10:
+            raise Exception("too many messages in batch")
+        now = time()
+        with self.locker:
+            for m, timeout in messages:
+                record = self.messages.get(m.id)
+                if record:
+                    record[1] = now + timeout
+        return Data(results=[{"id": m.id} for m, _ in messages], errors=[])
+
+    def get_attributes(self, name):
+        with self.locker:
+            return {"ApproximateNumberOfMessages": str(len(self.messages))}
+
+
+def encode(value):
+    from mo_json import value2json
+
+    m = Message()
+    m.set_body(value2json(value))
+    return m.get_body_encoded()
@@ -0,0 +1,127 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from unittest.mock import patch
+
+from jx_bigquery import bigquery
+from jx_bigquery.bigquery import Table
+from jx_bigquery.snowflakes import Snowflake
+from jx_bigquery.typed_encoder import typed_encode
+from mo_dots import Data, Null
+from mo_logs import Except, Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestExtend(FuzzyTestCase):
+    def test_new_nested_column_encodes_once(self):
+        rows = [{"x": i} for i in range(100)]
+        rows[10]["a"] = {"b": 1}
+        rows[20]["a"] = {"b": 2}
+        rows[50]["a"] = [{"b": 3}, {"b": 4}]
+        table, client = fake_table()
+
+        with patch.object(bigquery, "typed_encode", wraps=typed_encode) as encode:
+            table._extend(rows)
+
+        # ONLY THE THREE ROWS WITH a ARE ENCODED AGAIN
+        self.assertEqual(encode.call_count, len(rows) + 3)
+        self.assertEqual(len(client.inserts), 1)
+
+        # SAME RESULT AS ENCODING AGAINST THE FINAL SCHEMA
+        final = Snowflake("test", Data(), Data(), schema=table.flake.schema)
+        expected = [typed_encode(r, final)[0] for r in rows]
+        self.assertEqual(client.inserts[0], expected)
+        self.assertEqual(client.inserts[0][10], {"a": {"__a__": [{"b": {"__i__": 1}}]}, "x": {"__i__": 10}})
+
+    def test_invalid_rows_isolated_in_one_retry(self):
+        rows = [{"x": i} for i in range(20)]
+        table, client = fake_table(bad={3, 7})
+
+        with patch.object(bigquery, "typed_encode", wraps=typed_encode) as encode:
+            error = extend_error(table, rows)
+
+        self.assertEqual(encode.call_count, len(rows))
+        self.assertEqual(len(client.inserts), 2)
+        self.assertEqual(len(client.inserts[1]), 18)
+        self.assertEqual(client.accepted, [r["x"] for r in rows if r["x"] not in (3, 7)])
+        # THE CALLER IS TOLD WHICH ROWS WERE REJECTED
+        self.assertEqual([r["row"]["x"] for r in error.params.rows], [3, 7])
+
+    def test_rejected_rows_in_split_batches(self):
+        rows = [{"x": i} for i in range(100)]
+        table, client = fake_table(bad={3, 77}, max_rows=11)
+
+        error = extend_error(table, rows)
+
+        # EVERY BATCH WAS SENT, AND ONLY THE BAD ROWS ARE MISSING
+        self.assertEqual(client.accepted, [i for i in range(100) if i not in (3, 77)])
+        self.assertEqual([r["row"]["x"] for r in error.params.rows], [3, 77])
+
+    def test_large_batch_is_split_without_encoding_again(self):
+        rows = [{"x": i} for i in range(100)]
+        table, client = fake_table(max_rows=11)
+
+        with patch.object(bigquery, "typed_encode", wraps=typed_encode) as encode:
+            table._extend(rows)
+
+        self.assertEqual(encode.call_count, len(rows))
+        self.assertEqual(len(client.inserts), 11)
+        self.assertEqual(client.accepted, list(range(100)))
+
+
+def extend_error(table, rows):
+    """
+    :return: THE EXCEPTION RAISED BY table._extend(rows)
+    """
+    try:
+        table._extend(rows)
+    except Exception as e:
+        return Except.wrap(e)
+    Log.error("expecting rejected rows to raise")
+
+
+def fake_table(bad=(), max_rows=None):
+    client = FakeClient(bad, max_rows)
+    table = object.__new__(Table)
+    table.read_only = False
+    table._flake = Snowflake("test", Data(), Data())
+    table.shard = "shard"
+    table.container = Data(client=client)
+    table.last_extend = Null
+    table._create_new_shard = lambda: None
+    return table, client
+
+
+class FakeClient(object):
+    """
+    RECORD THE INSERTS, AND REJECT LIKE BIGQUERY DOES
+    """
+
+    def __init__(self, bad, max_rows):
+        self.bad = bad
+        self.max_rows = max_rows
+        self.inserts = []
+        self.accepted = []
+
+    def insert_rows_json(self, shard, json_rows, **kwargs):
+        self.inserts.append(json_rows)
+        if self.max_rows and len(json_rows) > self.max_rows:
+            raise Exception("400 POST: Request payload size exceeds the limit")
+        values = [r["x"]["__i__"] for r in json_rows]
+        if any(v in self.bad for v in values):
+            # WHOLE REQUEST IS REJECTED, VALID ROWS ARE "stopped"
+            return [
+                {"index": i, "errors": [{"reason": "invalid" if v in self.bad else "stopped"}]}
+                for i, v in enumerate(values)
+            ]
+        self.accepted.extend(values)
+        return []
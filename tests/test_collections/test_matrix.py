@@ -0,0 +1,92 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import unicode_literals
+
+from unittest import skipIf
+
+from mo_collections.matrix import Matrix, dense_matrix, numpy, DenseMatrix
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+@skipIf(numpy is None, "requires numpy")
+class TestDenseMatrix(FuzzyTestCase):
+    def test_same_as_matrix(self):
+        dense = dense_matrix((2, 3), zeros=0)
+        simple = Matrix(dims=(2, 3), zeros=0)
+        self.assertIsInstance(dense, DenseMatrix)
+
+        coords = [(0, 1), (1, 2), (1, 0)]
+        values = [3, 4, 5]
+        dense.set_many(coords, values)
+        simple.set_many(coords, values)
+
+        self.assertEqual(dense.cube, simple.cube)
+        self.assertEqual(list(dense.items()), list(simple.items()))
+        self.assertEqual(dense[1, 2], 4)
+        self.assertIsInstance(dense[1, 2], int)
+        self.assertEqual(dense[1, None].cube, [5, 0, 4])
+
+    def test_missing_and_floats(self):
+        m = dense_matrix((2, 2))
+        m[0, 0] = 1.5
+        self.assertEqual(m.cube, [[1.5, None], [None, None]])
+        self.assertEqual(m.aggregate("max"), 1.5)
+        self.assertEqual(m.aggregate("min"), 1.5)
+
+    def test_object_fallback(self):
+        m = dense_matrix((2,), zeros=0)
+        m.set_many([(0,), (1,)], [1, {"sum": 2}])
+        self.assertEqual(m.array.dtype, object)
+        self.assertEqual(m.cube, [1, {"sum": 2}])
+
+    def test_groupby(self):
+        m = dense_matrix((2, 3), zeros=0)
+        m.set_many([(r, c) for r in range(2) for c in range(3)], list(range(6)))
+
+        groups = m.groupby([0, 1])
+        self.assertEqual([g for g, _ in groups], [(-1, 0), (-1, 1), (-1, 2)])
+        self.assertEqual([s.cube for _, s in groups], [[0, 3], [1, 4], [2, 5]])
+
+    def test_forall(self):
+        m = dense_matrix((2, 2), zeros=0)
+        m[1, 1] = 7
+        seen = []
+        m.forall(lambda v, c, cube: seen.append((c, v)))
+        self.assertEqual(seen, [((0, 0), 0), ((0, 1), 0), ((1, 0), 0), ((1, 1), 7)])
+
+    def test_large_integers(self):
+        big = 2 ** 53 + 1
+        m = dense_matrix((3,))
+        m.set_many([(0,), (1,)], [big, -big])
+        # assertEqual IS FUZZY FOR NUMBERS, SO COMPARE EXACTLY
+        self.assertTrue(m.cube == [big, -big, None])
+        self.assertTrue(m.aggregate("max") == big)
+
+        m = dense_matrix((2,), zeros=big)
+        self.assertTrue(m.cube == [big, big])
+
+    def test_mixed_integers_and_floats(self):
+        m = dense_matrix((3,), zeros=0)
+        m[1] = 2.5
+        self.assertEqual(m.cube, [0, 2.5, 0])
+        self.assertEqual([type(v) for v in m.cube], [int, float, int])
+
+        m = dense_matrix((3,))
+        m[0] = 1.5
+        m[1] = 2
+        self.assertIsInstance(m[0], float)
+        self.assertIsInstance(m[1], int)
+        self.assertEqual(m.cube, [1.5, 2, None])
+
+    def test_integers_stay_numeric(self):
+        m = dense_matrix((3,))
+        m.set_many([(0,), (2,)], [1, 2 ** 53 - 1])
+        m[1] = None
+        self.assertEqual(m.array.dtype.kind, "f")
+        self.assertTrue(m.cube == [1, None, 2 ** 53 - 1])
@@ -0,0 +1,105 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from jx_base import Column
+from jx_elasticsearch.meta_columns import ColumnList
+from mo_json import STRING
+from mo_logs import Log
+from mo_threads import Signal, Thread
+from mo_times import Date
+from mo_times.timer import Timer
+
+NUM_TABLES = 100
+NUM_COLUMNS = 100 * 1000
+NUM_UPDATES = 10 * 1000
+NUM_READERS = 4
+
+
+def bare_column_list():
+    """
+    A ColumnList WITHOUT THE ELASTICSEARCH SYNCHRONIZATION
+    """
+    return ColumnList()
+
+
+def column(es_index, i):
+    return Column(
+        name="a" + str(i),
+        es_column="a" + str(i) + ".~s~",
+        es_index=es_index,
+        es_type="keyword",
+        jx_type=STRING,
+        nested_path=["."],
+        multi=1,
+        last_updated=Date.now(),
+    )
+
+
+def reader(columns, counts, please_stop):
+    count = 0
+    i = 0
+    while not please_stop:
+        table = "t" + str(i % NUM_TABLES)
+        columns.find(table, "a" + str(i % (NUM_COLUMNS // NUM_TABLES)))
+        i += 7
+        count += 1
+    counts.append(count)
+
+
+def test_column_list(num_columns, num_readers):
+    columns = bare_column_list()
+    per_table = num_columns // NUM_TABLES
+    with Timer("load {{num|comma}} columns", {"num": num_columns}):
+        columns.extend([
+            column("t" + str(t), i)
+            for t in range(NUM_TABLES)
+            for i in range(per_table)
+        ])
+
+    counts = []
+    done = Signal()
+    readers = [
+        Thread.run("reader " + str(r), reader, columns, counts, please_stop=done)
+        for r in range(num_readers)
+    ]
+
+    with Timer("{{num|comma}} updates", {"num": NUM_UPDATES}) as update_timer:
+        for i in range(NUM_UPDATES):
+            columns.update({
+                "set": {"cardinality": i},
+                "where": {"eq": {
+                    "es_index": "t" + str(i % NUM_TABLES),
+                    "es_column": "a" + str(i % per_table) + ".~s~",
+                    "es_type": "keyword",
+                }},
+            })
+    done.go()
+    for r in readers:
+        r.join()
+
+    Log.note(
+        "{{updates|comma}} updates/sec, {{lookups|comma}} lookups/sec with {{readers}} readers",
+        updates=int(NUM_UPDATES / update_timer.duration.seconds),
+        lookups=int(sum(counts) / update_timer.duration.seconds),
+        readers=num_readers,
+    )
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num_columns = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_COLUMNS
+        test_column_list(num_columns, NUM_READERS)
+    finally:
+        Log.stop()
@@ -0,0 +1,117 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from jx_elasticsearch.es52.agg_bulk import MultipartUpload, search_partitions
+from mo_dots import to_data
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Lock, Till
+
+PART_SIZE = 1000
+
+
+class TestAggBulk(FuzzyTestCase):
+    def test_partitions_in_order(self):
+        esq = FakeES()
+        queries = [{"partition": i} for i in range(10)]
+
+        result = list(search_partitions(esq, queries, 100, 3))
+
+        self.assertEqual([r["partition"] for r in result], list(range(10)))
+        self.assertEqual(esq.max_in_flight, 3)
+
+    def test_stop_early(self):
+        esq = FakeES()
+        queries = [{"partition": i} for i in range(10)]
+
+        results = search_partitions(esq, queries, 100, 3)
+        self.assertEqual(next(results)["partition"], 0)
+        results.close()
+
+        # NO NEW SEARCHES AFTER CLOSE
+        self.assertLess(esq.num_searches, 5)
+
+    def test_upload_parts(self):
+        bucket = FakeBucket()
+        with MultipartUpload(bucket, "test.json", policy="public-read", part_size=PART_SIZE) as output:
+            for i in range(3):
+                output.write(b"x" * (PART_SIZE // 2 + 1))
+            output.write(b"end")
+
+        upload = bucket.uploads["test.json"]
+        self.assertTrue(upload.completed)
+        self.assertEqual(upload.policy, "public-read")
+        self.assertEqual(
+            [len(upload.parts[p]) for p in sorted(upload.parts)],
+            [PART_SIZE + 2, PART_SIZE // 2 + 4],
+        )
+
+    def test_upload_cancelled_on_error(self):
+        bucket = FakeBucket()
+        try:
+            with MultipartUpload(bucket, "test.json", part_size=PART_SIZE) as output:
+                output.write(b"x" * PART_SIZE)
+                raise Exception("problem")
+        except Exception:
+            pass
+
+        upload = bucket.uploads["test.json"]
+        self.assertTrue(upload.cancelled)
+        self.assertFalse(upload.completed)
+
+
+class FakeES(object):
+    """
+    ANSWER EACH PARTITION AFTER A DELAY, LATER PARTITIONS ARE FASTER
+    """
+
+    def __init__(self):
+        self.es = self
+        self.locker = Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.num_searches = 0
+
+    def search(self, query, limit):
+        with self.locker:
+            self.in_flight += 1
+            self.num_searches += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        Till(seconds=(10 - query["partition"]) / 100).wait()
+        with self.locker:
+            self.in_flight -= 1
+        return to_data({"aggregations": {"partition": query["partition"]}})
+
+
+class FakeBucket(object):
+    def __init__(self):
+        self.uploads = {}
+
+    def initiate_multipart_upload(self, key_name, headers=None, policy=None):
+        output = self.uploads[key_name] = FakeUpload(policy)
+        return output
+
+
+class FakeUpload(object):
+    def __init__(self, policy):
+        self.policy = policy
+        self.parts = {}
+        self.completed = False
+        self.cancelled = False
+
+    def upload_part_from_file(self, fp, part_num):
+        self.parts[part_num] = fp.read()
+
+    def complete_upload(self):
+        self.completed = True
+
+    def cancel_upload(self):
+        self.cancelled = True
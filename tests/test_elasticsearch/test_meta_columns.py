@@ -0,0 +1,79 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from jx_base import Column
+from jx_elasticsearch.meta_columns import ColumnList
+from mo_json import STRING
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times import Date
+
+
+class TestMetaColumns(FuzzyTestCase):
+    def test_find_by_name_and_es_column(self):
+        columns = bare_column_list()
+        columns.extend([column("t", i) for i in range(100)])
+
+        self.assertEqual(len(columns.find("t")), 100)
+        self.assertEqual(columns.find("t", "a7")[0].es_column, "a7.~s~")
+        self.assertEqual(columns.find_es_column("t", "a7.~s~")[0].name, "a7")
+        self.assertEqual(columns.find("other"), [])
+
+    def test_update_uses_es_column(self):
+        columns = bare_column_list()
+        columns.extend([column("t", i) for i in range(100)])
+
+        columns.update({
+            "set": {"cardinality": 42},
+            "where": {"eq": {"es_index": "t", "es_column": "a7.~s~", "es_type": "keyword"}},
+        })
+        self.assertEqual(columns.find("t", "a7")[0].cardinality, 42)
+        self.assertEqual(columns.find("t", "a8")[0].cardinality, None)
+
+    def test_readers_keep_snapshot(self):
+        columns = bare_column_list()
+        columns.extend([column("t", i) for i in range(10)])
+        before = columns.data
+
+        columns.add(column("t", 10))
+        columns.update({
+            "clear": ".",
+            "where": {"eq": {"es_index": "t", "es_column": "a3.~s~"}},
+        })
+
+        # OLD SNAPSHOT IS UNTOUCHED
+        self.assertEqual(len(before["t"]), 10)
+        self.assertIn("a3", before["t"])
+        # NEW SNAPSHOT HAS THE CHANGES
+        self.assertEqual(len(columns.find("t")), 10)
+        self.assertEqual(columns.find("t", "a3"), [])
+        self.assertEqual(columns.find_es_column("t", "a3.~s~"), [])
+        self.assertEqual(columns.find("t", "a10")[0].name, "a10")
+
+
+def bare_column_list():
+    """
+    A ColumnList WITHOUT THE ELASTICSEARCH SYNCHRONIZATION
+    """
+    return ColumnList()
+
+
+def column(es_index, i):
+    return Column(
+        name="a" + str(i),
+        es_column="a" + str(i) + ".~s~",
+        es_index=es_index,
+        es_type="keyword",
+        jx_type=STRING,
+        nested_path=["."],
+        multi=1,
+        last_updated=Date.now(),
+    )
@@ -0,0 +1,143 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from jx_elasticsearch.meta import ElasticsearchMetadata, PROBE_BATCH_SIZE
+from mo_dots import Data, to_data
+from mo_json import STRING, value2json
+from mo_logs.strings import quote
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_times import Date
+
+
+class TestMetaProbes(FuzzyTestCase):
+    def test_columns_are_batched_by_index(self):
+        cluster = FakeCluster()
+        meta = fake_metadata(cluster)
+        columns = [column("a", i) for i in range(PROBE_BATCH_SIZE + 50)] + [
+            column("b", i) for i in range(PROBE_BATCH_SIZE)
+        ]
+
+        meta._update_cardinality_batch(columns)
+
+        self.assertEqual(cluster.num_posts, 0)
+        # ONE _msearch FOR CARDINALITY, ONE FOR PARTITIONS
+        self.assertEqual(cluster.num_msearch, 2)
+        # a NEEDS TWO AGGREGATION REQUESTS, b NEEDS ONE
+        self.assertEqual(cluster.num_requests, 6)
+        self.assertEqual(len(meta.meta.columns.updates), len(columns))
+        for u in meta.meta.columns.updates:
+            self.assertEqual(u.set.cardinality, 3)
+            self.assertEqual(u.set.partitions, ["x", "y", "z"])
+
+    def test_failed_request_is_probed_alone(self):
+        cluster = FakeCluster(bad_column="c3")
+        meta = fake_metadata(cluster)
+        columns = [column("a", i) for i in range(10)]
+
+        meta._update_cardinality_batch(columns)
+
+        # THE BATCH FAILS, SO EACH COLUMN IS PROBED ON ITS OWN
+        self.assertEqual(cluster.num_msearch, 1)
+        self.assertGreater(cluster.num_posts, 10)
+        updated = {u.where.eq.es_column for u in meta.meta.columns.updates if u.set.partitions}
+        self.assertEqual(len(updated), 9)
+        self.assertNotIn("c3", updated)
+
+    def test_priority(self):
+        meta = fake_metadata(FakeCluster())
+        meta.recently_queried["b"] = Date.now().unix
+        old = column("a", 0, cardinality=3, last_updated=Date("2000-01-01").unix)
+        recent = column("b", 0, cardinality=3, last_updated=Date.now().unix)
+        never = column("a", 1)
+
+        result = sorted([old, recent, never], key=meta._probe_priority)
+        self.assertEqual([c.es_column for c in result], ["c1", "c0", "c0"])
+        self.assertEqual([c.es_index for c in result], ["a", "b", "a"])
+
+
+def column(index, i, cardinality=None, last_updated=None):
+    return Data(
+        name="c" + str(i),
+        es_index=index,
+        es_column="c" + str(i),
+        es_type="keyword",
+        jx_type=STRING,
+        nested_path=["."],
+        cardinality=cardinality,
+        last_updated=last_updated,
+    )
+
+
+def fake_metadata(cluster):
+    output = object.__new__(ElasticsearchMetadata)
+    output.es_cluster = cluster
+    output.index_does_not_exist = set()
+    output.recently_queried = {}
+    output.meta = Data()
+    output.meta.columns = FakeColumns()
+    return output
+
+
+class FakeColumns(object):
+    def __init__(self):
+        self.updates = []
+
+    def find(self, es_index, es_column=None):
+        return []
+
+    def update(self, command):
+        self.updates.append(to_data(command))
+
+    def clear(self, *args, **kwargs):
+        pass
+
+
+class FakeCluster(object):
+    """
+    ANSWER AGGREGATIONS WITH CANNED VALUES, AND COUNT THE REQUESTS
+    """
+
+    def __init__(self, bad_column=None):
+        self.bad_column = bad_column
+        self.num_posts = 0
+        self.num_msearch = 0
+        self.num_requests = 0
+
+    def post(self, path, data):
+        self.num_posts += 1
+        return self._search(data)
+
+    def multisearch(self, queries):
+        self.num_msearch += 1
+        self.num_requests += len(queries)
+        output = []
+        for index, query in queries:
+            try:
+                output.append(self._search(query))
+            except Exception as cause:
+                output.append(to_data({"error": str(cause)}))
+        return output
+
+    def _search(self, query):
+        if self.bad_column and quote(self.bad_column) in value2json(query):
+            raise Exception("No field found for [" + self.bad_column + "]")
+
+        query = to_data(query)
+        aggs = {}
+        for name, agg in query.aggs.items():
+            if name == "_filter":
+                aggs[name] = {k: {"value": 1} for k in agg.aggs.keys()}
+            elif agg.cardinality:
+                aggs[name] = {"value": 3}
+            elif agg.terms:
+                aggs[name] = {"buckets": [{"key": k} for k in ["z", "x", "y"]]}
+        return to_data({"hits": {"total": 100}, "aggregations": aggs})
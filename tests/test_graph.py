@@ -18,7 +18,7 @@ from mo_json import value2json
 from mo_graphs.graph import Graph
 from mo_testing.fuzzytestcase import FuzzyTestCase
 from mo_graphs import Edge
-from mo_graphs.algorithms import dominator_tree, LOOPS, ROOTS
+from mo_graphs.algorithms import dominator, dominator_tree, LOOPS, ROOTS
 
 
 class TestGraph(FuzzyTestCase):
@@ -252,3 +252,40 @@ class TestGraph(FuzzyTestCase):
             {(LOOPS, 1), (LOOPS, 3), (1, 2), (3, 4), (1, "A")}
         ]
         self.assertTrue(any(dom.edges == e for e in expected), "not found " + value2json(dom.edges))
+
+    def test_dominator_from_root_through_loop(self):
+        edges = [
+            (0, 1),
+            (1, 2),
+            (2, 1),
+            (2, 3)
+        ]
+
+        g = Graph(int)
+        for e in edges:
+            g.add_edge(Edge(*e))
+
+        dom = dominator_tree(g)
+        expected = {(ROOTS, 0), (0, 1), (1, 2), (2, 3)}
+        self.assertEqual(dom.edges, expected, "not found " + value2json(dom.edges))
+
+    def test_first_common_descendant(self):
+        edges = [
+            (0, 1),
+            (1, 2),
+            (1, 3),
+            (2, 4),
+            (3, 4),
+            (4, 5),
+            (5, 6),
+            (5, 7)
+        ]
+
+        g = Graph(int)
+        for e in edges:
+            g.add_edge(Edge(*e))
+
+        self.assertEqual(dominator(g, 0), 1)
+        self.assertEqual(dominator(g, 1), 4)
+        self.assertEqual(dominator(g, 2), 4)
+        self.assertEqual(dominator(g, 5), None)
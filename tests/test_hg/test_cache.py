@@ -0,0 +1,125 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import os
+import tempfile
+import zlib
+
+from jx_sqlite import sqlite
+from jx_sqlite.sqlite import quote_value
+from mo_dots import Data
+from mo_hg.relay import cache as cache_module
+from mo_hg.relay.cache import Cache
+from mo_sql import sql_iso, sql_list
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import THREAD_STOP
+from mo_times import Date, HOUR
+
+HEADERS = '{"content-type": "application/json"}'
+
+
+class TestCache(FuzzyTestCase):
+    def setUp(self):
+        # THE DEBUG DUMP OF QUERY RESULTS CAN NOT SHOW BLOBS
+        self.debug, sqlite.DEBUG = sqlite.DEBUG, False
+        handle, self.filename = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        os.remove(self.filename)
+        self.cache = Cache(
+            source=Data(url="http://localhost"),
+            database={"filename": self.filename},
+            max_memory=10,
+        )
+
+    def tearDown(self):
+        self.cache.stop()
+        self.cache.db.close()
+        self.cache.db.worker.join()
+        os.remove(self.filename)
+        sqlite.DEBUG = self.debug
+
+    def test_lru_eviction(self):
+        cache = self.cache
+        now = Date.now()
+        with cache.cache_locker:
+            cache._set("a", None, HEADERS, b"aaaa", now)
+            cache._set("b", None, HEADERS, b"bbbb", now)
+            cache._set("waiting", None, None, None, now)
+            # TOUCH a, SO b IS THE LEAST RECENTLY USED
+            cache._set("a", None, HEADERS, b"aaaa", now)
+            cache._set("c", None, HEADERS, b"cccc", now)
+
+        self.assertEqual(list(cache.cache.keys()), ["waiting", "a", "c"])
+        self.assertEqual(cache.cache_size, 8)
+
+        # ONE LARGE RESPONSE PUSHES OUT EVERYTHING ELSE, BUT IS KEPT
+        with cache.cache_locker:
+            cache._set("big", None, HEADERS, b"x" * 20, now)
+        self.assertEqual(list(cache.cache.keys()), ["waiting", "big"])
+        self.assertEqual(cache.cache_size, 20)
+
+    def test_write_behind_batches(self):
+        cache = self.cache
+        batches = []
+        db_write = cache._db_write
+
+        def record(todo):
+            batches.append(len([t for t in todo if t is not THREAD_STOP]))
+            db_write(todo)
+
+        cache._db_write = record
+        now = Date.now().unix
+        for i in range(5):
+            cache.db_todo.add(("/rev/" + str(i), now, HEADERS, b"response" + str(i).encode("ascii")))
+        cache.db_todo.add(("/rev/0", now + 1, None, None))
+
+        cache.stop()
+        self.assertEqual(batches[0], 6)
+        rows = cache.db.query("SELECT path, response, timestamp FROM cache ORDER BY path").data
+        self.assertEqual(
+            [(p, zlib.decompress(r), t) for p, r, t in rows],
+            [("/rev/" + str(i), b"response" + str(i).encode("ascii"), now + (1 if i == 0 else 0)) for i in range(5)],
+        )
+
+    def test_flush_on_stop(self):
+        cache = self.cache
+        now = Date.now().unix
+        # LONGER THAN THE TEST, SO ONLY stop() CAN TRIGGER THE WRITE
+        old_delay, cache_module.WRITE_BEHIND_DELAY = cache_module.WRITE_BEHIND_DELAY, HOUR
+        try:
+            cache.db_todo.add(("/rev/a", now, HEADERS, b"first"))
+            cache.db_todo.add(("/rev/b", now, HEADERS, b"second"))
+            cache.stop()
+        finally:
+            cache_module.WRITE_BEHIND_DELAY = old_delay
+
+        rows = cache.db.query("SELECT path, response FROM cache ORDER BY path").data
+        self.assertEqual(
+            [(p, zlib.decompress(r)) for p, r in rows],
+            [("/rev/a", b"first"), ("/rev/b", b"second")],
+        )
+
+    def test_read_legacy_text(self):
+        cache = self.cache
+        legacy = "caf\xe9 \xff"
+        with cache.db.transaction() as t:
+            t.execute(
+                "INSERT INTO cache (path, headers, response, timestamp) VALUES"
+                + sql_iso(sql_list([
+                    quote_value("/raw-file/legacy"),
+                    quote_value(HEADERS),
+                    quote_value(legacy),
+                    quote_value(Date.now().unix),
+                ]))
+            )
+
+        response = cache.request("GET", "/raw-file/legacy", {})
+        self.assertEqual(response.get_data(), legacy.encode("latin1"))
+        self.assertEqual(cache.cache["/raw-file/legacy"][2], legacy.encode("latin1"))
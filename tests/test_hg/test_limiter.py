@@ -0,0 +1,121 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_hg.relay.limiter import RateLimiter
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+STEP = 0.01  # SECONDS OF SIMULATED TIME PER STEP
+
+
+class TestLimiter(FuzzyTestCase):
+    def test_throughput(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=10, burst=10, clock=clock)
+        for i in range(1000):
+            limiter.add("/mozilla-central/json-rev/" + str(i), i)
+
+        served = run(limiter, clock, seconds=10)
+
+        # THE FULL BUCKET, PLUS 10 PER SECOND
+        self.assertAlmostEqual(len(served), 110, delta=1)
+        self.assertEqual([i for _, i in served], list(range(len(served))))
+
+    def test_interactive_before_bulk(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=10, burst=10, clock=clock)
+        for i in range(100):
+            limiter.add("/mozilla-central/json-annotate/" + str(i), "bulk")
+        served = run(limiter, clock, seconds=1)
+        for i in range(10):
+            limiter.add("/mozilla-central/json-rev/" + str(i), "interactive")
+        served += run(limiter, clock, seconds=2)
+
+        # EVERY INTERACTIVE REQUEST IS SERVED WITHIN ABOUT A SECOND OF ARRIVAL
+        interactive = [t for t, r in served if r == "interactive"]
+        self.assertEqual(len(interactive), 10)
+        self.assertLess(max(interactive), 2.1)
+        # BULK GETS THE REMAINING 10 + 3*10 - 10 TOKENS, AT 2 TOKENS EACH
+        bulk = [t for t, r in served if r == "bulk"]
+        self.assertAlmostEqual(len(bulk), 15, delta=1)
+
+    def test_bulk_progresses_under_interactive_load(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=10, burst=10, clock=clock)
+        for i in range(100):
+            limiter.add("/mozilla-central/json-annotate/" + str(i), "bulk")
+
+        # TWICE AS MANY INTERACTIVE REQUESTS AS THERE ARE TOKENS
+        served = []
+        for second in range(20):
+            for i in range(20):
+                limiter.add("/mozilla-central/json-rev/" + str(second) + "-" + str(i), "interactive")
+            served += run(limiter, clock, seconds=1)
+
+        # BULK (2 TOKENS EACH) GETS ABOUT min_share OF THE 10 + 20*10 TOKENS
+        bulk = [t for t, r in served if r == "bulk"]
+        interactive = [t for t, r in served if r == "interactive"]
+        self.assertAlmostEqual(len(bulk) * 2, 21, delta=3)
+        self.assertGreater(len(interactive), 160)
+        # BULK IS SERVED THROUGHOUT, NOT ONLY AT THE START
+        self.assertGreater(max(bulk), 18)
+
+    def test_no_share_is_strict_priority(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=10, burst=10, min_share=0, clock=clock)
+        for i in range(10):
+            limiter.add("/mozilla-central/json-annotate/" + str(i), "bulk")
+        for i in range(100):
+            limiter.add("/mozilla-central/json-rev/" + str(i), "interactive")
+
+        served = run(limiter, clock, seconds=5)
+        self.assertEqual(set(r for _, r in served), {"interactive"})
+
+    def test_duplicates_use_no_token(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=1, burst=1, clock=clock)
+        self.assertTrue(limiter.add("/a/json-rev/1", 1))
+        self.assertFalse(limiter.add("/a/json-rev/1", 2))
+        self.assertTrue(limiter.add("/a/json-rev/2", 3))
+
+        served = run(limiter, clock, seconds=1.5)
+        self.assertEqual([r for _, r in served], [1, 3])
+
+    def test_weight_never_exceeds_burst(self):
+        clock = Clock()
+        limiter = RateLimiter("test", rate=1, burst=1, weights={"/big/": 10}, clock=clock)
+        limiter.add("/big/1", 1)
+
+        served = run(limiter, clock, seconds=1)
+        self.assertEqual([r for _, r in served], [1])
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(limiter, clock, seconds):
+    """
+    ADVANCE clock BY seconds, RELEASING ALL REQUESTS THAT ARE READY
+    :return: LIST OF (time, request) PAIRS
+    """
+    output = []
+    end = clock.now + seconds
+    while clock.now < end:
+        while True:
+            request = limiter.pop_ready()
+            if request is None:
+                break
+            output.append((clock.now, request))
+        clock.now += STEP
+    return output
@@ -0,0 +1,84 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from mo_json import stream, value2json
+from mo_logs import Log
+from mo_times.timer import Timer
+
+CHUNK_SIZE = 2 ** 16
+
+# EACH RECORD HAS A SMALL PROPERTY WE WANT, AND A LARGE SUBTREE WE SKIP
+RECORD = {
+    "id": 0,
+    "payload": {
+        "text": "some \"quoted\" text with an escaped \\ backslash " * 100,
+        "numbers": list(range(200)),
+        "deep": [{"a": {"b": [1, 2, {"c": "d"}]}}] * 20,
+    },
+}
+
+
+def big_array(num_bytes):
+    """
+    RETURN A FUNCTION THAT RETURNS CHUNKS OF A JSON ARRAY OF ABOUT num_bytes
+    """
+    record = value2json(RECORD).encode("utf8")
+    num_records = max(1, num_bytes // (len(record) + 1))
+    chunk = b",".join([record] * max(1, CHUNK_SIZE // len(record)))
+    per_chunk = chunk.count(b'"id"')
+
+    def generate():
+        yield b"["
+        remaining = num_records
+        while remaining > per_chunk:
+            yield chunk
+            yield b","
+            remaining -= per_chunk
+        yield b",".join([record] * remaining)
+        yield b"]"
+
+    gen = generate()
+
+    def get_more():
+        try:
+            return next(gen)
+        except StopIteration:
+            return b""
+
+    return get_more, num_records, num_records * (len(record) + 1)
+
+
+def test_skip_subtrees(num_bytes):
+    get_more, num_records, size = big_array(num_bytes)
+    with Timer("parse {{size|comma}} bytes", {"size": size}) as timer:
+        count = 0
+        for _ in stream.parse(get_more, ".", {"id"}):
+            count += 1
+    if count != num_records:
+        Log.error("expecting {{expected}} records, got {{count}}", expected=num_records, count=count)
+    Log.note(
+        "{{count}} records at {{rate}} MB/sec",
+        count=count,
+        rate=round(size / timer.duration.seconds / 1000000, 1),
+    )
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        # DEFAULT TO 4GB
+        num_bytes = int(sys.argv[1]) if len(sys.argv) > 1 else 4 * 2 ** 30
+        test_skip_subtrees(num_bytes)
+    finally:
+        Log.stop()
@@ -16,7 +16,7 @@ from io import BytesIO
 
 from mo_dots import Null
 from mo_future import text
-from mo_json import stream
+from mo_json import stream, value2json
 from mo_testing.fuzzytestcase import FuzzyTestCase
 
 
@@ -355,6 +355,25 @@ class TestJsonStream(FuzzyTestCase):
         ]
         self.assertEqual(result, expected)
 
+    def test_skip_long_values(self):
+        long_text = "x\\\"" * 10000
+        source = value2json([
+            {"a": i, "b": {"c": [long_text, {"d": long_text}]}, "e": long_text}
+            for i in range(20)
+        ])
+        json = chunked_stream(source, 7)
+        result = list(stream.parse(json, ".", expected_vars={"a"}))
+        expected = [{"a": i} for i in range(20)]
+        self.assertEqual(result, expected)
+
+    def test_select_long_values(self):
+        long_text = "\u0105 \\ \"" * 10000
+        source = value2json([{"a": i, "b": long_text} for i in range(5)])
+        json = chunked_stream(source, 1000)
+        result = list(stream.parse(json, ".", expected_vars={"a", "b"}))
+        expected = [{"a": i, "b": long_text} for i in range(5)]
+        self.assertEqual(result, expected)
+
 
 def slow_stream(bytes):
     if isinstance(bytes, text):
@@ -364,3 +383,13 @@ def slow_stream(bytes):
     def output():
         return r(1)
     return output
+
+
+def chunked_stream(bytes, size):
+    if isinstance(bytes, text):
+        bytes = bytes.encode("utf8")
+
+    r = BytesIO(bytes).read
+    def output():
+        return r(size)
+    return output
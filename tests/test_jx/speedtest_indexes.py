@@ -0,0 +1,72 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from jx_sqlite.container import Container
+from mo_logs import Log
+from mo_threads import Till
+from mo_times.timer import Timer
+
+NUM_QUERIES = 20
+
+
+def make_facts(container, num_rows):
+    facts = container.get_or_create_facts("lookup")
+    facts.insert([{"k": "key" + str(r), "v": r} for r in range(num_rows)])
+    return facts
+
+
+def run(table, name):
+    """
+    NUM_QUERIES POINT LOOKUPS, RETURN THE SECONDS PER QUERY
+    """
+    with Timer("{{name}} lookups", {"name": name}, silent=True) as timer:
+        for i in range(NUM_QUERIES):
+            result = table.query({
+                "from": "lookup",
+                "select": "v",
+                "where": {"eq": {"k": "key" + str(i * 7)}},
+                "format": "list",
+            })
+            if result.data != [i * 7]:
+                Log.error("Expecting {{value}}", value=i * 7)
+    return timer.duration.seconds / NUM_QUERIES
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+        # THE FIRST BATCH OF LOOKUPS PASSES THE THRESHOLD, BUT SCANS
+        container = Container(indexes={"create_threshold": NUM_QUERIES})
+        make_facts(container, num_rows)
+        table = container.get_table("lookup")
+
+        scan = run(table, "scan")
+
+        # THE INDEX IS MADE ON THE ADVISOR THREAD; WAIT FOR IT
+        timeout = Till(seconds=60)
+        while not container.indexes.indexes and not timeout:
+            Till(seconds=0.1).wait()
+        if not container.indexes.indexes:
+            Log.error("Expecting an index to be made")
+
+        indexed = run(table, "indexed")
+        Log.note(
+            "{{rows}} rows: scan {{scan|round(places=3)}}ms, indexed {{indexed|round(places=3)}}ms per lookup ({{ratio|round(places=1)}}x)",
+            rows=num_rows,
+            scan=scan * 1000,
+            indexed=indexed * 1000,
+            ratio=scan / indexed,
+        )
+    finally:
+        Log.stop()
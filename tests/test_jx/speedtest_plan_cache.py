@@ -0,0 +1,85 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from jx_base.plan_cache import PlanCache
+from jx_sqlite.container import Container
+from mo_json import value2json
+from mo_logs import Log
+from mo_times.timer import Timer
+
+PLATFORMS = ["linux", "windows", "mac", "android"]
+BRANCHES = ["central", "beta", "release", "esr"]
+
+
+def dashboard_queries(num):
+    """
+    THE SAME TWO SHAPES, WITH DIFFERENT LITERALS
+    """
+    for i in range(num):
+        platform = PLATFORMS[i % len(PLATFORMS)]
+        branch = BRANCHES[(i // len(PLATFORMS)) % len(BRANCHES)]
+        yield {
+            "from": "tests",
+            "select": {"aggregate": "average", "value": "duration"},
+            "groupby": ["result"],
+            "where": {"and": [{"eq": {"platform": platform}}, {"eq": {"branch": branch}}]},
+            "format": "table",
+        }
+        yield {
+            "from": "tests",
+            "select": {"aggregate": "count"},
+            "edges": ["platform"],
+            "where": {"in": {"branch": [branch, "central"]}},
+            "format": "cube",
+        }
+
+
+class NoPlanCache(PlanCache):
+    """
+    PLAN EVERY QUERY, LIKE BEFORE THERE WAS A CACHE
+    """
+
+    def get(self, query, version, make_plan):
+        return PlanCache.get(self, query, None, make_plan)
+
+
+def run(container, num):
+    table = container.get_table("tests")
+    for q in dashboard_queries(num):
+        table.query(q)
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+        container = Container()
+        facts = container.get_or_create_facts("tests")
+        facts.insert([
+            {"platform": p, "branch": b, "result": r, "duration": d}
+            for p in PLATFORMS
+            for b in BRANCHES
+            for r in ["pass", "fail"]
+            for d in range(10)
+        ])
+
+        container.plans = NoPlanCache("disabled")
+        with Timer("{{num}} queries, no plan cache", {"num": num * 2}):
+            run(container, num)
+
+        container.plans = PlanCache("sqlite")
+        with Timer("{{num}} queries, with plan cache", {"num": num * 2}):
+            run(container, num)
+        Log.note("plan cache: {{stats}}", stats=value2json(container.plans))
+    finally:
+        Log.stop()
@@ -0,0 +1,63 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+
+from jx_sqlite.container import Container
+from mo_logs import Log
+from mo_times.timer import Timer
+
+NUM_COLUMNS = 40
+
+
+def make_facts(container, num_rows):
+    """
+    ONE TABLE OF NUM_COLUMNS COLUMNS, A MIX OF NUMBERS, STRINGS AND NULLS
+    """
+    facts = container.get_or_create_facts("wide")
+    facts.insert([
+        {
+            "c" + str(c): (r * c if c % 2 else "v" + str(r % 100)) if (r + c) % 7 else None
+            for c in range(NUM_COLUMNS)
+        }
+        for r in range(num_rows)
+    ])
+    return facts
+
+
+def run(table, format, num_rows):
+    with Timer("wide set query, {{format}} format", {"format": format}, silent=True) as timer:
+        result = table.query({
+            "from": "wide",
+            "select": ["c" + str(c) for c in range(NUM_COLUMNS)],
+            "limit": num_rows,
+            "format": format,
+        })
+    if len(result.data if format != "cube" else result.data.c0) != num_rows:
+        Log.error("Expecting {{num}} rows", num=num_rows)
+    Log.note(
+        "{{format}}: {{rate|round(places=0)}} rows per second",
+        format=format,
+        rate=num_rows / timer.duration.seconds,
+    )
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+        container = Container()
+        make_facts(container, num_rows)
+        table = container.get_table("wide")
+        for format in ["table", "list", "cube"]:
+            run(table, format, num_rows)
+    finally:
+        Log.stop()
@@ -258,6 +258,45 @@ class TestDeepOps(BaseTestCase):
         }
         self.utils.execute_tests(test)
 
+    def test_limit_counts_nested_documents(self):
+        # limit COUNTS DOCUMENTS, NOT THE JOINED ROWS OF THEIR NESTED ARRAYS
+        test = {
+            "data": [
+                {"o": 1, "_a": [
+                    {"b": "x", "v": 2},
+                    {"b": "y", "v": 3},
+                    {"b": "z", "v": 4}
+                ]},
+                {"o": 2, "_a": [
+                    {"b": "x", "v": 5},
+                    {"b": "y", "v": 6}
+                ]},
+                {"o": 3, "_a": {"b": "x", "v": 7}},
+                {"o": 4, "c": "x"}
+            ],
+            "query": {
+                "from": TEST_TABLE,
+                "select": ["o", "_a"],
+                "sort": ["o"],
+                "limit": 2
+            },
+            "expecting_list": {
+                "meta": {"format": "list"},
+                "data": [
+                    {"o": 1, "_a": [
+                        {"b": "x", "v": 2},
+                        {"b": "y", "v": 3},
+                        {"b": "z", "v": 4}
+                    ]},
+                    {"o": 2, "_a": [
+                        {"b": "x", "v": 5},
+                        {"b": "y", "v": 6}
+                    ]}
+                ]
+            }
+        }
+        self.utils.execute_tests(test)
+
     def test_select_whole_nested_document(self):
         test = {
             "data": [
@@ -0,0 +1,113 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+import json
+from copy import deepcopy
+
+from jx_sqlite import query_table, setop_table
+from jx_sqlite.container import Container
+from mo_json import value2json
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+# a IS A NUMBER IN SOME ROWS AND A STRING IN OTHERS, SO TWO TYPED COLUMNS SHARE THE push_name "a"
+DATA = [
+    {"a": 1, "b": "x", "c": 1.5},
+    {"a": "one", "b": "y"},
+    {"a": 2, "c": 2.5},
+    {"b": "z"},
+    {"a": "two", "b": "", "c": 3},
+    {"c": 4},
+]
+
+
+class TestFlatDecoding(FuzzyTestCase):
+    """
+    THE FAST PATHS MUST GIVE THE SAME RESULT AS DECODING THROUGH DOCUMENTS
+    """
+
+    def setUp(self):
+        self.container = Container()
+        self.container.get_or_create_facts("flat").insert(DATA)
+        self.table = self.container.get_table("flat")
+
+    def tearDown(self):
+        self.container.close()
+
+    def test_set_op_table(self):
+        self.assertFlatSetOp({"from": "flat", "select": ["a", "b", "c"], "format": "table"})
+        self.assertFlatSetOp({"from": "flat", "select": ["c", "a"], "format": "table"})
+        self.assertFlatSetOp({"from": "flat", "select": "a", "format": "table"})
+
+    def test_set_op_list(self):
+        self.assertFlatSetOp({"from": "flat", "select": ["a", "b", "c"], "format": "list"})
+        self.assertFlatSetOp({"from": "flat", "select": ["a"], "format": "list"})
+        self.assertFlatSetOp({"from": "flat", "select": "a", "format": "list"})
+
+    def test_set_op_limit(self):
+        self.assertFlatSetOp({"from": "flat", "select": ["a", "b"], "limit": 3, "format": "list"})
+        self.assertFlatSetOp({"from": "flat", "select": "a", "limit": 3, "format": "table"})
+
+    def test_set_op_leaves(self):
+        self.assertSame(setop_table, "FLAT_SET_OP", {"from": "flat", "select": "*", "format": "list"})
+        self.assertSame(setop_table, "FLAT_SET_OP", {"from": "flat", "select": "*", "format": "table"})
+
+    def test_groupby_list(self):
+        self.assertSame(query_table, "FLAT_LIST", {
+            "from": "flat",
+            "groupby": ["a"],
+            "select": {"aggregate": "count"},
+            "format": "list",
+        })
+        self.assertSame(query_table, "FLAT_LIST", {
+            "from": "flat",
+            "groupby": ["b"],
+            "select": [{"name": "total", "value": "c", "aggregate": "sum"}, {"aggregate": "count"}],
+            "format": "list",
+        })
+        self.assertSame(query_table, "FLAT_LIST", {
+            "from": "flat",
+            "edges": ["a"],
+            "select": {"name": "max", "value": "c", "aggregate": "max"},
+            "format": "list",
+        })
+
+    def assertFlatSetOp(self, query):
+        """
+        query MUST TAKE THE _flat_set_op PATH, AND MATCH THE DOCUMENT PATH
+        """
+        calls = []
+        flat_set_op = setop_table._flat_set_op
+
+        def counter(*args):
+            calls.append(args)
+            return flat_set_op(*args)
+
+        setop_table._flat_set_op = counter
+        try:
+            self.assertSame(setop_table, "FLAT_SET_OP", query)
+        finally:
+            setop_table._flat_set_op = flat_set_op
+        self.assertEqual(len(calls), 1)
+
+    def assertSame(self, module, flag, query):
+        fast = self.table.query(deepcopy(query))
+        setattr(module, flag, False)
+        try:
+            slow = self.table.query(deepcopy(query))
+        finally:
+            setattr(module, flag, True)
+        # assertEqual IS FUZZY (EXTRA PROPERTIES AND ROWS PASS), SO COMPARE THE JSON
+        fast, slow = _plain(fast), _plain(slow)
+        self.assertTrue(fast == slow, "fast path " + value2json(fast) + " expected " + value2json(slow))
+
+
+def _plain(result):
+    return json.loads(value2json({"header": result.header, "data": result.data}))
@@ -0,0 +1,146 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_dots import Data
+from mo_logs import Log
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Till
+
+from jx_sqlite.indexes import IndexAdvisor, index_name
+
+KEY = ("t", ("a.$n",))
+
+
+class TestIndexAdvisor(FuzzyTestCase):
+    def test_index_made_off_query_path(self):
+        db = FakeDatabase(slow=True)
+        advisor = IndexAdvisor(db=db, create_threshold=2)
+        try:
+            for _ in range(2):
+                advisor.observe(QUERY, SCHEMA)
+            # observe() RETURNS BEFORE THE (SLOW) INDEX IS MADE
+            self.assertEqual(advisor.indexes, {})
+            wait_until(lambda: advisor.indexes)
+            self.assertEqual(advisor.indexes, {KEY: index_name(*KEY)})
+            self.assertEqual(db.created, 1)
+        finally:
+            advisor.stop()
+
+    def test_failed_index_is_retried(self):
+        db = FakeDatabase(failures=1)
+        advisor = IndexAdvisor(db=db, create_threshold=2)
+        try:
+            for _ in range(2):
+                advisor.observe(QUERY, SCHEMA)
+            wait_until(lambda: db.attempts == 1 and not advisor.pending)
+            self.assertEqual(advisor.indexes, {})
+
+            advisor.observe(QUERY, SCHEMA)
+            wait_until(lambda: advisor.indexes)
+            self.assertEqual(advisor.indexes, {KEY: index_name(*KEY)})
+            self.assertEqual(db.attempts, 2)
+        finally:
+            advisor.stop()
+
+    def test_unused_index_is_dropped(self):
+        db = FakeDatabase()
+        advisor = IndexAdvisor(db=db, create_threshold=2, decay_period=3, decay=0.1)
+        try:
+            for _ in range(2):
+                advisor.observe(QUERY, SCHEMA)
+            wait_until(lambda: advisor.indexes)
+            advisor.observe(OTHER_QUERY, SCHEMA)
+            wait_until(lambda: db.dropped)
+            self.assertEqual(advisor.indexes, {})
+            self.assertEqual(db.dropped, 1)
+        finally:
+            advisor.stop()
+
+    def test_dropped_table_is_forgotten(self):
+        db = FakeDatabase()
+        advisor = IndexAdvisor(db=db, create_threshold=2)
+        try:
+            for _ in range(2):
+                advisor.observe(QUERY, SCHEMA)
+            wait_until(lambda: advisor.indexes)
+
+            advisor.forget(["t"])
+            self.assertEqual(advisor.indexes, {})
+            self.assertEqual(advisor.usage, {})
+
+            # A NEW TABLE OF THE SAME NAME GETS ITS OWN INDEX
+            for _ in range(2):
+                advisor.observe(QUERY, SCHEMA)
+            wait_until(lambda: advisor.indexes)
+            self.assertEqual(db.created, 2)
+        finally:
+            advisor.stop()
+
+
+def wait_until(condition):
+    timeout = Till(seconds=10)
+    while not timeout:
+        if condition():
+            return
+        Till(seconds=0.01).wait()
+    Log.error("index advisor did not finish")
+
+
+class Where(object):
+    def __init__(self, *names):
+        self.names = names
+
+    def vars(self):
+        return [Data(var=n) for n in self.names]
+
+
+class Schema(object):
+    def leaves(self, var):
+        return [Data(es_index="t", es_column=var + ".$n", jx_type="number")]
+
+
+QUERY = Data(where=Where("a"))
+OTHER_QUERY = Data(where=Where("b"))
+SCHEMA = Schema()
+
+
+class FakeDatabase(object):
+    """
+    COUNT THE INDEX CHANGES, FAIL THE FIRST failures OF THEM
+    """
+
+    def __init__(self, failures=0, slow=False):
+        self.failures = failures
+        self.slow = slow
+        self.attempts = 0
+        self.created = 0
+        self.dropped = 0
+
+    def transaction(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def execute(self, sql):
+        sql = str(sql)
+        if "DROP" in sql:
+            self.dropped += 1
+            return
+        self.attempts += 1
+        if self.slow:
+            Till(seconds=0.5).wait()
+        if self.attempts <= self.failures:
+            Log.error("index creation failed")
+        self.created += 1
@@ -0,0 +1,98 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_base.plan_cache import PlanCache, bind_literals, parameterize, placeholders_for
+from mo_json import value2json
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+
+class TestPlanCache(FuzzyTestCase):
+    def test_parameterize(self):
+        shape, literals = parameterize(
+            {"from": "t", "where": {"and": [{"eq": {"a": "x"}}, {"in": {"b": ["y", "3"]}}, {"gt": {"c": "z"}}]}},
+            "p{{num}}",
+        )
+        self.assertEqual(literals, ["x", "y"])
+        self.assertEqual(shape["where"], {"and": [{"eq": {"a": "p0"}}, {"in": {"b": ["p1", "3"]}}, {"gt": {"c": "z"}}]})
+
+    def test_same_shape_shares_plan(self):
+        planner = Planner()
+        plans = PlanCache("test")
+        for value in ["a", "b", "c", "a"]:
+            plan = plans.get({"from": "t", "where": {"eq": {"name": value}}}, 1, planner)
+            self.assertEqual(plan.es_query, {"term": {"name": value}})
+        # ONE PLAN, AND ONE MORE TO CONFIRM IT CAN BE BOUND
+        self.assertEqual(planner.count, 2)
+        self.assertEqual(plans.hits, 3)
+
+    def test_literal_dependent_plan(self):
+        planner = Planner(length=True)
+        plans = PlanCache("test")
+        for value in ["a", "bb", "a"]:
+            plan = plans.get({"from": "t", "where": {"eq": {"name": value}}}, 1, planner)
+            self.assertEqual(plan.es_query, {"term": {"name": value}, "length": len(value)})
+        self.assertEqual(planner.uses("a"), 1)
+        self.assertEqual(planner.uses("bb"), 1)
+
+    def test_new_version(self):
+        planner = Planner()
+        plans = PlanCache("test")
+        plans.get({"from": "t"}, 1, planner)
+        plans.get({"from": "t"}, 1, planner)
+        plans.get({"from": "t"}, 2, planner)
+        self.assertEqual(planner.count, 2)
+
+    def test_bind_literals(self):
+        placeholders = placeholders_for(["x"])
+        (placeholder,) = placeholders.keys()
+        self.assertEqual(bind_literals({"a": [placeholder]}, placeholders), {"a": ["x"]})
+        self.assertEqual(bind_literals({"a": "doc." + placeholder}, placeholders), None)
+        self.assertEqual(bind_literals({"a": "b"}, placeholders), None)
+
+
+class Planner(object):
+    """
+    TRANSLATE {"eq": {name: value}} TO AN ES term
+    """
+
+    def __init__(self, length=False):
+        self.length = length
+        self.count = 0
+        self.values = []
+
+    def __call__(self, query):
+        self.count += 1
+        es_query = {}
+        where = query.get("where")
+        if where:
+            (name, value), = where["eq"].items()
+            self.values.append(value)
+            es_query = {"term": {name: value}}
+            if self.length:
+                es_query["length"] = len(value)
+        return Plan(es_query)
+
+    def uses(self, value):
+        return self.values.count(value)
+
+
+class Plan(object):
+    def __init__(self, es_query):
+        self.es_query = es_query
+
+    def bind(self, literals):
+        es_query = bind_literals(self.es_query, placeholders_for(literals))
+        if es_query is None:
+            return None
+        return Plan(es_query)
+
+    def signature(self):
+        return value2json(self.es_query)
@@ -0,0 +1,64 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import sys
+import time
+
+from mo_files import File
+from mo_future import allocate_lock
+from mo_logs.log_usingFile import StructuredLogger_usingFile
+from mo_logs.strings import expand_template
+
+TEMP_DIR = "tests/results/speedtest_log_file"
+TEMPLATE = "{{timestamp}} - request {{num}} from {{user}} took {{duration}} seconds"
+
+
+class AppendPerLine(object):
+    """
+    THE ORIGINAL StructuredLogger_usingFile: OPEN AND CLOSE THE FILE FOR EVERY LINE
+    """
+
+    def __init__(self, file):
+        self.file = File(file)
+        self.file_lock = allocate_lock()
+
+    def write(self, template, params):
+        with self.file_lock:
+            self.file.append(expand_template(template, params))
+
+    def stop(self):
+        pass
+
+
+def lines_per_second(logger, num):
+    start = time.time()
+    for i in range(num):
+        logger.write(TEMPLATE, {"timestamp": start, "num": i, "user": "kyle", "duration": 0.25})
+    logger.stop()
+    return num / (time.time() - start)
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    File(TEMP_DIR).delete()
+    try:
+        before = lines_per_second(AppendPerLine(TEMP_DIR + "/append.log"), num)
+        after = lines_per_second(StructuredLogger_usingFile(TEMP_DIR + "/buffered.log"), num)
+        rotated = lines_per_second(
+            StructuredLogger_usingFile(TEMP_DIR + "/rotated.log", max_size=2 ** 20, compress=True), num
+        )
+        print("append per line:  " + str(int(before)) + " lines/second")
+        print("buffered:         " + str(int(after)) + " lines/second")
+        print("buffered+rotated: " + str(int(rotated)) + " lines/second")
+    finally:
+        time.sleep(1)
+        File(TEMP_DIR).delete()
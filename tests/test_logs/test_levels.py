@@ -0,0 +1,73 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from mo_logs import Log
+from mo_logs.log_usingNothing import StructuredLogger
+from mo_logs.strings import expand_template
+
+
+class TestLevels(FuzzyTestCase):
+    def setUp(self):
+        self.old_log, Log.main_log = Log.main_log, Capture()
+
+    def tearDown(self):
+        Log.main_log = self.old_log
+        Log.set_levels()
+
+    def test_default_logs_all(self):
+        Log.set_levels()
+        Log.note("note {{num}}", num=1)
+        Log.warning("warning")
+        self.assertFalse(Log.filtered)
+        self.assertEqual(len(Log.main_log.lines), 2)
+        self.assertTrue(Log.main_log.lines[0].endswith("note 1"))
+
+    def test_global_level(self):
+        Log.set_levels(level="warning")
+        Log.note("note")
+        Log.alarm("alarm")
+        Log.warning("warning")
+        self.assertEqual(len(Log.main_log.lines), 1)
+        self.assertIn("warning", Log.main_log.lines[0])
+
+    def test_module_level(self):
+        Log.set_levels(level="warning", levels={__name__: "alarm"})
+        Log.note("note")
+        Log.alarm("alarm")
+        self.assertEqual(len(Log.main_log.lines), 1)
+        self.assertIn("alarm", Log.main_log.lines[0])
+
+    def test_package_level(self):
+        Log.set_levels(levels={"a": "warning", "a.b": "note"})
+        self.assertEqual(Log._threshold("a.b.c"), 10)
+        self.assertEqual(Log._threshold("a.c"), 30)
+        self.assertEqual(Log._threshold("ab"), 10)
+
+    def test_exception_text_is_not_limited(self):
+        Log.set_levels()
+        Log.warning("long {{value}}", value="x" * 20000)
+        self.assertEqual(len(Log.main_log.lines), 1)
+        self.assertIn("long " + "x" * 20000, Log.main_log.lines[0])
+
+    def test_bad_level(self):
+        with self.assertRaises(Exception):
+            Log.set_levels(level="loud")
+
+
+class Capture(StructuredLogger):
+    def __init__(self):
+        self.lines = []
+
+    def write(self, template, params):
+        self.lines.append(expand_template(template, params))
@@ -0,0 +1,70 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import gzip
+import os
+import time
+
+from mo_files import File
+from mo_testing.fuzzytestcase import FuzzyTestCase
+
+from mo_logs.log_usingFile import StructuredLogger_usingFile
+
+TEMP_DIR = "tests/results/log_file"
+
+
+class TestLogFile(FuzzyTestCase):
+    def setUp(self):
+        File(TEMP_DIR).delete()
+
+    def tearDown(self):
+        File(TEMP_DIR).delete()
+
+    def test_buffered_until_stop(self):
+        logger = StructuredLogger_usingFile(TEMP_DIR + "/log.txt", flush_period=60)
+        for i in range(10):
+            logger.write("line {{num}}", {"num": i})
+        self.assertFalse(File(TEMP_DIR + "/log.txt").exists)
+        logger.stop()
+        self.assertEqual(File(TEMP_DIR + "/log.txt").read_lines(), ["line " + str(i) for i in range(10)])
+
+    def test_flush_period(self):
+        logger = StructuredLogger_usingFile(TEMP_DIR + "/log.txt", flush_period=0.1)
+        try:
+            logger.write("hello", {})
+            time.sleep(1)
+            self.assertEqual(File(TEMP_DIR + "/log.txt").read(), "hello\n")
+        finally:
+            logger.stop()
+
+    def test_rotate_by_size(self):
+        logger = StructuredLogger_usingFile(TEMP_DIR + "/log.txt", buffer_size=0, max_size=100, compress=True)
+        for i in range(50):
+            logger.write("line {{num}}", {"num": i})
+        logger.stop()
+
+        # COMPRESSION IS DONE ON ANOTHER THREAD
+        directory = File(TEMP_DIR).abspath
+        for _ in range(50):
+            if all(name.endswith(".gz") or name == "log.txt" for name in os.listdir(directory)):
+                break
+            time.sleep(0.1)
+
+        lines = []
+        segments = sorted(name for name in os.listdir(directory) if name.endswith(".gz"))
+        self.assertGreater(len(segments), 1)
+        for segment in segments:
+            with gzip.open(os.path.join(directory, segment), "rb") as g:
+                lines.extend(g.read().decode("utf8").splitlines())
+        if File(TEMP_DIR + "/log.txt").exists:
+            lines.extend(File(TEMP_DIR + "/log.txt").read_lines())
+        self.assertEqual(lines, ["line " + str(i) for i in range(50)])
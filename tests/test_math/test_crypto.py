@@ -42,3 +42,38 @@ class TestCrypto(FuzzyTestCase):
             json2value(u'{"type": "AES256", "length": 4, "salt": "AehqWt1OdEgPJhCx6uylyg==", "data": "FXUGxdb9E+4UCKwsIT9ugQ=="}')
         )
 
+
+    def test_old_format_still_readable(self):
+        key = convert.base642bytearray(u'nm5/wK20R45AUtetHJwHTdOigvGTxP7NcH/41YE8AZo=')
+        encrypted = b'{"type": "AES256", "length": 4, "salt": "AehqWt1OdEgPJhCx6uylyg==", "data": "FXUGxdb9E+4UCKwsIT9ugQ==", "encoding": "utf8"}'
+        self.assertEqual(aes_crypto.decrypt(encrypted, key), "kyle")
+
+    def test_stream(self):
+        key = randoms.bytes(32)
+        data = randoms.bytes(3 * aes_crypto.CHUNK_SIZE + 5)
+        pieces = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+
+        encrypted = b"".join(aes_crypto.encrypt_stream(pieces, key))
+        # DECRYPT FROM ODD SIZED PIECES
+        chunks = [encrypted[i:i + 777] for i in range(0, len(encrypted), 777)]
+        self.assertEqual(b"".join(aes_crypto.decrypt_stream(chunks, key)), data)
+        self.assertEqual(aes_crypto.decrypt(encrypted, key), data)
+
+    def test_stream_matches_slow_cipher(self):
+        key = randoms.bytes(32)
+        salt = randoms.bytes(16)
+        data = randoms.bytes(100)
+        fast = b"".join(aes_crypto.encrypt_stream([data], key, salt=salt))
+        old_cipher, aes_crypto.Cipher = aes_crypto.Cipher, None
+        try:
+            slow = b"".join(aes_crypto.encrypt_stream([data], key, salt=salt))
+            self.assertEqual(b"".join(aes_crypto.decrypt_stream([fast], key)), data)
+        finally:
+            aes_crypto.Cipher = old_cipher
+        self.assertEqual(fast, slow)
+
+    def test_truncated_stream(self):
+        key = randoms.bytes(32)
+        encrypted = b"".join(aes_crypto.encrypt_stream([b"hello world"], key))
+        with self.assertRaises(Exception):
+            b"".join(aes_crypto.decrypt_stream([encrypted[:-4]], key))
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mozci.push import MAX_DEPTH, make_push_range
+from mozci.util.hgmo import HGMO
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "resources")
+
+
+class FakeHGMO(BaseHTTPRequestHandler):
+    """Serve json-pushes from the recorded fixture, and count the requests."""
+
+    requests = []
+
+    def do_GET(self):
+        FakeHGMO.requests.append(self.path)
+        url = urlparse(self.path)
+        query = {k: int(v[0]) for k, v in parse_qs(url.query).items() if k != "version"}
+        with open(os.path.join(RESOURCES, "json_pushes.json")) as f:
+            pushes = json.load(f)["pushes"]
+        content = json.dumps(
+            {
+                "pushes": {
+                    k: v
+                    for k, v in pushes.items()
+                    if query["startID"] < int(k) <= query["endID"]
+                }
+            }
+        ).encode("utf8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestPush(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(("localhost", 0), FakeHGMO)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.template = HGMO.JSON_PUSHES_TEMPLATE
+        HGMO.JSON_PUSHES_TEMPLATE = (
+            f"http://localhost:{cls.server.server_port}/"
+            + "{branch}/json-pushes?version=2&startID={push_id_start}&endID={push_id_end}"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        HGMO.JSON_PUSHES_TEMPLATE = cls.template
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeHGMO.requests = []
+        HGMO.CACHE.clear()
+
+    def test_range_is_one_request(self):
+        pushes = make_push_range(4, 20)
+
+        self.assertEqual(len(FakeHGMO.requests), 1)
+        self.assertEqual([p.id for p in pushes], list(range(5, 21)))
+        self.assertEqual(pushes[0].date, 1590000000 + 5 * 600)
+        for parent, child in zip(pushes, pushes[1:]):
+            self.assertIs(parent.child, child)
+            self.assertIs(child.parent, parent)
+        # newest changeset first
+        self.assertEqual(len(pushes[0].revs), 3)
+        self.assertEqual(pushes[0].rev, pushes[0].revs[0])
+        self.assertEqual(len(FakeHGMO.requests), 1)
+
+    def test_iterate_children_prefetches(self):
+        push = make_push_range(0, 1)[0]
+        FakeHGMO.requests = []
+
+        children = list(push._iterate_children(max_depth=MAX_DEPTH))
+
+        self.assertEqual([p.id for p in children], list(range(1, MAX_DEPTH + 2)))
+        # the last `child` is looked up before `max_depth` is checked
+        self.assertEqual(len(FakeHGMO.requests), 2)
+
+    def test_no_child_at_tip(self):
+        push = make_push_range(29, 30)[0]
+        self.assertEqual(list(push._iterate_children()), [push])
+
+    def test_parents(self):
+        push = make_push_range(24, 25)[0]
+        FakeHGMO.requests = []
+
+        other = push
+        for _ in range(MAX_DEPTH):
+            other = other.parent
+
+        self.assertEqual(other.id, 25 - MAX_DEPTH)
+        self.assertEqual(len(FakeHGMO.requests), 1)
+        self.assertIs(push.parent.child, push)
+
+    def test_cache_is_bounded(self):
+        size = HGMO.CACHE_SIZE
+        HGMO.CACHE_SIZE = 3
+        try:
+            first = HGMO.create("a" * 40)
+            for rev in "bcd":
+                HGMO.create(rev * 40)
+            self.assertEqual(len(HGMO.CACHE), 3)
+            self.assertIsNot(HGMO.create("a" * 40), first)
+
+            # recently used instances are kept
+            d = HGMO.create("d" * 40)
+            HGMO.create("e" * 40)
+            self.assertIs(HGMO.create("d" * 40), d)
+        finally:
+            HGMO.CACHE_SIZE = size
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import unicode_literals
+
+import os
+import re
+import time
+
+from jx_mysql import mysql, mysql_snowflake_extractor
+from jx_mysql.mysql_snowflake_extractor import MySqlSnowflakeExtractor
+from mo_future import allocate_lock
+from mo_sql import SQL
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Thread, Till
+
+IDS = [3, 1, 4, 15, 9, 2, 6]
+NUM_CHILDREN = 2
+
+RELATIONS = (
+    ("table_schema", "table_name", "referenced_table_schema", "referenced_table_name", "referenced_column_name", "constraint_name", "column_name", "ordinal_position"),
+    [("testing", "child", "testing", "fact", "id", "child_fact", "fact_id", 1)],
+)
+TABLES = (
+    ("table_schema", "table_name", "constraint_name", "constraint_type", "column_name", "ordinal_position"),
+    [
+        ("testing", "child", "PRIMARY", "PRIMARY KEY", "id", 1),
+        ("testing", "fact", "PRIMARY", "PRIMARY KEY", "id", 1),
+    ],
+)
+COLUMNS = (
+    ("column_name", "table_schema", "table_name", "ordinal_position", "data_type"),
+    [
+        ("id", "testing", "fact", 1, "int"),
+        ("name", "testing", "fact", 2, "varchar"),
+        ("id", "testing", "child", 1, "int"),
+        ("fact_id", "testing", "child", 2, "int"),
+        ("value", "testing", "child", 3, "varchar"),
+    ],
+)
+
+
+class TestShardedExtract(FuzzyTestCase):
+    def setUp(self):
+        self.database = FakeDatabase()
+        self.connect, mysql.connect = mysql.connect, self.database.connect
+
+    def tearDown(self):
+        mysql.connect = self.connect
+
+    def extractor(self, **kwargs):
+        extractor = MySqlSnowflakeExtractor(
+            fact_table="fact",
+            database={"host": "localhost", "schema": "testing"},
+            kwargs=kwargs,
+        )
+        self.database.columns = extractor.columns
+        return extractor
+
+    def test_shards_in_order(self):
+        extractor = self.extractor(shard_size=3, num_connections=2, num_workers=0)
+        docs = list(extractor.extract(SQL("SELECT id FROM fact")))
+
+        self.assertEqual(docs, expected_docs(sorted(IDS)))
+        self.assertEqual(self.database.shard_queries, [[1, 2, 3], [4, 6, 9], [15]])
+        self.assertEqual(self.database.most_running, 2)
+        # ONE FOR THE SCHEMA SCAN, AND ONE PER CONCURRENT SHARD
+        self.assertEqual(self.database.num_connections, 3)
+        self.assertEqual(self.database.open_connections, 1)
+        extractor.close()
+
+    def test_worker_processes(self):
+        extractor = self.extractor(shard_size=2, num_connections=3, num_workers=2)
+        docs = list(extractor.extract(SQL("SELECT id FROM fact")))
+
+        self.assertEqual(docs, expected_docs(sorted(IDS)))
+        self.assertEqual(len(self.database.shard_queries), 4)
+        extractor.close()
+
+    def test_worker_dies(self):
+        extractor = self.extractor(shard_size=2, num_connections=3, num_workers=2)
+        build_shard, mysql_snowflake_extractor._build_shard = mysql_snowflake_extractor._build_shard, _die
+        try:
+            result = []
+
+            def extract(please_stop):
+                try:
+                    list(extractor.extract(SQL("SELECT id FROM fact")))
+                except Exception as e:
+                    result.append(e)
+
+            # FAIL, DO NOT HANG, WHEN A WORKER PROCESS DIES
+            thread = Thread.run("extract", extract)
+            thread.join(till=Till(seconds=60))
+            self.assertEqual(len(result), 1)
+            self.assertIn("terminated abruptly", str(result[0]))
+        finally:
+            mysql_snowflake_extractor._build_shard = build_shard
+            extractor.close()
+
+    def test_stop_early(self):
+        extractor = self.extractor(shard_size=1, num_connections=2, num_workers=0)
+        docs = extractor.extract(SQL("SELECT id FROM fact"))
+        self.assertEqual([next(docs), next(docs)], expected_docs([1, 2]))
+        docs.close()
+
+        # NO MORE THAN 2*num_connections SHARDS WERE REQUESTED
+        self.assertLessEqual(len(self.database.shard_queries), 6)
+        self.assertEqual(self.database.open_connections, 1)
+        extractor.close()
+
+
+def _die(layout, null_values, rows):
+    """
+    RUN IN A WORKER PROCESS, INSTEAD OF _build_shard
+    """
+    os._exit(1)
+
+
+def expected_docs(ids):
+    return [
+        {
+            "id": i,
+            "name": "fact" + str(i),
+            "child": [{"id": i * 10 + j, "value": "v" + str(j)} for j in range(NUM_CHILDREN)],
+        }
+        for i in ids
+    ]
+
+
+class FakeDatabase(object):
+    """
+    SERVE CANNED ROWS TO DB-API CONNECTIONS
+    """
+
+    def __init__(self):
+        self.lock = allocate_lock()
+        self.columns = None  # EXTRACTOR COLUMNS, FOR THE LAYOUT OF THE DOCUMENT ROWS
+        self.num_connections = 0
+        self.open_connections = 0
+        self.shard_queries = []
+        self.running = 0  # SHARD QUERIES RUNNING NOW
+        self.most_running = 0
+
+    def connect(self, **kwargs):
+        with self.lock:
+            self.num_connections += 1
+            self.open_connections += 1
+        return FakeConnection(self)
+
+    def execute(self, sql):
+        """
+        :return: (header, rows) FOR sql
+        """
+        if sql.startswith("SET "):
+            return (), []
+        if "information_schema.tables" in sql:
+            return TABLES
+        if "information_schema.columns" in sql:
+            return COLUMNS
+        if "information_schema.key_column_usage" in sql:
+            return RELATIONS
+        if "LIMIT" in sql:
+            return ("id",), []
+        found = re.search(r" IN \(((?:\s*\(\s*\d+\s*\)\s*,?)+)\)", sql)
+        if found:
+            ids = sorted(int(i) for i in re.findall(r"\d+", found.group(1)))
+            with self.lock:
+                self.shard_queries.append(ids)
+                self.running += 1
+                self.most_running = max(self.most_running, self.running)
+            time.sleep(0.2)  # A SLOW QUERY
+            with self.lock:
+                self.running -= 1
+            return tuple(c.column_alias for c in self.columns), list(self.document_rows(ids))
+        return ("id",), [(i,) for i in sorted(IDS)]
+
+    def document_rows(self, ids):
+        for i in ids:
+            yield tuple(self.value(c, i, None) for c in self.columns)
+            for j in range(NUM_CHILDREN):
+                yield tuple(self.value(c, i, j) for c in self.columns)
+
+    def value(self, column, fact_id, child):
+        table = column.column.table.name
+        name = column.column.column.name
+        if len(column.nested_path) == 1:
+            if table != "fact":
+                return None
+            if name == "id":
+                return fact_id
+            if child is None and name == "name":
+                return "fact" + str(fact_id)
+            return None
+        if child is None:
+            return None
+        return {"id": fact_id * 10 + child, "fact_id": fact_id, "value": "v" + str(child)}[name]
+
+
+class FakeConnection(object):
+    def __init__(self, database):
+        self.database = database
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.database)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            raise Exception("Already closed")
+        self.closed = True
+        with self.database.lock:
+            self.database.open_connections -= 1
+
+
+class FakeCursor(object):
+    def __init__(self, database):
+        self.database = database
+        self.description = None
+        self.rows = []
+
+    def execute(self, sql):
+        header, self.rows = self.database.execute(sql.strip())
+        self.description = [(h,) for h in header]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        pass
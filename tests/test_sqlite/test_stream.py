@@ -0,0 +1,66 @@
+# encoding: utf-8
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+from __future__ import absolute_import, division, unicode_literals
+
+from jx_sqlite.sqlite import Sqlite
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Signal, Thread, Till
+
+
+class TestStream(FuzzyTestCase):
+    def setUp(self):
+        self.db = Sqlite()
+        with self.db.transaction() as t:
+            t.execute("CREATE TABLE rows (id INTEGER)")
+            t.execute("INSERT INTO rows VALUES " + ", ".join("(" + str(i) + ")" for i in range(7)))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_page_boundary(self):
+        expected = [(i,) for i in range(7)]
+        for page_size in [1, 3, 6, 7, 8, 100]:
+            self.assertEqual(
+                list(self.db.stream("SELECT id FROM rows ORDER BY id", page_size=page_size)),
+                expected,
+            )
+        # EXACTLY TWO FULL PAGES, SO THE LAST FETCH IS EMPTY
+        self.assertEqual(
+            list(self.db.stream("SELECT id FROM rows WHERE id<6 ORDER BY id", page_size=3)),
+            expected[:6],
+        )
+        self.assertEqual(list(self.db.stream("SELECT id FROM rows WHERE id<0", page_size=3)), [])
+
+    def test_close_early(self):
+        stream = self.db.stream("SELECT id FROM rows ORDER BY id", page_size=3)
+        self.assertEqual([next(stream) for _ in range(4)], [(0,), (1,), (2,), (3,)])
+        stream.close()
+
+        # THE TRANSACTION IS RELEASED, SO THIS THREAD CAN QUERY AGAIN
+        self.assertEqual(self.db.available_transactions, [])
+        self.assertEqual(self.db.query("SELECT count(1) FROM rows").data, [(7,)])
+
+    def test_writes_wait_for_stream(self):
+        stream = self.db.stream("SELECT id FROM rows ORDER BY id", page_size=3)
+        self.assertEqual(next(stream), (0,))
+
+        written = Signal()
+
+        def writer(please_stop):
+            with self.db.transaction() as t:
+                t.execute("INSERT INTO rows VALUES (100)")
+            written.go()
+
+        thread = Thread.run("writer", writer)
+        Till(seconds=0.5).wait()
+        # THE WRITE IS HELD BACK UNTIL THE STREAM IS DONE
+        self.assertFalse(written)
+        self.assertEqual(list(stream), [(i,) for i in range(1, 7)])
+        thread.join(till=Till(seconds=10))
+        self.assertEqual(self.db.query("SELECT max(id) FROM rows").data, [(100,)])
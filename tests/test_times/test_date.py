@@ -17,7 +17,7 @@ from datetime import datetime
 from mo_future import PY3
 from mo_math import MAX
 from mo_testing.fuzzytestcase import FuzzyTestCase
-from mo_times.dates import Date
+from mo_times.dates import Date, strings2unix
 from mo_times.durations import MONTH, YEAR, WEEK, Duration, DAY
 
 
@@ -81,4 +81,34 @@ class TestDate(FuzzyTestCase):
 
     def test_div(self):
         diff = Date.now()-(Date.now()-DAY)
-        self.assertEqual(diff/DAY, 1)
\ No newline at end of file
+        self.assertEqual(diff/DAY, 1)
+
+    def test_iso_shapes(self):
+        expected = Date(datetime(2014, 7, 16, 10, 57, 0)).unix
+        self.assertEqual(Date("2014-07-16 10:57").unix, expected)
+        self.assertEqual(Date("2014-07-16T10:57:00Z").unix, expected)
+        self.assertEqual(Date("2014-07-16T12:57:00+02:00").unix, expected)
+        self.assertEqual(Date("2014-07-16T05:27:00.25-0530").unix, expected + 0.25)
+
+    def test_learned_format(self):
+        first = Date("16 Jul 2014 10:57:00")
+        second = Date("17 Jul 2014 10:57:00")
+        self.assertEqual(second.unix - first.unix, 86400)
+
+    def test_learned_format_does_not_change_result(self):
+        # SAME SHAPE, DIFFERENT FORMATS; ORDER MUST NOT MATTER
+        column = ["20121201", "01022014", "20121201", "13/01/2014", "01/02/2014", "01/02/2014"]
+        expected = [
+            datetime(2012, 12, 1),
+            datetime(2014, 2, 1),
+            datetime(2012, 12, 1),
+            datetime(2014, 1, 13),
+            datetime(2014, 2, 1),
+            datetime(2014, 2, 1),
+        ]
+        self.assertEqual([Date(v).unix for v in column], [Date(e).unix for e in expected])
+        self.assertEqual([Date(v).unix for v in reversed(column)], [Date(e).unix for e in reversed(expected)])
+
+    def test_strings2unix(self):
+        result = strings2unix(["2014-07-16", None, "Jul 16 2014", "2014-07-16"])
+        self.assertEqual(result, [1405468800, None, 1405468800, 1405468800])
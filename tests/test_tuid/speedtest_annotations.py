@@ -0,0 +1,91 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import absolute_import, division, unicode_literals
+
+import random
+import sys
+
+from mo_logs import Log
+from mo_times.timer import Timer
+
+from tuid.util import AnnotationCache, TuidMap, pack_tuids, unpack_tuids
+
+NUM_FILES = 20
+
+
+def synthetic_annotation(num_lines):
+    """
+    MOST LINES COME FROM A FEW OLD CHANGES, SO RUNS OF tuids ARE CONSECUTIVE
+    """
+    output = []
+    tuid = random.randrange(10 ** 8)
+    for line in range(1, num_lines + 1):
+        if random.randrange(20) == 0:
+            tuid = random.randrange(10 ** 8)
+        else:
+            tuid += 1
+        output.append(TuidMap(tuid, line))
+    return output
+
+
+def stringify(tuid_list):
+    # THE OLD TEXT FORMAT
+    return "\n".join([",".join([str(x.tuid), str(x.line)]) for x in tuid_list])
+
+
+def test_encodings(num_lines):
+    files = [synthetic_annotation(num_lines) for _ in range(NUM_FILES)]
+
+    with Timer("text encode") as text_encode:
+        texts = [stringify(f) for f in files]
+    with Timer("text decode") as text_decode:
+        for t in texts:
+            unpack_tuids(t)
+
+    with Timer("packed encode") as packed_encode:
+        packed = [pack_tuids(f) for f in files]
+    with Timer("packed decode") as packed_decode:
+        for p, f in zip(packed, files):
+            if unpack_tuids(p) != f:
+                Log.error("round trip failed")
+
+    cache = AnnotationCache(max_lines=NUM_FILES * num_lines)
+    for i, f in enumerate(files):
+        cache.set(i, "file", f)
+    with Timer("cache hit") as cache_hit:
+        for i in range(NUM_FILES):
+            cache.get(i, "file")
+
+    for name, size, encode, decode in [
+        ("text", sum(len(t.encode("utf8")) for t in texts), text_encode, text_decode),
+        ("packed", sum(len(p) for p in packed), packed_encode, packed_decode),
+    ]:
+        Log.note(
+            "{{name}}: {{size|comma}} bytes/file, encode {{encode}}ms/file, decode {{decode}}ms/file",
+            name=name,
+            size=size // NUM_FILES,
+            encode=per_file(encode),
+            decode=per_file(decode),
+        )
+    Log.note("cache hit: {{hit}}ms/file", hit=per_file(cache_hit))
+
+
+def per_file(timer):
+    return round(timer.duration.seconds * 1000 / NUM_FILES, 2)
+
+
+if __name__ == "__main__":
+    Log.start()
+    try:
+        num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+        test_encodings(num_lines)
+    finally:
+        Log.stop()
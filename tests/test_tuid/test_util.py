@@ -0,0 +1,81 @@
+# encoding: utf-8
+#
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Author: Kyle Lahnakoski (kyle@lahnakoski.com)
+#
+
+from __future__ import unicode_literals
+
+from mo_future import text
+from mo_testing.fuzzytestcase import FuzzyTestCase
+from mo_threads import Thread
+
+from tuid.util import AnnotationCache, TuidMap, pack_tuids, repack_tuids, unpack_tuids
+
+
+class TestUtil(FuzzyTestCase):
+    def test_round_trip(self):
+        tuids = [TuidMap(t, l) for l, t in enumerate([5, 7, 6, 1000000000000, 3], start=1)]
+        packed = pack_tuids(tuids)
+        self.assertIsInstance(packed, bytes)
+        self.assertEqual(unpack_tuids(packed), tuids)
+
+    def test_empty(self):
+        self.assertEqual(pack_tuids([]), b"")
+        self.assertEqual(unpack_tuids(b""), [])
+        self.assertEqual(unpack_tuids(""), [])
+
+    def test_legacy_text(self):
+        self.assertEqual(unpack_tuids("5,1\n7,2\n"), [TuidMap(5, 1), TuidMap(7, 2)])
+
+    def test_repack_legacy_text(self):
+        packed = repack_tuids("5,1\n7,2\n")
+        self.assertIsInstance(packed, bytes)
+        self.assertEqual(unpack_tuids(packed), [TuidMap(5, 1), TuidMap(7, 2)])
+        self.assertEqual(repack_tuids(""), b"")
+        self.assertEqual(repack_tuids(packed), packed)
+
+    def test_cache_is_bounded_by_lines(self):
+        cache = AnnotationCache(max_lines=10)
+        cache.set("a", "f", [TuidMap(1, 1)] * 4)
+        cache.set("b", "f", [TuidMap(1, 1)] * 4)
+        cache.get("a", "f")
+        cache.set("c", "f", [TuidMap(1, 1)] * 4)
+
+        # b IS THE LEAST RECENTLY USED
+        self.assertEqual(cache.get("b", "f"), None)
+        self.assertEqual(len(cache.get("a", "f")), 4)
+        self.assertEqual(len(cache.get("c", "f")), 4)
+        self.assertEqual(cache.num_lines, 8)
+
+    def test_evict_revisions(self):
+        cache = AnnotationCache(max_lines=100)
+        cache.set("a", "f", [TuidMap(1, 1)] * 4)
+        cache.set("a", "g", [TuidMap(1, 1)] * 3)
+        cache.set("b", "f", [TuidMap(1, 1)] * 2)
+        cache.evict_revisions(["a"])
+
+        self.assertEqual(cache.get("a", "f"), None)
+        self.assertEqual(cache.get("a", "g"), None)
+        self.assertEqual(len(cache.get("b", "f")), 2)
+        self.assertEqual(cache.num_lines, 2)
+
+    def test_cache_shared_by_threads(self):
+        cache = AnnotationCache(max_lines=50)
+
+        def work(num, please_stop):
+            for i in range(2000):
+                cache.set(i % 7, num, [TuidMap(1, 1)] * (i % 5 + 1))
+                cache.get((i + 3) % 7, num)
+
+        threads = [Thread.run("cache " + text(n), work, n) for n in range(4)]
+        for t in threads:
+            t.join()
+
+        # THE LINE COUNT MATCHES WHAT IS HELD
+        self.assertEqual(cache.num_lines, sum(len(v) for v in cache.data.values()))
+        self.assertLessEqual(cache.num_lines, 50)
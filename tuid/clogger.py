@@ -566,6 +566,7 @@ class Clogger:
                                 "DELETE FROM annotations WHERE revision IN " +
                                 quote_set(annrevs_to_del)
                             )
+                        self.tuid_service.annotation_cache.evict_revisions(annrevs_to_del)
 
                     # Delete any overflowing entries
                     new_data2 = new_data1
@@ -698,6 +699,8 @@ class Clogger:
                             quote_set(csets_to_del)
                         )
 
+                    self.tuid_service.annotation_cache.evict_revisions(csets_to_del)
+
                     # Recalculate the revnums
                     self.recompute_table_revnums()
             except Exception as e:
@@ -25,7 +25,7 @@ from pyLibrary.sql import sql_list, sql_iso
 from pyLibrary.sql.sqlite import quote_value, quote_list
 from tuid import sql
 from tuid.pclogger import PercentCompleteLogger
-from tuid.util import MISSING, TuidMap
+from tuid.util import MISSING, TuidMap, AnnotationCache, EMPTY_ANNOTATION, pack_tuids, repack_tuids, unpack_tuids
 
 DEBUG = False
 ANNOTATE_DEBUG = False
@@ -39,6 +39,7 @@ SQL_BATCH_SIZE = 500
 FILES_TO_PROCESS_THRESH = 5
 ENABLE_TRY = False
 DAEMON_WAIT_AT_NEWEST = 30 * SECOND # Time to wait at the newest revision before polling again.
+ANNOTATION_CACHE_SIZE = 10 * 1000 * 1000 # Most lines of decoded annotations to keep in memory.
 
 GET_TUID_QUERY = "SELECT tuid FROM temporal WHERE file=? and revision=? and line=?"
 GET_ANNOTATION_QUERY = "SELECT annotation FROM annotations WHERE revision=? and file=?"
@@ -67,6 +68,7 @@ class TUIDService:
             self.total_files_requested = 0
             self.total_tuids_mapped = 0
             self.pcdaemon = PercentCompleteLogger()
+            self.annotation_cache = AnnotationCache(coalesce(self.config.annotation_cache_size, ANNOTATION_CACHE_SIZE))
         except Exception as e:
             Log.error("can not setup service", cause=e)
 
@@ -101,7 +103,7 @@ class TUIDService:
             CREATE TABLE annotations (
                 revision       CHAR(12) NOT NULL,
                 file           TEXT,
-                annotation     TEXT,
+                annotation     BLOB,
                 PRIMARY KEY(revision, file)
             );''')
 
@@ -144,20 +146,24 @@ class TUIDService:
 
 
     def insert_annotate_dummy(self, transaction, rev, file_name, commit=True):
-        # Inserts annotation dummy: (rev, file, '')
+        # Inserts annotation dummy: (rev, file, EMPTY_ANNOTATION)
 
         if not self._dummy_annotate_exists(transaction, file_name, rev):
-            self.insert_annotations(transaction, [(rev[:12], file_name, '')])
+            self.insert_annotations(transaction, [(rev[:12], file_name, EMPTY_ANNOTATION)])
 
 
     def insert_annotations(self, transaction, data):
         if VERIFY_TUIDS:
-            for _, _, tuids_string in data:
-                self.destringify_tuids(tuids_string)
+            for _, _, packed in data:
+                self.destringify_tuids(packed)
 
         transaction.execute(
             "INSERT INTO annotations (revision, file, annotation) VALUES " +
-            sql_list(quote_list(row) for row in data)
+            sql_list(
+                # ANNOTATIONS COPIED FROM OLDER ROWS MAY STILL BE TEXT
+                sql_iso(sql_list([quote_value(rev), quote_value(file), sql.quote_blob(repack_tuids(packed))]))
+                for rev, file, packed in data
+            )
         )
 
 
@@ -166,6 +172,24 @@ class TUIDService:
         return coalesce(transaction, self.conn).get_one(GET_ANNOTATION_QUERY, (rev, file))[0]
 
 
+    def _get_annotation_tuids(self, rev, file, transaction=None, fill_cache=True):
+        # Returns the TuidMap list of an annotation, [] if the
+        # file was removed, or None if there is no entry.
+        # Use fill_cache=False when the transaction may hold
+        # uncommitted annotations; the caller fills the cache
+        # after the commit.
+        tuids = self.annotation_cache.get(rev, file)
+        if tuids is not None:
+            return tuids
+        packed = self._get_annotation(rev, file, transaction=transaction)
+        if packed is None:
+            return None
+        tuids = self.destringify_tuids(packed)
+        if tuids and fill_cache:
+            self.annotation_cache.set(rev, file, tuids)
+        return tuids
+
+
     def _get_one_tuid(self, transaction, cset, path, line):
         # Returns a single TUID if it exists
         return transaction.get_one(
@@ -180,26 +204,15 @@ class TUIDService:
 
 
     def stringify_tuids(self, tuid_list):
-        # Turns the TuidMap list to a string for storage in
-        # the annotations table.
-        return "\n".join([','.join([str(x.tuid), str(x.line)]) for x in tuid_list])
+        # Turns the TuidMap list to compressed bytes for storage
+        # in the annotations table.
+        return pack_tuids(tuid_list)
 
 
-    def destringify_tuids(self, tuids_string):
-        # Builds up TuidMap list from annotation cache entry.
-        try:
-            lines = tuids_string.splitlines()
-            line_origins = []
-            for line in lines:
-                if not line:
-                    continue
-                tuid, linenum = line.split(',')
-                line_origins.append(
-                    TuidMap(int(tuid), int(linenum))
-                )
-            return line_origins
-        except Exception as e:
-            Log.error("Invalid entry in tuids list:\n{{list}}", list=tuids_string, cause=e)
+    def destringify_tuids(self, packed):
+        # Builds up TuidMap list from annotation cache entry, in
+        # either the packed, or the older text, format.
+        return unpack_tuids(packed)
 
 
     # Gets a diff from a particular revision from https://hg.mozilla.org/
@@ -420,17 +433,17 @@ class TUIDService:
 
             with self.conn.transaction() as t:
                 latest_rev = self._get_latest_revision(file, transaction=t)
-                already_ann = self._get_annotation(revision, file, transaction=t)
+                already_ann = self._get_annotation_tuids(revision, file, transaction=t)
 
             # Check if the file has already been collected at
             # this revision and get the result if so
             if already_ann:
-                result.append((file,self.destringify_tuids(already_ann)))
+                result.append((file, already_ann))
                 if going_forward:
                     latestFileMod_inserts[file] = (file, revision)
                 log_existing_files.append('exists|' + file)
                 continue
-            elif already_ann == '':
+            elif already_ann is not None:
                 result.append((file,[]))
                 if going_forward:
                     latestFileMod_inserts[file] = (file, revision)
@@ -650,12 +663,12 @@ class TUIDService:
         # Check if the files were already annotated.
         for file in files:
             with self.conn.transaction() as t:
-                already_ann = self._get_annotation(revision, file, transaction=t)
+                already_ann = self._get_annotation_tuids(revision, file, transaction=t)
             if already_ann:
-                result.append((file, self.destringify_tuids(already_ann)))
+                result.append((file, already_ann))
                 log_existing_files.append('exists|' + file)
                 continue
-            elif already_ann[0] == '':
+            elif already_ann is not None:
                 result.append((file, []))
                 log_existing_files.append('removed|' + file)
                 continue
@@ -779,7 +792,7 @@ class TUIDService:
                     anns_to_get.append(file)
                 elif file in removed_files:
                     Log.note("Try revision run - removed: {{file}}", file=file)
-                    ann_inserts.append((revision, file, ''))
+                    ann_inserts.append((revision, file, EMPTY_ANNOTATION))
                     tmp_results[file] = []
                 elif file in files_to_process:
                     # Reverse the list, we always find the newest diff first
@@ -1136,7 +1149,7 @@ class TUIDService:
                 if file in files_to_process:
                     # Process this file using the diffs found
                     tmp_ann = self._get_annotation(old_frontier, file, transaction)
-                    if tmp_ann is None or tmp_ann == '' or self.destringify_tuids(tmp_ann) is None:
+                    if not tmp_ann or self.destringify_tuids(tmp_ann) is None:
                         Log.warning(
                             "{{file}} has frontier but can't find old annotation for it in {{rev}}, "
                             "restarting it's frontier.",
@@ -1165,7 +1178,7 @@ class TUIDService:
                         )
                 else:
                     old_ann = self._get_annotation(old_frontier, file, transaction)
-                    if old_ann is None or (old_ann == '' and file in added_files):
+                    if old_ann is None or (not old_ann and file in added_files):
                         # File is new (likely from an error), or re-added - we need to create
                         # a new initial entry for this file.
                         anns_to_get.append(file)
@@ -1181,7 +1194,7 @@ class TUIDService:
                     else:
                         # File was not modified since last
                         # known revision
-                        tmp_res = self.destringify_tuids(old_ann) if old_ann != '' else []
+                        tmp_res = self.destringify_tuids(old_ann) if old_ann else []
                         ann_inserts.append((revision, file, old_ann))
                         Log.note(
                             "Frontier update - not modified: {{count}}/{{total}} - {{percent|percent(decimal=0)}} "
@@ -1233,7 +1246,7 @@ class TUIDService:
                     recomputed_inserts = []
                     for rev, filename, string_tuids in tmp_inserts:
                         tmp_ann = self._get_annotation(rev, filename, transaction)
-                        if not tmp_ann or tmp_ann == '':
+                        if not tmp_ann:
                             recomputed_inserts.append((rev, filename, string_tuids))
                         else:
                             anns_added_by_other_thread[filename] = self.destringify_tuids(tmp_ann)
@@ -1294,10 +1307,10 @@ class TUIDService:
             annotations_to_get = []
             for file in new_files:
                 with self.conn.transaction() as t:
-                    already_ann = self._get_annotation(revision, file, transaction=t)
+                    already_ann = self._get_annotation_tuids(revision, file, transaction=t)
                 if already_ann:
-                    results.append((file, self.destringify_tuids(already_ann)))
-                elif already_ann == '':
+                    results.append((file, already_ann))
+                elif already_ann is not None:
                     results.append((file, []))
                 else:
                     annotations_to_get.append(file)
@@ -1329,12 +1342,16 @@ class TUIDService:
             del threads
 
             with self.conn.transaction() as transaction:
-                results.extend(
-                    self._get_tuids(
-                        transaction, annotations_to_get, revision, annotated_files, commit=commit, repo=repo
-                    )
+                new_results = self._get_tuids(
+                    transaction, annotations_to_get, revision, annotated_files, commit=commit, repo=repo
                 )
 
+            # Only cache annotations once they are committed
+            for file, tuids in new_results:
+                if tuids:
+                    self.annotation_cache.set(revision, file, tuids)
+            results.extend(new_results)
+
         # Help for memory
         gc.collect()
         return results
@@ -1374,9 +1391,9 @@ class TUIDService:
             # TODO: at the same revision and if it is not empty as well.
             # Make sure we are not adding the same thing another thread
             # added.
-            tmp_ann = self._get_annotation(revision, file, transaction=transaction)
-            if tmp_ann != None:
-                results.append((file, self.destringify_tuids(tmp_ann)))
+            tmp_ann = self._get_annotation_tuids(revision, file, transaction=transaction, fill_cache=False)
+            if tmp_ann is not None:
+                results.append((file, tmp_ann))
                 continue
 
             # If it's not defined at this revision, we need to add it in
@@ -10,6 +10,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import unicode_literals
 
+from binascii import hexlify
+
 from mo_logs import Log
 from pyLibrary.sql.sqlite import quote_value, Sqlite
 
@@ -17,6 +19,14 @@ DEBUG = False
 TRACE = True
 
 
+def quote_blob(value):
+    """
+    :param value: bytes
+    :return: SQLITE BLOB LITERAL
+    """
+    return "X'" + hexlify(value).decode("ascii") + "'"
+
+
 class Sql:
     def __init__(self, config):
         self.db = Sqlite(config)
@@ -4,7 +4,19 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at http://mozilla.org/MPL/2.0/.
-from collections import namedtuple
+import sys
+import zlib
+from array import array
+from collections import OrderedDict, namedtuple
+from itertools import accumulate
+from operator import sub
+
+from mo_future import is_text
+from mo_logs import Log
+from mo_threads import Lock
+
+BIG_ENDIAN = sys.byteorder == "big"
+EMPTY_ANNOTATION = b""
 
 
 def map_to_array(pairs):
@@ -30,3 +42,113 @@ def map_to_array(pairs):
 TuidMap = namedtuple(str("TuidMap"), [str("tuid"), str("line")])
 MISSING = TuidMap(-1, 0)
 
+
+def pack_tuids(tuid_list):
+    """
+    ENCODE LIST OF TuidMap FOR THE annotations TABLE: THE DIFFERENCES
+    BETWEEN CONSECUTIVE tuids, THEN BETWEEN CONSECUTIVE lines, AS 64bit
+    LITTLE-ENDIAN INTEGERS, COMPRESSED (MOSTLY SMALL, REPEATED DELTAS)
+    """
+    if not tuid_list:
+        return EMPTY_ANNOTATION
+    tuids = [t for t, _ in tuid_list]
+    lines = [l for _, l in tuid_list]
+    deltas = array(str("q"), map(sub, tuids, [0] + tuids[:-1]))
+    deltas.extend(map(sub, lines, [0] + lines[:-1]))
+    if BIG_ENDIAN:
+        deltas.byteswap()
+    return zlib.compress(deltas.tobytes(), 1)
+
+
+def unpack_tuids(packed):
+    """
+    :param packed: FROM pack_tuids(), OR THE OLDER "tuid,line\n" TEXT
+    :return: LIST OF TuidMap
+    """
+    if not packed:
+        return []
+    if is_text(packed):
+        return _destringify_tuids(packed)
+    try:
+        deltas = array(str("q"))
+        deltas.frombytes(zlib.decompress(packed))
+        if BIG_ENDIAN:
+            deltas.byteswap()
+        half = len(deltas) // 2
+        return list(map(TuidMap, accumulate(deltas[:half]), accumulate(deltas[half:])))
+    except Exception as e:
+        Log.error("Invalid packed tuids ({{num}} bytes)", num=len(packed), cause=e)
+
+
+def repack_tuids(annotation):
+    """
+    :param annotation: FROM THE annotations TABLE, IN EITHER FORMAT
+    :return: THE pack_tuids() BYTES
+    """
+    if is_text(annotation):
+        return pack_tuids(_destringify_tuids(annotation)) if annotation else EMPTY_ANNOTATION
+    return annotation
+
+
+def _destringify_tuids(tuids_string):
+    try:
+        line_origins = []
+        for line in tuids_string.splitlines():
+            if not line:
+                continue
+            tuid, linenum = line.split(",")
+            line_origins.append(TuidMap(int(tuid), int(linenum)))
+        return line_origins
+    except Exception as e:
+        Log.error("Invalid entry in tuids list:\n{{list}}", list=tuids_string, cause=e)
+
+
+class AnnotationCache(object):
+    """
+    LEAST-RECENTLY-USED CACHE OF DECODED ANNOTATIONS, KEYED BY (revision, file)
+    BOUNDED BY THE TOTAL NUMBER OF LINES HELD
+    SAFE TO SHARE BETWEEN THREADS
+    """
+
+    def __init__(self, max_lines):
+        self.max_lines = max_lines
+        self.locker = Lock("annotation cache")
+        self._num_lines = 0
+        self.data = OrderedDict()
+
+    @property
+    def num_lines(self):
+        with self.locker:
+            return self._num_lines
+
+    def get(self, revision, file):
+        key = (revision, file)
+        with self.locker:
+            tuids = self.data.pop(key, None)
+            if tuids is None:
+                return None
+            self.data[key] = tuids
+        return list(tuids)
+
+    def set(self, revision, file, tuids):
+        key = (revision, file)
+        tuids = tuple(tuids)
+        with self.locker:
+            old = self.data.pop(key, None)
+            if old is not None:
+                self._num_lines -= len(old)
+            self.data[key] = tuids
+            self._num_lines += len(tuids)
+            while self._num_lines > self.max_lines and len(self.data) > 1:
+                _, old = self.data.popitem(last=False)
+                self._num_lines -= len(old)
+
+    def evict_revisions(self, revisions):
+        """
+        REMOVE ALL ANNOTATIONS OF THE GIVEN REVISIONS
+        CALL AFTER THE ANNOTATIONS ARE DELETED FROM THE DATABASE
+        """
+        revisions = set(revisions)
+        with self.locker:
+            for key in [k for k in self.data.keys() if k[0] in revisions]:
+                self._num_lines -= len(self.data.pop(key))